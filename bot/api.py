@@ -0,0 +1,389 @@
+"""HTTP JSON API калькуляторов — для 1С и других программ.
+
+    POST /v1/{salary|ndfl|contributions|nds|transport}        — один расчёт
+    POST /v1/{...}/batch    JSON-массив → JSON-массив того же размера
+                            application/x-ndjson → NDJSON построчно, потоком
+    GET  /v1/health         — загруженные годы ставок
+
+Расчёты — те же ядра, что у бота (salary_kop, contributions_kop, шкалы
+tax_scale, compute_nds, compute_transport_tax). Суммы в ответе — рубли
+числом с копейками (12345.67); у ошибочной строки пакета вместо результата
+{"error": "..."}, остальные строки считаются.
+
+Пакет обрабатывается кусками по CHUNK строк с передачей управления циклу —
+бот в том же процессе не замирает на тысячах строк. Одновременно
+выполняется не больше API_MAX_CONCURRENCY запросов, лишние получают 429.
+Запуск вместе с ботом (API_PORT ≠ 0) или отдельно:
+
+    python -m bot.api --port 8088
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hmac
+import json
+import logging
+import time
+from typing import Any, Callable, NamedTuple
+
+from aiohttp import web
+
+from bot.config.registry import rates, years
+from bot.services import territory as territories
+from bot.services.calc_core import (
+    compute_nds,
+    compute_transport_tax,
+    contributions_kop,
+    nds_rates,
+    salary_kop,
+)
+from bot.services.kopeck import half_up
+from bot.services.tax_scale import year_scales
+from bot.utils.metrics import API_ROWS, API_SECONDS
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = 100_000         # строк в JSON-массиве; NDJSON — без ограничения
+MAX_BODY = 64 * 1024 * 1024
+CHUNK = 1000                # строк между передачами управления циклу
+NDJSON = "application/x-ndjson"
+# Верхняя граница чисел в запросе: рубли до 10¹³ выдаются в JSON точно
+MAX_VALUE = 10**13
+
+_SEMAPHORE = web.AppKey("semaphore", asyncio.Semaphore)
+_TOKEN = web.AppKey("token", str)
+
+
+# ─────────────────────────────────────────────
+# РАЗБОР ПОЛЕЙ
+# ─────────────────────────────────────────────
+
+_REQUIRED = object()
+
+
+def _int(row: dict, name: str, default: Any = _REQUIRED) -> Any:
+    """Целое от 0 до MAX_VALUE из поля запроса (число или строка из цифр)."""
+    value = row.get(name, default)
+    if value is _REQUIRED:
+        raise ValueError(f"Не указано поле «{name}».")
+    if value is default:
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError(f"Поле «{name}»: нужно целое число ≥ 0.")
+    if value >= MAX_VALUE:
+        raise ValueError(f"Поле «{name}»: не больше {MAX_VALUE - 1}.")
+    return value
+
+
+def _str(row: dict, name: str, default: Any = _REQUIRED) -> str:
+    value = row.get(name, default)
+    if value is _REQUIRED:
+        raise ValueError(f"Не указано поле «{name}».")
+    if not isinstance(value, str):
+        raise ValueError(f"Поле «{name}»: нужна строка.")
+    return value
+
+
+def _rub(kopecks: int) -> float:
+    """Копейки → рубли числом: для сумм меньше 10¹³ ₽ JSON даёт ровно
+    «12345.67», без хвостов двоичной дроби."""
+    return kopecks / 100
+
+
+# ─────────────────────────────────────────────
+# РАСЧЁТЫ
+# ─────────────────────────────────────────────
+
+def salary(row: dict) -> dict:
+    """{"territory": "А" | "Братск", "oklad": 60000, "nadbavka_pct": 50}"""
+    r = rates(_int(row, "year", None))
+    name = _str(row, "territory")
+    if name in r.TERRITORY_GROUPS:
+        group = name
+    else:
+        found = territories.resolve(name, r.year)
+        if found is None or found.distance:
+            raise ValueError(f"Неизвестная территория: {name}")
+        group = found.group
+    oklad = _int(row, "oklad")
+    k = salary_kop(group, oklad, _int(row, "nadbavka_pct", 0), r.year)
+    return {
+        "year": r.year,
+        "territory": group,
+        "oklad": oklad,
+        "rk": _rub(k.rk),
+        "nadbavka": _rub(k.nadbavka),
+        "gross": _rub(k.gross),
+        "ndfl": _rub(k.ndfl),
+        "net": _rub(k.net),
+        "insurance": _rub(k.insurance),
+        "employer_cost": _rub(k.gross + k.insurance),
+    }
+
+
+def ndfl(row: dict) -> dict:
+    """{"income": 3000000} — годовой доход, ₽"""
+    r = rates(_int(row, "year", None))
+    income = _int(row, "income")
+    tax = r.derive(year_scales).ndfl.tax(income)
+    net = income * 100 - tax
+    return {
+        "year": r.year,
+        "income": income,
+        "tax": _rub(tax),
+        "net": _rub(net),
+        "net_monthly": _rub(half_up(net, 12)),
+        "effective_pct": _rub(half_up(tax * 100, income)) if income else 0.0,
+    }
+
+
+def contributions(row: dict) -> dict:
+    """{"monthly_salary": 150000, "tariff": "general"}"""
+    r = rates(_int(row, "year", None))
+    monthly = _int(row, "monthly_salary")
+    tariff_key = _str(row, "tariff", "general")
+    k = contributions_kop(monthly, tariff_key, r.year)
+    return {
+        "year": r.year,
+        "tariff": tariff_key,
+        "monthly_salary": monthly,
+        "total": _rub(k.total),
+        "exhaust_month": k.exhaust_month or None,
+        "months": [_rub(m) for m in k.months],
+    }
+
+
+def nds(row: dict) -> dict:
+    """{"amount": 500000, "rate_pct": 22} — ставка по умолчанию основная"""
+    year = _int(row, "year", None)
+    available = nds_rates(year)
+    rate_pct = _int(row, "rate_pct", next(iter(available)))
+    if rate_pct not in available:
+        raise ValueError(f"Ставка НДС {rate_pct}% не применяется "
+                         f"(есть: {', '.join(map(str, available))}).")
+    res = compute_nds(_int(row, "amount"), rate_pct, year)
+    return {
+        "year": res.year,
+        "amount": int(res.amount),
+        "rate_pct": rate_pct,
+        "nds": float(res.nds),
+        "total": float(res.total),
+        "nds_from_total": float(res.nds_from_total),
+    }
+
+
+def transport(row: dict) -> dict:
+    """{"vehicle_type": "car", "horsepower": 150}"""
+    res = compute_transport_tax(
+        _str(row, "vehicle_type", "car"), _int(row, "horsepower"), _int(row, "year", None),
+    )
+    return {
+        "year": res.year,
+        "vehicle_type": res.vehicle_type,
+        "horsepower": res.horsepower,
+        "rate": float(res.rate),
+        "tax": float(res.tax),
+    }
+
+
+CALCULATORS: dict[str, Callable[[dict], dict]] = {
+    "salary": salary,
+    "ndfl": ndfl,
+    "contributions": contributions,
+    "nds": nds,
+    "transport": transport,
+}
+
+
+class _Row(NamedTuple):
+    result: dict
+    ok: bool
+
+
+def _run(calc: Callable[[dict], dict], row: Any) -> _Row:
+    """Строка пакета: результат или {"error": ...} — пакет не прерывается.
+    ArithmeticError — переполнение Decimal/float на крайних значениях."""
+    if not isinstance(row, dict):
+        return _Row({"error": "Строка пакета должна быть JSON-объектом."}, False)
+    try:
+        return _Row(calc(row), True)
+    except (ValueError, ArithmeticError) as e:
+        return _Row({"error": str(e) or type(e).__name__}, False)
+
+
+def _count(endpoint: str, rows: list[_Row]) -> None:
+    ok = sum(r.ok for r in rows)
+    API_ROWS.inc(ok, endpoint=endpoint, result="ok")
+    API_ROWS.inc(len(rows) - ok, endpoint=endpoint, result="error")
+
+
+# ─────────────────────────────────────────────
+# HTTP
+# ─────────────────────────────────────────────
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _error(status: int, message: str, **headers: str) -> web.Response:
+    return web.json_response({"error": message}, status=status, headers=headers, dumps=_dumps)
+
+
+@web.middleware
+async def _guard(request: web.Request, handler) -> web.StreamResponse:
+    """Токен, лимит одновременных запросов и метрики."""
+    endpoint = request.match_info.route.name or "unknown"
+    started = time.perf_counter()
+    token = request.app[_TOKEN]
+    semaphore = request.app[_SEMAPHORE]
+    if token and not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}",
+    ):
+        response = _error(401, "Нужен заголовок Authorization: Bearer <API_TOKEN>.")
+    elif semaphore.locked():
+        response = _error(429, "Слишком много одновременных запросов.", **{"Retry-After": "1"})
+    else:
+        async with semaphore:
+            try:
+                response = await handler(request)
+            except web.HTTPException as e:
+                response = e
+    API_SECONDS.observe(
+        time.perf_counter() - started, endpoint=endpoint, status=str(response.status),
+    )
+    if isinstance(response, web.HTTPException):
+        raise response
+    return response
+
+
+async def _json_body(request: web.Request) -> Any:
+    try:
+        return await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(
+            text=_dumps({"error": "Тело запроса — не JSON."}), content_type="application/json",
+        ) from None
+
+
+def _single(kind: str):
+    calc = CALCULATORS[kind]
+
+    async def handle(request: web.Request) -> web.Response:
+        row = _run(calc, await _json_body(request))
+        _count(kind, [row])
+        return web.json_response(row.result, status=200 if row.ok else 400, dumps=_dumps)
+
+    return handle
+
+
+def _batch(kind: str):
+    calc = CALCULATORS[kind]
+
+    async def handle(request: web.Request) -> web.StreamResponse:
+        if request.content_type == NDJSON:
+            return await _ndjson(request, kind, calc)
+        rows = await _json_body(request)
+        if not isinstance(rows, list):
+            return _error(400, "Пакет — JSON-массив объектов.")
+        if len(rows) > MAX_BATCH:
+            return _error(413, f"Больше {MAX_BATCH} строк — отправьте NDJSON.")
+        out: list[_Row] = []
+        for start in range(0, len(rows), CHUNK):
+            out.extend(_run(calc, row) for row in rows[start:start + CHUNK])
+            await asyncio.sleep(0)
+        _count(kind, out)
+        return web.Response(
+            text=_dumps([r.result for r in out]), content_type="application/json",
+        )
+
+    return handle
+
+
+async def _ndjson(request: web.Request, kind: str, calc) -> web.StreamResponse:
+    """Строка запроса → строка ответа в том же порядке; пустые пропускаются."""
+    response = web.StreamResponse(headers={"Content-Type": f"{NDJSON}; charset=utf-8"})
+    await response.prepare(request)
+    pending: list[_Row] = []
+
+    async def flush() -> None:
+        _count(kind, pending)
+        await response.write("".join(_dumps(r.result) + "\n" for r in pending).encode())
+        pending.clear()
+
+    def take(line: bytes) -> None:
+        if not line.strip():
+            return
+        try:
+            row = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            pending.append(_Row({"error": "Строка — не JSON."}, False))
+        else:
+            pending.append(_run(calc, row))
+
+    # Куски тела режутся на строки сами: построчное чтение StreamReader
+    # медленнее и ограничено 64 КБ на строку
+    tail = b""
+    async for chunk in request.content.iter_any():
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            take(line)
+        if len(pending) >= CHUNK:
+            await flush()
+    take(tail)
+    await flush()
+    await response.write_eof()
+    return response
+
+
+async def _health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok", "years": years()}, dumps=_dumps)
+
+
+def build_app(max_concurrency: int = 4, token: str = "") -> web.Application:
+    app = web.Application(middlewares=[_guard], client_max_size=MAX_BODY)
+    app[_SEMAPHORE] = asyncio.Semaphore(max_concurrency)
+    app[_TOKEN] = token
+    app.router.add_get("/v1/health", _health, name="health")
+    for kind in CALCULATORS:
+        app.router.add_post(f"/v1/{kind}", _single(kind), name=kind)
+        app.router.add_post(f"/v1/{kind}/batch", _batch(kind), name=f"{kind}_batch")
+    return app
+
+
+async def start_api_server(
+    host: str, port: int, max_concurrency: int = 4, token: str = "",
+) -> web.AppRunner:
+    """Поднимает API на aiohttp. Возвращает runner для остановки."""
+    runner = web.AppRunner(build_app(max_concurrency, token), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info("API калькуляторов: http://%s:%d/v1/", host, port)
+    return runner
+
+
+async def _serve(host: str, port: int) -> None:
+    from bot.config.settings import settings
+
+    await start_api_server(host, port, settings.api_max_concurrency, settings.api_token)
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    from bot.config.settings import settings
+
+    parser = argparse.ArgumentParser(prog="python -m bot.api")
+    parser.add_argument("--host", default=settings.api_host)
+    parser.add_argument("--port", type=int, default=settings.api_port or 8088)
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+    asyncio.run(_serve(args.host, args.port))
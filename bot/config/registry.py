@@ -0,0 +1,236 @@
+"""Реестр ставок по годам и регионам.
+
+Значения лежат в TOML-файлах каталога rates_data (один файл на год:
+федеральные разделы + [region.<код>]). Файлы читаются один раз в
+неизменяемые наборы RateSet; всё, что из ставок компилируется (шкалы НДФЛ,
+интервалы транспортного налога, тарифы взносов, ступени надбавки), строится
+лениво через RateSet.derive и живёт вместе с набором. reload() перечитывает
+каталог и атомарно подменяет реестр — без перезапуска бота: старые наборы
+и их производные просто перестают выдаваться.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+import tomllib
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).with_name("rates_data")
+DEFAULT_REGION = "irkutsk"
+
+T = TypeVar("T")
+
+_DECIMAL = re.compile(r"-?\d+\.\d+")
+# Шкалы НДФЛ: [{upto, rate}, ...] → ((граница | None, ставка), ...)
+_SCALES = ("NDFL_SCALE", "NDFL_SCALE_NORTH", "NDFL_DIVIDENDS", "NDFL_SVO")
+
+
+@dataclass(frozen=True)
+class NdflDeductions:
+    """Стандартные и социальные вычеты НДФЛ."""
+    # Стандартные на детей (в месяц)
+    child_1: int
+    child_2: int
+    child_3_plus: int
+    child_disabled: int
+    child_disabled_guardian: int
+    child_income_limit: int     # предел дохода для вычета
+    # Социальные (в год)
+    education_self: int
+    education_child: int
+    medical: int
+    sport: int
+    gto: int
+    cashback_multichild_rate: Decimal
+    maternity_aid_limit: int
+
+
+@dataclass(frozen=True, eq=False)
+class RateSet:
+    """Ставки одного года для одного региона. Значения доступны атрибутами
+    с именами констант rates.py: r.MROT, r.NDFL_SCALE, r.TERRITORY_GROUPS."""
+    year: int
+    region: str
+    values: Mapping[str, Any]
+    source: str
+    # Тема → нормативный акт (таблицы [sources] файла и региона)
+    citations: Mapping[str, str] = field(default_factory=dict)
+    _derived: dict = field(default_factory=dict, repr=False)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self.values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def derive(self, build: Callable[["RateSet"], T]) -> T:
+        """Структура, построенная из набора build(набор) один раз: повторные
+        вызовы с той же функцией отдают готовый результат."""
+        try:
+            return self._derived[build]
+        except KeyError:
+            return self._derived.setdefault(build, build(self))
+
+
+# ─────────────────────────────────────────────
+# ЧТЕНИЕ
+# ─────────────────────────────────────────────
+
+def _freeze(value: Any) -> Any:
+    """TOML → неизменяемые значения: ставки-строки → Decimal, списки →
+    кортежи, таблицы → MappingProxyType."""
+    if isinstance(value, str):
+        return Decimal(value) if _DECIMAL.fullmatch(value) else value
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+def _constants(tables: Mapping[str, Any]) -> dict[str, Any]:
+    """Разделы файла → константы: ключи внутри раздела в верхнем регистре."""
+    out: dict[str, Any] = {}
+    for table in tables.values():
+        for key, value in table.items():
+            out[key.upper()] = _freeze(value)
+    return out
+
+
+def _build(year: int, region: str, federal: dict, regional: dict, source: str) -> RateSet:
+    federal, regional = dict(federal), dict(regional)
+    citations = {**federal.pop("sources", {}), **regional.pop("sources", {})}
+    v = _constants(federal)
+    v.update(_constants({"region": regional}))
+
+    for key in _SCALES:
+        v[key] = tuple((b.get("upto"), b["rate"]) for b in v[key])
+    v["TRANSPORT_TAX"] = MappingProxyType({
+        vehicle: tuple((b["from"], b["to"], b["rate"]) for b in brackets)
+        for vehicle, brackets in v["TRANSPORT_TAX"].items()
+    })
+    v["TRAUMA_RATES"] = MappingProxyType({int(k): r for k, r in v["TRAUMA_RATES"].items()})
+    v["NDFL_DEDUCTIONS"] = NdflDeductions(**v["NDFL_DEDUCTIONS"])
+
+    # Производные значения — как их считал rates.py
+    mrot = v["MROT"]
+    v["MSP_THRESHOLD"] = int(mrot * float(v["MSP_THRESHOLD_MROT_MULT"]))
+    # Порог обрабатывающих МСП может отличаться (2025: 1 МРОТ при общем 1,5)
+    v.setdefault("MANUFACTURING_THRESHOLD_MROT_MULT", v["MSP_THRESHOLD_MROT_MULT"])
+    v["MANUFACTURING_MSP_THRESHOLD"] = int(mrot * float(v["MANUFACTURING_THRESHOLD_MROT_MULT"]))
+    v["DIRECTOR_MIN_CONTRIBUTIONS_MONTHLY"] = int(mrot * float(v["INSURANCE_BASE"]))
+    v["DIRECTOR_MIN_CONTRIBUTIONS_YEARLY"] = v["DIRECTOR_MIN_CONTRIBUTIONS_MONTHLY"] * 12
+    # Расчётные ставки НДС: 22/122, 10/110…
+    for key in ("NDS_BASE_RATE", "NDS_REDUCED_RATE", "NDS_USN_REDUCED_5", "NDS_USN_REDUCED_7"):
+        pct = int(v[key] * 100)
+        v[f"NDS_CALCULATED_{pct}"] = Decimal(pct) / Decimal(100 + pct)
+    v["DEADLINES"] = MappingProxyType({
+        **v["DEADLINES"],
+        "ip_fixed": v["IP_FIXED_DEADLINE"],
+        "ip_1pct": v["IP_ADDITIONAL_DEADLINE"],
+    })
+    return RateSet(year, region, MappingProxyType(v), source, MappingProxyType(citations))
+
+
+def load(directory: Path) -> dict[tuple[int, str], RateSet]:
+    """Все наборы каталога: (год, регион) → RateSet."""
+    sets: dict[tuple[int, str], RateSet] = {}
+    for path in sorted(directory.glob("*.toml")):
+        try:
+            with path.open("rb") as f:
+                data = tomllib.load(f)
+            year = data.pop("year")
+            regions = data.pop("region", {})
+            if not regions:
+                raise ValueError("нет ни одного раздела [region.<код>]")
+            for region, regional in regions.items():
+                if (year, region) in sets:
+                    raise ValueError(f"{year}/{region} уже задан в {sets[year, region].source}")
+                sets[year, region] = _build(year, region, data, regional, path.name)
+        except (OSError, tomllib.TOMLDecodeError, KeyError, TypeError, ValueError, ArithmeticError) as e:
+            detail = f"нет ключа {e}" if isinstance(e, KeyError) else e
+            raise ValueError(f"{path.name}: {detail}") from None
+    if not sets:
+        raise ValueError(f"В {directory} нет файлов ставок.")
+    return sets
+
+
+# ─────────────────────────────────────────────
+# РЕЕСТР
+# ─────────────────────────────────────────────
+
+_lock = threading.RLock()
+_sets: dict[tuple[int, str], RateSet] = {}
+
+
+def data_dir() -> Path:
+    """Каталог ставок: RATES_DIR из настроек или встроенный rates_data."""
+    from bot.config.settings import settings
+
+    return Path(settings.rates_dir) if settings.rates_dir else DATA_DIR
+
+
+def reload() -> list[RateSet]:
+    """Перечитывает каталог ставок. При ошибке в любом файле реестр не
+    меняется (ValueError с именем файла)."""
+    global _sets
+    sets = load(data_dir())
+    with _lock:
+        _sets = sets
+    logger.info("Ставки загружены: %s", ", ".join(f"{y}/{r}" for y, r in sorted(sets)))
+    return [sets[key] for key in sorted(sets)]
+
+
+def years(region: str = DEFAULT_REGION) -> list[int]:
+    return sorted(y for y, r in _registry() if r == region)
+
+
+def _registry() -> dict[tuple[int, str], RateSet]:
+    if not _sets:
+        with _lock:
+            if not _sets:
+                reload()
+    return _sets
+
+
+_this_year = (0, 0.0)      # текущий год и time.time(), до которого он верен
+
+
+def _current_year() -> int:
+    """date.today().year без date.today() на каждый расчёт: rates() без года
+    вызывается в каждом калькуляторе, а год меняется раз в году."""
+    global _this_year
+    year, until = _this_year
+    if time.time() < until:
+        return year
+    year = date.today().year
+    _this_year = year, datetime(year + 1, 1, 1).timestamp()
+    return year
+
+
+def rates(year: Optional[int] = None, region: str = DEFAULT_REGION, exact: bool = True) -> RateSet:
+    """Ставки на год. Без года — текущий (или последний загруженный до него).
+    exact=False — ставки последнего загруженного года не позже year (для дат
+    в прошлом, например стажа)."""
+    sets = _registry()
+    target = year or _current_year()
+    found = sets.get((target, region))
+    if found is not None:
+        return found
+    if year is not None and exact:
+        raise ValueError(f"Ставки на {year} год не загружены.")
+    known = years(region)
+    if not known:
+        raise ValueError(f"Нет ставок для региона «{region}».")
+    earlier = [y for y in known if y <= target]
+    return sets[(earlier[-1] if earlier else known[0]), region]
@@ -3,6 +3,7 @@
 import json
 import logging
 from pathlib import Path
+from typing import Iterable, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -19,6 +20,8 @@ class Settings(BaseSettings):
     # AI API
     openai_api_key: str = ""
     anthropic_api_key: str = ""
+    # Совместимый с OpenAI endpoint (прокси, стенд нагрузочного теста); пусто — api.openai.com
+    openai_base_url: str = ""
 
     # ChromaDB
     chroma_host: str = "chromadb"
@@ -31,6 +34,32 @@ class Settings(BaseSettings):
     postgres_user: str = "buhgalter"
     postgres_password: str = ""
 
+    # Метрики Prometheus (/metrics); порт 0 — эндпоинт выключен
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 0
+
+    # HTTP API калькуляторов (bot/api.py); порт 0 — выключен
+    api_host: str = "127.0.0.1"
+    api_port: int = 0
+    # Необязательный токен: заголовок Authorization: Bearer <токен>
+    api_token: str = ""
+    api_max_concurrency: int = 4
+
+    # Пул процессов для XLSX/PDF (0 — в потоке бота) и очередь сверх него
+    render_workers: int = 2
+    render_queue: int = 8
+    # Кэш готовых отчётов в памяти, МБ (повторы уходят по file_id Telegram)
+    artifact_cache_mb: int = 64
+
+    # Сторож event loop: порог блокировки, мс (0 — выключен)
+    loop_lag_threshold_ms: int = 250
+
+    # Каталог TOML-файлов ставок по годам; пусто — встроенный bot/config/rates_data
+    rates_dir: str = ""
+
+    # Фоновый прогрев тяжёлых модулей (chromadb, openpyxl, reportlab…) после старта
+    prewarm_modules: bool = False
+
     model_config = {
         "env_file": ".env",
         "env_file_encoding": "utf-8",
@@ -69,12 +98,17 @@ def _load_persistent_users() -> set[int]:
     return set()
 
 
-def save_users() -> None:
-    """Сохраняет текущий whitelist в JSON-файл."""
+def save_users(users: Optional[Iterable[int]] = None) -> None:
+    """Сохраняет whitelist в JSON-файл.
+
+    Для записи из потока передавайте снимок users — сам set меняется
+    хендлерами в event loop.
+    """
+    snapshot = sorted(allowed_users if users is None else users)
     try:
         USERS_FILE.parent.mkdir(parents=True, exist_ok=True)
-        USERS_FILE.write_text(json.dumps(sorted(allowed_users)))
-        logger.info("Whitelist сохранён: %d пользователей", len(allowed_users))
+        USERS_FILE.write_text(json.dumps(snapshot))
+        logger.info("Whitelist сохранён: %d пользователей", len(snapshot))
     except Exception as e:
         logger.error("Ошибка записи %s: %s", USERS_FILE, e)
 
@@ -1,6 +1,13 @@
-"""Калькуляторы — FSM + InlineKeyboard для 6 типов расчётов."""
+"""Калькуляторы — FSM + InlineKeyboard для расчётов и команды одной строкой (/salary, /ndfl…)."""
+
+import asyncio
+import logging
+import re
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
 
 from aiogram import F, Router
+from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import (
@@ -11,22 +18,38 @@ from aiogram.types import (
     Message,
 )
 
-from bot.config.rates import TERRITORY_GROUPS, USN_REGIONAL
+from bot.config.registry import rates
+from bot.services import artifacts
+from bot.services.calc_core import (
+    compute_contributions,
+    compute_ndfl,
+    compute_salary,
+    nds_rates,
+)
 from bot.services.calculators import (
-    calc_insurance_contributions,
     calc_nds,
-    calc_ndfl_progressive,
-    calc_salary,
     calc_transport_tax,
+    contributions_html,
+    gross_from_net_html,
+    nadbavka_html,
+    ndfl_html,
+    salary_html,
+    salary_months_html,
 )
-from bot.services.excel_export import (
-    export_contributions_report,
-    export_ndfl_report,
-    export_salary_report,
-)
+from bot.services.contributions import TARIFF_NAMES
+from bot.services.gross_from_net import solve_gross
+from bot.services.nadbavka import project
+from bot.services.ndfl_ytd import salary_months
+from bot.services.render_pool import render
+from bot.services.territory import resolve as resolve_territory
+from bot.utils.metrics import DOWNLOAD_BYTES, track
+
+logger = logging.getLogger(__name__)
 
 router = Router()
 
+RENDER_FAILED = "❌ Не удалось сформировать отчёт, попробуйте ещё раз"
+
 
 # ─── FSM States ──────────────────────────────
 
@@ -34,6 +57,13 @@ class SalaryCalc(StatesGroup):
     territory = State()
     salary = State()
     nadbavka_pct = State()
+    service = State()
+
+
+class NetCalc(StatesGroup):
+    territory = State()
+    net = State()
+    nadbavka_pct = State()
 
 
 class NDFLCalc(StatesGroup):
@@ -41,6 +71,7 @@ class NDFLCalc(StatesGroup):
 
 
 class InsuranceCalc(StatesGroup):
+    tariff = State()
     monthly_salary = State()
 
 
@@ -54,22 +85,40 @@ class TransportCalc(StatesGroup):
     horsepower = State()
 
 
+class PayrollBatch(StatesGroup):
+    tariff = State()
+    file = State()
+
+
+class FleetBatch(StatesGroup):
+    file = State()
+
+
+class SweepCalc(StatesGroup):
+    tariff = State()
+    params = State()
+
+
 # ─── Keyboards ───────────────────────────────
 
 def calc_menu_kb() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="💰 Зарплата с РК", callback_data="calc_salary")],
+        [InlineKeyboardButton(text="🔄 Оклад по сумме на руки", callback_data="calc_net")],
+        [InlineKeyboardButton(text="👥 Зарплата списком (XLSX/CSV)", callback_data="calc_payroll")],
+        [InlineKeyboardButton(text="📈 Что если: сетка окладов", callback_data="calc_sweep")],
         [InlineKeyboardButton(text="📊 НДФЛ 2026", callback_data="calc_ndfl")],
         [InlineKeyboardButton(text="🏥 Страховые взносы", callback_data="calc_insurance")],
         [InlineKeyboardButton(text="📦 НДС", callback_data="calc_nds")],
         [InlineKeyboardButton(text="🚗 Транспортный налог ИО", callback_data="calc_transport")],
+        [InlineKeyboardButton(text="🚛 Автопарк (XLSX/CSV)", callback_data="calc_fleet")],
         [InlineKeyboardButton(text="📋 УСН (Ирк. обл.)", callback_data="calc_usn")],
     ])
 
 
 def territory_kb() -> InlineKeyboardMarkup:
     buttons = []
-    for key, group in TERRITORY_GROUPS.items():
+    for key, group in rates().TERRITORY_GROUPS.items():
         label = f"{key}: {group['name']} (РК {group['rk']})"
         buttons.append(
             [InlineKeyboardButton(text=label, callback_data=f"terr_{key}")]
@@ -77,6 +126,13 @@ def territory_kb() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+def tariff_kb() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=name, callback_data=f"tariff_{key}")]
+        for key, name in TARIFF_NAMES.items()
+    ])
+
+
 def vehicle_type_kb() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="🚗 Легковой", callback_data="veh_car")],
@@ -86,20 +142,130 @@ def vehicle_type_kb() -> InlineKeyboardMarkup:
     ])
 
 
+_NDS_LABELS = ("основная", "льготная", "УСН до 250 млн", "УСН 250–450 млн")
+
+
 def nds_rate_kb() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="22% (основная)", callback_data="nds_22")],
-        [InlineKeyboardButton(text="10% (льготная)", callback_data="nds_10")],
-        [InlineKeyboardButton(text="5% (УСН до 250 млн)", callback_data="nds_5")],
-        [InlineKeyboardButton(text="7% (УСН 250–450 млн)", callback_data="nds_7")],
+        [InlineKeyboardButton(text=f"{pct}% ({label})", callback_data=f"nds_{pct}")]
+        for pct, label in zip(nds_rates(), _NDS_LABELS)
     ])
 
 
-def _excel_kb(callback_data: str) -> InlineKeyboardMarkup:
-    """Inline-кнопка 'Скачать Excel'."""
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="📥 Скачать Excel", callback_data=callback_data)],
-    ])
+def _report_kb(kind: str, *params) -> InlineKeyboardMarkup:
+    """Кнопки 'Скачать Excel' / 'PDF'; параметры расчёта — в callback_data."""
+    suffix = ":".join([kind, *map(str, params)])
+    return InlineKeyboardMarkup(inline_keyboard=[[
+        InlineKeyboardButton(text="📥 Скачать Excel", callback_data=f"excel_{suffix}"),
+        InlineKeyboardButton(text="📄 PDF", callback_data=f"pdf_{suffix}"),
+    ]])
+
+
+def _salary_kb(territory: str, oklad: int, nadbavka_pct: int, year: int) -> InlineKeyboardMarkup:
+    kb = _report_kb("salary", territory, oklad, nadbavka_pct, year)
+    kb.inline_keyboard.append([InlineKeyboardButton(
+        text="📅 По месяцам",
+        callback_data=f"months_salary:{territory}:{oklad}:{nadbavka_pct}:{year}",
+    )])
+    return kb
+
+
+# ─── Разбор ввода (общий для диалогов и команд) ─
+
+def _amount(text: str) -> int:
+    """«1 500 000», «150000,50» → рубли без копеек; ValueError — не число."""
+    return int(text.replace(" ", "").replace(",", ".").split(".")[0])
+
+
+# Числа в конце строки: «60 000 50» — оклад 60000 и надбавка 50
+_TRAILING_NUMBERS = re.compile(r"(?:\s+\d[\d  .,]*%?)+$")
+_NUMBER = re.compile(r"(?:\d{1,3}(?:[  ]\d{3})+(?!\d)|\d+)(?:[.,]\d+)?")
+
+
+def _trailing_numbers(text: str) -> tuple[str, list[int]]:
+    """«Братск 60 000 50%» → («Братск», [60000, 50]); разряды — как у _amount."""
+    m = _TRAILING_NUMBERS.search(text)
+    if m is None:
+        return text.strip(), []
+    return text[:m.start()].strip(), [_amount(n) for n in _NUMBER.findall(m.group())]
+
+
+def _percent(text: str) -> int:
+    return int(text.replace("%", "").strip())
+
+
+_VEHICLE_ALIASES = {
+    "car": "car", "легковой": "car", "легковая": "car", "авто": "car",
+    "truck": "truck", "грузовой": "truck", "грузовик": "truck",
+    "bus": "bus", "автобус": "bus",
+    "motorcycle": "motorcycle", "мотоцикл": "motorcycle", "мото": "motorcycle",
+}
+
+
+# ─── Отчёты Excel / PDF ──────────────────────
+
+class _Report(NamedTuple):
+    compute: Callable
+    params: tuple[type, ...]
+    html: Callable
+    excel: str          # задание render_pool
+    filename: str
+    caption: str
+
+
+async def _render(job: str, *args) -> Optional[bytes]:
+    """render() без исключений: None — отчёт не получился (упал процесс
+    пула или генератор), ответ пользователю — за вызывающим."""
+    try:
+        return await render(job, *args)
+    except Exception:
+        logger.exception("Отчёт %s не сформирован", job)
+        return None
+
+
+_REPORTS = {
+    # Последний параметр — год ставок: отчёт совпадает с расчётом в чате
+    "salary": _Report(compute_salary, (str, int, int, int), salary_html,
+                      "xlsx:salary", "salary_report", "Расчёт зарплаты"),
+    "ndfl": _Report(compute_ndfl, (int, int), ndfl_html,
+                    "xlsx:ndfl", "ndfl_report", "НДФЛ"),
+    "insurance": _Report(compute_contributions, (int, str, int), contributions_html,
+                         "xlsx:contributions", "insurance_report",
+                         "Страховые взносы"),
+}
+
+
+@router.callback_query(F.data.startswith("excel_") | F.data.startswith("pdf_"))
+async def send_report(cb: CallbackQuery):
+    fmt, _, rest = cb.data.partition("_")
+    kind, *raw = rest.split(":")
+    report = _REPORTS.get(kind)
+    try:
+        if report is None or len(raw) != len(report.params):
+            raise ValueError
+        values = tuple(cast(v) for cast, v in zip(report.params, raw))
+        result = report.compute(*values)
+    except ValueError:
+        await cb.answer("Расчёт устарел — повторите его в калькуляторе.", show_alert=True)
+        return
+
+    # Тот же отчёт у другого пользователя уходит по file_id, без генерации
+    if fmt == "excel":
+        job, args = report.excel, (result,)
+        filename, caption = f"{report.filename}.xlsx", f"📊 {report.caption} — Excel"
+    else:
+        job, args = "pdf:text", (report.html(result), report.caption)
+        filename, caption = f"{report.filename}.pdf", f"📄 {report.caption} — PDF"
+    try:
+        await artifacts.send_document(
+            cb.message.answer_document, artifacts.key(job, (kind, *values), rates(result.year)),
+            job, args, filename, caption=caption,
+        )
+    except Exception:
+        logger.exception("Отчёт %s не отправлен", job)
+        await cb.answer(RENDER_FAILED, show_alert=True)
+        return
+    await cb.answer()
 
 
 # ─── Вход в калькулятор ──────────────────────
@@ -110,12 +276,119 @@ async def show_calc_menu(message: Message, state: FSMContext):
     await message.answer("Выберите калькулятор:", reply_markup=calc_menu_kb())
 
 
+# ─── КОМАНДЫ ОДНОЙ СТРОКОЙ ────────────────────
+# /salary Г 60000 50 — тот же расчёт и те же кнопки, что в конце диалога.
+# Объявлены до состояний диалогов: команда посреди диалога прерывает его.
+
+COMMAND_USAGE = {
+    "salary": "/salary <группа или город> <оклад> <надбавка %> — /salary Г 60000 50",
+    "ndfl": "/ndfl <годовой доход> — /ndfl 3000000",
+    "nds": "/nds <ставка %> <сумма без НДС> — /nds 22 500000",
+    "insurance": "/insurance <зарплата в месяц> [тариф] — /insurance 150000",
+    "transport": "/transport <тип> <л.с.> — /transport truck 320",
+}
+
+
+async def _command_args(message: Message, state: FSMContext, count: int) -> Optional[list[str]]:
+    """Аргументы команды (не меньше count); иначе — подсказка и None."""
+    await state.clear()
+    command, *args = message.text.split()
+    if len(args) < count:
+        name = command.lstrip("/").split("@")[0]
+        await message.answer(f"Формат: {COMMAND_USAGE[name]}")
+        return None
+    return args
+
+
+@router.message(Command("salary"))
+async def cmd_salary(message: Message, state: FSMContext):
+    args = await _command_args(message, state, 3)
+    if args is None:
+        return
+    # Разбор как в диалоге: «Братск 60 000 50» — оклад с разрядами, не «Братск 60»
+    place, numbers = _trailing_numbers(" ".join(args))
+    group = place.upper()
+    if group not in rates().TERRITORY_GROUPS:
+        match = resolve_territory(place) if place else None
+        group = match.group if match else None
+    if len(numbers) != 2 or numbers[0] <= 0:
+        group = None
+    if group is None:
+        await message.answer(f"Формат: {COMMAND_USAGE['salary']}")
+        return
+    await _send_salary(message, group, *numbers)
+
+
+@router.message(Command("ndfl"))
+async def cmd_ndfl(message: Message, state: FSMContext):
+    args = await _command_args(message, state, 1)
+    if args is None:
+        return
+    try:
+        income = _amount("".join(args))
+    except ValueError:
+        await message.answer(f"Формат: {COMMAND_USAGE['ndfl']}")
+        return
+    await _send_ndfl(message, income)
+
+
+@router.message(Command("nds"))
+async def cmd_nds(message: Message, state: FSMContext):
+    args = await _command_args(message, state, 2)
+    if args is None:
+        return
+    try:
+        rate, amount = _percent(args[0]), _amount("".join(args[1:]))
+    except ValueError:
+        await message.answer(f"Формат: {COMMAND_USAGE['nds']}")
+        return
+    if rate not in nds_rates():
+        await message.answer(f"❌ Ставка НДС: {', '.join(f'{p}%' for p in nds_rates())}.")
+        return
+    await message.answer(calc_nds(amount, rate), parse_mode="HTML")
+
+
+@router.message(Command("insurance"))
+async def cmd_insurance(message: Message, state: FSMContext):
+    args = await _command_args(message, state, 1)
+    if args is None:
+        return
+    tariff_key = args.pop() if len(args) > 1 and args[-1] in TARIFF_NAMES else "general"
+    try:
+        salary = _amount("".join(args))
+    except ValueError:
+        await message.answer(f"Формат: {COMMAND_USAGE['insurance']}\n"
+                             f"Тарифы: {', '.join(TARIFF_NAMES)}")
+        return
+    await _send_insurance(message, salary, tariff_key)
+
+
+@router.message(Command("transport"))
+async def cmd_transport(message: Message, state: FSMContext):
+    args = await _command_args(message, state, 2)
+    if args is None:
+        return
+    vehicle_type = _VEHICLE_ALIASES.get(args[0].casefold())
+    try:
+        hp = _amount(args[1])
+    except ValueError:
+        vehicle_type = None
+    if vehicle_type is None:
+        await message.answer(f"Формат: {COMMAND_USAGE['transport']}\n"
+                             f"Типы: car, truck, bus, motorcycle")
+        return
+    await message.answer(calc_transport_tax(vehicle_type, hp), parse_mode="HTML")
+
+
 # ─── ЗАРПЛАТА ────────────────────────────────
 
 @router.callback_query(F.data == "calc_salary")
 async def salary_start(cb: CallbackQuery, state: FSMContext):
     await cb.message.edit_text(
-        "Выберите группу территорий Иркутской области:",
+        "Выберите группу территорий Иркутской области "
+        "или напишите город/район — можно сразу с окладом и надбавкой:\n"
+        "<code>Братск 60000 50</code>",
+        parse_mode="HTML",
         reply_markup=territory_kb(),
     )
     await state.set_state(SalaryCalc.territory)
@@ -131,55 +404,355 @@ async def salary_territory(cb: CallbackQuery, state: FSMContext):
     await cb.answer()
 
 
+@router.message(SalaryCalc.territory, F.text)
+async def salary_territory_text(message: Message, state: FSMContext):
+    """Город или район текстом, при желании сразу с окладом и % надбавки."""
+    place, numbers = _trailing_numbers(message.text)
+    match = resolve_territory(place)
+    if match is None:
+        await message.answer("Не нашёл такую территорию — выберите группу кнопкой.",
+                             reply_markup=territory_kb())
+        return
+    group = rates().TERRITORY_GROUPS[match.group]
+    await message.answer(
+        f"📍 {match.territory} — группа {match.group}: {group['name']}"
+    )
+    if len(numbers) >= 2:
+        await state.clear()
+        await _send_salary(message, match.group, numbers[0], numbers[1])
+        return
+    await state.update_data(territory=match.group)
+    if numbers:
+        await _ask_nadbavka(message, state, numbers[0])
+        return
+    await message.answer("Введите оклад (руб.):")
+    await state.set_state(SalaryCalc.salary)
+
+
 @router.message(SalaryCalc.salary)
 async def salary_amount(message: Message, state: FSMContext):
     try:
-        salary = int(message.text.replace(" ", "").replace(",", ".").split(".")[0])
-    except (ValueError, IndexError):
+        salary = _amount(message.text)
+    except ValueError:
         await message.answer("Введите число, например: 50000")
         return
+    await _ask_nadbavka(message, state, salary)
+
+
+async def _ask_nadbavka(message: Message, state: FSMContext, salary: int):
     await state.update_data(salary=salary)
     group_data = await state.get_data()
-    group = TERRITORY_GROUPS.get(group_data["territory"], {})
+    group = rates().TERRITORY_GROUPS.get(group_data["territory"], {})
     max_nadb = int(group.get("max_nadbavka", 0) * 100)
     await message.answer(
         f"Введите фактический % северной надбавки (0–{max_nadb}).\n"
-        f"Максимум для этой территории: {max_nadb}%"
+        f"Максимум для этой территории: {max_nadb}%",
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
+            InlineKeyboardButton(text="📅 Рассчитать по стажу", callback_data="nadb_service"),
+        ]]),
     )
     await state.set_state(SalaryCalc.nadbavka_pct)
 
 
+async def _send_salary(message: Message, territory: str, oklad: int, nadbavka_pct: int):
+    try:
+        result = compute_salary(territory, oklad, nadbavka_pct)
+    except ValueError as e:
+        await message.answer(f"❌ {e}")
+        return
+    await message.answer(
+        salary_html(result),
+        parse_mode="HTML",
+        reply_markup=_salary_kb(territory, oklad, nadbavka_pct, result.year),
+    )
+
+
 @router.message(SalaryCalc.nadbavka_pct)
 async def salary_result(message: Message, state: FSMContext):
     try:
-        nadbavka_pct = int(message.text.replace("%", "").strip())
+        nadbavka_pct = _percent(message.text)
     except ValueError:
         await message.answer("Введите число от 0 до 80, например: 30")
         return
     data = await state.get_data()
-    result = calc_salary(data["territory"], data["salary"], nadbavka_pct)
+    await state.clear()
+    await _send_salary(message, data["territory"], data["salary"], nadbavka_pct)
 
-    # Сохраняем параметры для Excel
-    await state.update_data(nadbavka_pct=nadbavka_pct, calc_type="salary")
 
-    await message.answer(result, parse_mode="HTML", reply_markup=_excel_kb("excel_salary"))
+@router.callback_query(SalaryCalc.nadbavka_pct, F.data == "nadb_service")
+async def salary_service_start(cb: CallbackQuery, state: FSMContext):
+    await cb.message.edit_text(
+        "Введите дату начала работы у работодателя и северный стаж до неё "
+        "(в месяцах, если был), например:\n<code>01.03.2024 18</code>",
+        parse_mode="HTML",
+    )
+    await state.set_state(SalaryCalc.service)
+    await cb.answer()
+
+
+@router.message(SalaryCalc.service)
+async def salary_service(message: Message, state: FSMContext):
+    parts = (message.text or "").split()
+    try:
+        hire = datetime.strptime(parts[0], "%d.%m.%Y").date()
+        prior = int(parts[1]) if len(parts) > 1 else 0
+        data = await state.get_data()
+        projection = project(data["territory"], hire, prior)
+    except (ValueError, IndexError):
+        await message.answer("Введите дату и стаж, например: 01.03.2024 18")
+        return
+    await state.clear()
+    await message.answer(nadbavka_html(projection), parse_mode="HTML")
+    await _send_salary(message, data["territory"], data["salary"], projection.pct)
 
 
-@router.callback_query(F.data == "excel_salary")
-async def excel_salary(cb: CallbackQuery, state: FSMContext):
+@router.callback_query(F.data.startswith("months_salary:"))
+async def salary_by_month(cb: CallbackQuery):
+    try:
+        _, territory, oklad, nadbavka_pct, year = cb.data.split(":")
+        months = salary_months(territory, int(oklad), int(nadbavka_pct), year=int(year))
+    except ValueError:
+        await cb.answer("Расчёт устарел — повторите его в калькуляторе.", show_alert=True)
+        return
+    await cb.message.answer(salary_months_html(months, int(year)), parse_mode="HTML")
+    await cb.answer()
+
+
+# ─── ОКЛАД ПО СУММЕ НА РУКИ ───────────────────
+
+@router.callback_query(F.data == "calc_net")
+async def net_start(cb: CallbackQuery, state: FSMContext):
+    await cb.message.edit_text(
+        "Выберите группу территорий Иркутской области:",
+        reply_markup=territory_kb(),
+    )
+    await state.set_state(NetCalc.territory)
+    await cb.answer()
+
+
+@router.callback_query(NetCalc.territory, F.data.startswith("terr_"))
+async def net_territory(cb: CallbackQuery, state: FSMContext):
+    await state.update_data(territory=cb.data.replace("terr_", ""))
+    await cb.message.edit_text("Сколько должно быть на руки в месяц (руб.)?")
+    await state.set_state(NetCalc.net)
+    await cb.answer()
+
+
+@router.message(NetCalc.net)
+async def net_amount(message: Message, state: FSMContext):
+    try:
+        net = _amount(message.text)
+    except ValueError:
+        await message.answer("Введите число, например: 80000")
+        return
+    await state.update_data(net=net)
+    data = await state.get_data()
+    max_nadb = int(rates().TERRITORY_GROUPS.get(data["territory"], {}).get("max_nadbavka", 0) * 100)
+    await message.answer(f"Введите % северной надбавки (0–{max_nadb}).")
+    await state.set_state(NetCalc.nadbavka_pct)
+
+
+@router.message(NetCalc.nadbavka_pct)
+async def net_result(message: Message, state: FSMContext):
+    try:
+        nadbavka_pct = _percent(message.text)
+    except ValueError:
+        await message.answer("Введите число от 0 до 80, например: 30")
+        return
     data = await state.get_data()
-    territory = data.get("territory", "Д")
-    salary = data.get("salary", 0)
-    nadbavka = data.get("nadbavka_pct", 0)
-
-    buf = export_salary_report(territory, salary, nadbavka)
-    await cb.message.answer_document(
-        document=BufferedInputFile(buf.read(), filename="salary_report.xlsx"),
-        caption="📊 Расчёт зарплаты — Excel",
+    await state.clear()
+    try:
+        solution = solve_gross(data["territory"], data["net"], nadbavka_pct)
+    except ValueError as e:
+        await message.answer(f"❌ {e}")
+        return
+    await message.answer(gross_from_net_html(solution), parse_mode="HTML")
+    await _send_salary(message, data["territory"], solution.oklad, nadbavka_pct)
+
+
+# ─── ЗАРПЛАТА СПИСКОМ ────────────────────────
+
+TABLE_MAX_BYTES = 10 * 1024 * 1024
+
+
+@router.callback_query(F.data == "calc_payroll")
+async def payroll_start(cb: CallbackQuery, state: FSMContext):
+    await cb.message.edit_text("Выберите тариф страховых взносов:", reply_markup=tariff_kb())
+    await state.set_state(PayrollBatch.tariff)
+    await cb.answer()
+
+
+@router.callback_query(PayrollBatch.tariff, F.data.startswith("tariff_"))
+async def payroll_tariff(cb: CallbackQuery, state: FSMContext):
+    await state.update_data(tariff=cb.data.replace("tariff_", ""))
+    await cb.message.edit_text(
+        "Пришлите файл XLSX или CSV со списком сотрудников.\n\n"
+        "Столбцы: <b>ФИО</b>, <b>группа</b> территорий (А–Д), <b>оклад</b>, "
+        "<b>надбавка %</b>, <b>дети</b> (кол-во, для вычета), "
+        "<b>премия</b> и <b>месяц</b> премии, <b>дата приёма</b> и северный "
+        "<b>стаж</b> до неё в месяцах — надбавка тогда считается по стажу "
+        "(необязательно).\n"
+        "Первая строка — заголовок; без заголовка столбцы берутся по порядку."
     )
+    await state.set_state(PayrollBatch.file)
     await cb.answer()
+
+
+async def _download_table(message: Message, kind: str) -> Optional[tuple[bytes, str]]:
+    """Скачивает присланную таблицу .xlsx/.csv; при ошибке отвечает и возвращает None."""
+    doc = message.document
+    filename = doc.file_name or ""
+    if not filename.lower().endswith((".xlsx", ".csv")):
+        await message.answer("Нужен файл .xlsx или .csv.")
+        return None
+    if (doc.file_size or 0) > TABLE_MAX_BYTES:
+        await message.answer("Файл слишком большой (максимум 10 МБ).")
+        return None
+
+    with track("download"):
+        file = await message.bot.get_file(doc.file_id)
+        data = (await message.bot.download_file(file.file_path)).read()
+    DOWNLOAD_BYTES.observe(len(data), kind=kind)
+    return data, filename
+
+
+@router.message(PayrollBatch.file, F.document)
+async def payroll_file(message: Message, state: FSMContext):
+    from bot.services.payroll_batch import compute_payroll, read_staff
+
+    downloaded = await _download_table(message, "payroll")
+    if downloaded is None:
+        return
+    data, filename = downloaded
+
+    try:
+        staff = await asyncio.to_thread(read_staff, data, filename)
+    except Exception as e:
+        await message.answer(f"❌ Не удалось прочитать файл: {e}")
+        return
+    if not len(staff):
+        await message.answer("❌ Нет ни одной корректной строки.\n" + "\n".join(staff.errors[:10]))
+        return
+    tariff_key = (await state.get_data()).get("tariff", "general")
     await state.clear()
 
+    payroll = await asyncio.to_thread(compute_payroll, staff, tariff_key)
+    data = await _render("xlsx:payroll", payroll)
+    if data is None:
+        await message.answer(RENDER_FAILED)
+        return
+    caption = payroll.summary()
+    if staff.errors:
+        caption += f"\n⚠️ Пропущено строк: {len(staff.errors)}"
+    await message.answer_document(
+        document=BufferedInputFile(data, filename="payroll_report.xlsx"),
+        caption=caption,
+    )
+    if staff.errors:
+        await message.answer("Пропущенные строки:\n" + "\n".join(staff.errors[:20]))
+
+
+# ─── АВТОПАРК ────────────────────────────────
+
+@router.callback_query(F.data == "calc_fleet")
+async def fleet_start(cb: CallbackQuery, state: FSMContext):
+    await cb.message.edit_text(
+        "Пришлите файл XLSX или CSV с автопарком.\n\n"
+        "Столбцы: <b>наименование</b>, <b>тип</b> (легковой, грузовой, автобус, "
+        "мотоцикл), <b>мощность</b> л.с., <b>месяцев</b> владения, <b>доля</b> в праве "
+        "(1/2, 50%), <b>первый месяц</b> владения (необязательно).\n"
+        "Первая строка — заголовок; без заголовка столбцы берутся по порядку."
+    )
+    await state.set_state(FleetBatch.file)
+    await cb.answer()
+
+
+@router.message(FleetBatch.file, F.document)
+async def fleet_file(message: Message, state: FSMContext):
+    from bot.services.transport_fleet import compute_fleet, read_fleet
+
+    downloaded = await _download_table(message, "fleet")
+    if downloaded is None:
+        return
+    data, filename = downloaded
+
+    try:
+        fleet = await asyncio.to_thread(read_fleet, data, filename)
+    except Exception as e:
+        await message.answer(f"❌ Не удалось прочитать файл: {e}")
+        return
+    if not len(fleet):
+        await message.answer("❌ Нет ни одной корректной строки.\n" + "\n".join(fleet.errors[:10]))
+        return
+    await state.clear()
+
+    result = await asyncio.to_thread(compute_fleet, fleet)
+    data = await _render("xlsx:fleet", result)
+    if data is None:
+        await message.answer(RENDER_FAILED)
+        return
+    caption = result.summary()
+    if fleet.errors:
+        caption += f"\n⚠️ Пропущено строк: {len(fleet.errors)}"
+    await message.answer_document(
+        document=BufferedInputFile(data, filename="transport_fleet.xlsx"),
+        caption=caption,
+    )
+    if fleet.errors:
+        await message.answer("Пропущенные строки:\n" + "\n".join(fleet.errors[:20]))
+
+
+# ─── СЕТКА «ЧТО ЕСЛИ» ────────────────────────
+
+@router.callback_query(F.data == "calc_sweep")
+async def sweep_start(cb: CallbackQuery, state: FSMContext):
+    await cb.message.edit_text("Выберите тариф страховых взносов:", reply_markup=tariff_kb())
+    await state.set_state(SweepCalc.tariff)
+    await cb.answer()
+
+
+@router.callback_query(SweepCalc.tariff, F.data.startswith("tariff_"))
+async def sweep_tariff(cb: CallbackQuery, state: FSMContext):
+    await state.update_data(tariff=cb.data.replace("tariff_", ""))
+    await cb.message.edit_text(
+        "Введите сетку одной строкой:\n"
+        "<b>оклады от-до шаг; группы; надбавки %</b>\n\n"
+        "Например: <code>50000-200000 10000; А Б Д; 0 30 50</code>\n"
+        "Группы и надбавки можно не указывать — тогда все группы и 0, 30, 50%.",
+        parse_mode="HTML",
+    )
+    await state.set_state(SweepCalc.params)
+    await cb.answer()
+
+
+@router.message(SweepCalc.params)
+async def sweep_result(message: Message, state: FSMContext):
+    from bot.services.salary_sweep import parse_grid, sweep
+
+    tariff_key = (await state.get_data()).get("tariff", "general")
+    try:
+        oklads, territories, pcts = parse_grid(message.text or "")
+        result = await asyncio.to_thread(sweep, oklads, territories, pcts, tariff_key)
+    except ValueError as e:
+        await message.answer(f"❌ {e}")
+        return
+    await state.clear()
+
+    data, chart = await asyncio.gather(
+        _render("xlsx:sweep", result), _render("png:sweep", result),
+    )
+    if data is None or chart is None:
+        await message.answer(RENDER_FAILED)
+        return
+    await message.answer_photo(
+        photo=BufferedInputFile(chart, filename="sweep.png"),
+        caption=f"📈 Стоимость сотрудника за год — {result.tariff}",
+    )
+    await message.answer_document(
+        document=BufferedInputFile(data, filename="salary_sweep.xlsx"),
+        caption=f"Точек: {len(result)} ({len(oklads)} окладов × {len(result.series)} вариантов)",
+    )
+
 
 # ─── НДФЛ ────────────────────────────────────
 
@@ -193,35 +766,35 @@ async def ndfl_start(cb: CallbackQuery, state: FSMContext):
 @router.message(NDFLCalc.income)
 async def ndfl_result(message: Message, state: FSMContext):
     try:
-        income = int(message.text.replace(" ", "").replace(",", ".").split(".")[0])
-    except (ValueError, IndexError):
+        income = _amount(message.text)
+    except ValueError:
         await message.answer("Введите число, например: 3000000")
         return
+    await state.clear()
+    await _send_ndfl(message, income)
 
-    await state.update_data(income=income, calc_type="ndfl")
-
-    result = calc_ndfl_progressive(income)
-    await message.answer(result, parse_mode="HTML", reply_markup=_excel_kb("excel_ndfl"))
-
-
-@router.callback_query(F.data == "excel_ndfl")
-async def excel_ndfl(cb: CallbackQuery, state: FSMContext):
-    data = await state.get_data()
-    income = data.get("income", 0)
 
-    buf = export_ndfl_report(income)
-    await cb.message.answer_document(
-        document=BufferedInputFile(buf.read(), filename="ndfl_report.xlsx"),
-        caption="📊 НДФЛ 2026 — Excel",
+async def _send_ndfl(message: Message, income: int):
+    result = compute_ndfl(income)
+    await message.answer(
+        ndfl_html(result),
+        parse_mode="HTML",
+        reply_markup=_report_kb("ndfl", income, result.year),
     )
-    await cb.answer()
-    await state.clear()
 
 
 # ─── СТРАХОВЫЕ ВЗНОСЫ ────────────────────────
 
 @router.callback_query(F.data == "calc_insurance")
 async def insurance_start(cb: CallbackQuery, state: FSMContext):
+    await cb.message.edit_text("Выберите тариф страховых взносов:", reply_markup=tariff_kb())
+    await state.set_state(InsuranceCalc.tariff)
+    await cb.answer()
+
+
+@router.callback_query(InsuranceCalc.tariff, F.data.startswith("tariff_"))
+async def insurance_tariff(cb: CallbackQuery, state: FSMContext):
+    await state.update_data(tariff=cb.data.replace("tariff_", ""))
     await cb.message.edit_text(
         "Введите ежемесячную начисленную зарплату (руб.):\n"
         "(включая РК и надбавку)"
@@ -233,29 +806,26 @@ async def insurance_start(cb: CallbackQuery, state: FSMContext):
 @router.message(InsuranceCalc.monthly_salary)
 async def insurance_result(message: Message, state: FSMContext):
     try:
-        salary = int(message.text.replace(" ", "").replace(",", ".").split(".")[0])
-    except (ValueError, IndexError):
+        salary = _amount(message.text)
+    except ValueError:
         await message.answer("Введите число, например: 100000")
         return
-
-    await state.update_data(monthly_salary=salary, calc_type="insurance")
-
-    result = calc_insurance_contributions(salary)
-    await message.answer(result, parse_mode="HTML", reply_markup=_excel_kb("excel_insurance"))
-
-
-@router.callback_query(F.data == "excel_insurance")
-async def excel_insurance(cb: CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    salary = data.get("monthly_salary", 0)
+    await state.clear()
+    await _send_insurance(message, salary, data.get("tariff", "general"))
+
 
-    buf = export_contributions_report(salary)
-    await cb.message.answer_document(
-        document=BufferedInputFile(buf.read(), filename="insurance_report.xlsx"),
-        caption="📊 Страховые взносы 2026 — Excel",
+async def _send_insurance(message: Message, salary: int, tariff_key: str):
+    try:
+        result = compute_contributions(salary, tariff_key)
+    except ValueError as e:
+        await message.answer(f"❌ {e}")
+        return
+    await message.answer(
+        contributions_html(result),
+        parse_mode="HTML",
+        reply_markup=_report_kb("insurance", salary, tariff_key, result.year),
     )
-    await cb.answer()
-    await state.clear()
 
 
 # ─── НДС ─────────────────────────────────────
@@ -269,8 +839,9 @@ async def nds_start(cb: CallbackQuery, state: FSMContext):
 
 @router.callback_query(NDSCalc.rate, F.data.startswith("nds_"))
 async def nds_rate_chosen(cb: CallbackQuery, state: FSMContext):
-    rate_map = {"nds_22": 22, "nds_10": 10, "nds_5": 5, "nds_7": 7}
-    rate = rate_map.get(cb.data, 22)
+    available = nds_rates()
+    rate = cb.data.removeprefix("nds_")
+    rate = int(rate) if rate.isdigit() and int(rate) in available else next(iter(available))
     await state.update_data(rate=rate)
     await cb.message.edit_text("Введите сумму без НДС (руб.):")
     await state.set_state(NDSCalc.amount)
@@ -280,14 +851,13 @@ async def nds_rate_chosen(cb: CallbackQuery, state: FSMContext):
 @router.message(NDSCalc.amount)
 async def nds_result(message: Message, state: FSMContext):
     try:
-        amount = int(message.text.replace(" ", "").replace(",", ".").split(".")[0])
-    except (ValueError, IndexError):
+        amount = _amount(message.text)
+    except ValueError:
         await message.answer("Введите число, например: 500000")
         return
     data = await state.get_data()
-    result = calc_nds(amount, data["rate"])
-    await message.answer(result, parse_mode="HTML")
     await state.clear()
+    await message.answer(calc_nds(amount, data["rate"]), parse_mode="HTML")
 
 
 # ─── ТРАНСПОРТНЫЙ НАЛОГ ──────────────────────
@@ -311,30 +881,30 @@ async def transport_vehicle(cb: CallbackQuery, state: FSMContext):
 @router.message(TransportCalc.horsepower)
 async def transport_result(message: Message, state: FSMContext):
     try:
-        hp = int(message.text.replace(" ", ""))
+        hp = _amount(message.text)
     except ValueError:
         await message.answer("Введите число, например: 150")
         return
     data = await state.get_data()
-    result = calc_transport_tax(data["vehicle_type"], hp)
-    await message.answer(result, parse_mode="HTML")
     await state.clear()
+    await message.answer(calc_transport_tax(data["vehicle_type"], hp), parse_mode="HTML")
 
 
 # ─── УСН (заглушка) ─────────────────────────
 
 @router.callback_query(F.data == "calc_usn")
 async def usn_info(cb: CallbackQuery):
+    usn = rates().USN_REGIONAL
     text = (
         "<b>УСН — Иркутская область</b>\n"
         "Закон ИО от 30.11.2015 № 112-ОЗ\n\n"
         f"<b>Доходы:</b>\n"
-        f"  Стандартная: {USN_REGIONAL['income_standard'] * 100}%\n"
-        f"  Льготная: {USN_REGIONAL['income_reduced'] * 100}%\n\n"
+        f"  Стандартная: {usn['income_standard'] * 100}%\n"
+        f"  Льготная: {usn['income_reduced'] * 100}%\n\n"
         f"<b>Доходы минус расходы:</b>\n"
-        f"  Стандартная: {USN_REGIONAL['income_expense_standard'] * 100}%\n"
-        f"  Льготная: {USN_REGIONAL['income_expense_reduced'] * 100}%\n\n"
-        f"Доля льготной деятельности: ≥{USN_REGIONAL['min_revenue_share'] * 100}%\n\n"
+        f"  Стандартная: {usn['income_expense_standard'] * 100}%\n"
+        f"  Льготная: {usn['income_expense_reduced'] * 100}%\n\n"
+        f"Доля льготной деятельности: ≥{usn['min_revenue_share'] * 100}%\n\n"
         "<b>Льготные виды деятельности:</b>\n"
         "• Обрабатывающие производства (раздел C ОКВЭД 2)\n"
         "• Здравоохранение и соц. услуги (раздел Q)\n"
@@ -1,11 +1,11 @@
-"""Общие хендлеры: /start, /help, /add_user, /remove_user, /reindex, главное меню."""
+"""Общие хендлеры: /start, /help, /add_user, /remove_user, /reindex, /reload_rates, /stats, /profile, главное меню."""
 
 import asyncio
 from pathlib import Path
 
 from aiogram import F, Router
 from aiogram.filters import Command, CommandStart
-from aiogram.types import KeyboardButton, Message, ReplyKeyboardMarkup
+from aiogram.types import BufferedInputFile, KeyboardButton, Message, ReplyKeyboardMarkup
 
 from bot.config.settings import allowed_users, save_users, settings
 from bot.services.chat_history import clear_history
@@ -56,6 +56,12 @@ async def cmd_commands(message: Message):
         "/help — справка о возможностях бота\n"
         "/commands — список всех команд\n"
         "/clear — очистить историю диалога\n"
+        "\n<b>Расчёт одной строкой:</b>\n\n"
+        "/salary <code>Г 60000 50</code> — зарплата (группа или город, оклад, надбавка %)\n"
+        "/ndfl <code>3000000</code> — НДФЛ с годового дохода\n"
+        "/nds <code>22 500000</code> — НДС (ставка, сумма)\n"
+        "/insurance <code>150000</code> — страховые взносы с зарплаты в месяц\n"
+        "/transport <code>truck 320</code> — транспортный налог (car, truck, bus, motorcycle)\n"
     )
     if _is_admin(message.from_user.id):
         text += (
@@ -64,6 +70,9 @@ async def cmd_commands(message: Message):
             "/remove_user <code>ID</code> — удалить пользователя\n"
             "/users — список пользователей\n"
             "/reindex — переиндексация базы знаний\n"
+            "/reload_rates — перечитать файлы ставок без перезапуска\n"
+            "/stats <code>[мин]</code> — производительность за период (по умолч. 60)\n"
+            "/profile <code>N</code> — профиль процесса за N секунд (файлом)\n"
         )
     await message.answer(text, parse_mode="HTML")
 
@@ -106,7 +115,7 @@ async def cmd_add_user(message: Message):
         return
 
     allowed_users.add(new_id)
-    save_users()
+    await asyncio.to_thread(save_users, sorted(allowed_users))
     await message.answer(f"✅ Пользователь <code>{new_id}</code> добавлен.", parse_mode="HTML")
 
 
@@ -134,7 +143,7 @@ async def cmd_remove_user(message: Message):
         return
 
     allowed_users.discard(rm_id)
-    save_users()
+    await asyncio.to_thread(save_users, sorted(allowed_users))
     await message.answer(f"🗑 Пользователь <code>{rm_id}</code> удалён.", parse_mode="HTML")
 
 
@@ -176,3 +185,73 @@ async def cmd_reindex(message: Message):
         )
     except Exception as e:
         await message.answer(f"❌ Ошибка индексации: {e}")
+
+
+# ─── Перезагрузка ставок (только админ) ────
+
+@router.message(Command("reload_rates"))
+async def cmd_reload_rates(message: Message):
+    if not _is_admin(message.from_user.id):
+        await message.answer("⛔ Эта команда доступна только администратору.")
+        return
+
+    from bot.config import registry
+
+    try:
+        sets = await asyncio.to_thread(registry.reload)
+    except ValueError as e:
+        await message.answer(f"❌ Ставки не обновлены: {e}")
+        return
+    lines = "\n".join(f"• {r.year} — {r.region} ({r.source})" for r in sets)
+    await message.answer(f"✅ Ставки перечитаны:\n{lines}")
+
+
+# ─── Производительность (только админ) ─────
+
+PROFILE_MAX_SECONDS = 120
+
+
+@router.message(Command("stats"))
+async def cmd_stats(message: Message):
+    if not _is_admin(message.from_user.id):
+        await message.answer("⛔ Эта команда доступна только администратору.")
+        return
+
+    from bot.utils.stats import format_stats
+
+    args = message.text.split(maxsplit=1)
+    minutes = int(args[1]) if len(args) > 1 and args[1].strip().isdigit() else 60
+    await message.answer(format_stats(max(minutes, 1) * 60), parse_mode="HTML")
+
+
+@router.message(Command("profile"))
+async def cmd_profile(message: Message):
+    if not _is_admin(message.from_user.id):
+        await message.answer("⛔ Эта команда доступна только администратору.")
+        return
+
+    args = message.text.split(maxsplit=1)
+    if len(args) < 2 or not args[1].strip().isdigit():
+        await message.answer(
+            "Использование: /profile <code>N</code> — секунды (1–"
+            f"{PROFILE_MAX_SECONDS})",
+            parse_mode="HTML",
+        )
+        return
+
+    from bot.utils.profiling import is_running, run_profile
+
+    if is_running():
+        await message.answer("⏳ Профилирование уже идёт — дождитесь результата.")
+        return
+    seconds = min(max(int(args[1].strip()), 1), PROFILE_MAX_SECONDS)
+    await message.answer(f"⏱ Профилирую {seconds} с...")
+    try:
+        report = await asyncio.to_thread(run_profile, seconds)
+    except Exception as e:
+        await message.answer(f"❌ Профиль не снят: {e}")
+        return
+    await message.answer_document(
+        document=BufferedInputFile(report.encode("utf-8"), filename="profile.txt"),
+        caption=f"📈 Профиль за {seconds} с",
+    )
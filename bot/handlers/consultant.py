@@ -1,23 +1,37 @@
-"""RAG-консультант: текст → поиск в ChromaDB → промпт с контекстом → ответ LLM."""
+"""RAG-консультант: текст → поиск в ChromaDB → промпт с контекстом → ответ LLM.
 
+Числовые вопросы («НДФЛ с 3 000 000») отвечаются калькулятором без LLM — intents.py,
+справочные («Какой МРОТ в 2026?») — фактами из ставок года — facts.py.
+"""
+
+import asyncio
 import io
 import re
+from functools import partial
 
 from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import (
-    BufferedInputFile,
     CallbackQuery,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
     Message,
 )
 
+from bot.config.registry import rates
+from bot.services import artifacts
 from bot.services.chat_history import add_message, get_history
+from bot.services.facts import answer as answer_fact
+from bot.services.facts import match as match_fact
+from bot.services.intents import answer as answer_intent
+from bot.services.intents import parse as parse_intent
 from bot.services.llm import ask_llm
 from bot.services.ocr import process_document_photo
-from bot.services.pdf_export import generate_pdf, generate_summary_prompt
+from bot.services.pdf_export import generate_summary_prompt
 from bot.services.rag import search_knowledge
 from bot.services.stt import transcribe_voice
+from bot.services.territory import find as find_territory
+from bot.utils.metrics import DOWNLOAD_BYTES, QUESTION_ROUTES, track
 
 router = Router()
 
@@ -60,6 +74,64 @@ SYSTEM_PROMPT = (
 )
 
 
+def _territory_hint(text: str) -> str:
+    """Справка о территории, названной в вопросе: группа, РК и надбавка."""
+    match = find_territory(text)
+    if match is None:
+        return ""
+    group = rates().TERRITORY_GROUPS[match.group]
+    return (
+        f"\n\n(Справка: {match.territory} — группа {match.group}, {group['name']}; "
+        f"РК {group['rk']}, северная надбавка до {int(group['max_nadbavka'] * 100)}%.)"
+    )
+
+
+async def _answer_locally(message: Message, text: str) -> bool:
+    """Числовой вопрос («НДФЛ с 3 000 000») — ответ калькулятора, справочный
+    («Какой МРОТ в 2026?») — факт из ставок; без поиска и LLM.
+    False — вопрос для консультанта."""
+    intent = parse_intent(text)
+    if intent is not None:
+        route, answer = "calculator", answer_intent(intent)
+    elif (fact := match_fact(text)) is not None:
+        route, answer = "facts", answer_fact(*fact)
+    else:
+        route, answer = "llm", None
+    QUESTION_ROUTES.inc(route=route)
+    if answer is None:
+        return False
+    add_message(message.from_user.id, "user", text)
+    add_message(message.from_user.id, "assistant", answer)
+    await message.answer(answer, parse_mode="HTML")
+    return True
+
+
+async def _download(message: Message, file_id: str, kind: str) -> bytes:
+    """Скачивает файл из Telegram с замером времени и размера."""
+    with track("download"):
+        file = await message.bot.get_file(file_id)
+        data = (await message.bot.download_file(file.file_path)).read()
+    DOWNLOAD_BYTES.observe(len(data), kind=kind)
+    return data
+
+
+async def _send_pdf(
+    message: Message, text: str, title: str, filename: str, caption: str, **kwargs,
+) -> None:
+    """PDF с текстом и HTML-подписью; тот же текст повторно уходит по file_id
+    без генерации. Подпись, которую Telegram не принял, — отдельным сообщением."""
+    cache_key = artifacts.key("pdf:text", (text, title))
+    send = partial(
+        artifacts.send_document, message.answer_document, cache_key, "pdf:text", (text, title), filename,
+    )
+    try:
+        await send(caption=caption, parse_mode="HTML", **kwargs)
+    except TelegramBadRequest:
+        # Байты уже в кэше artifacts — повтор без подписи не генерирует PDF заново
+        await send(**kwargs)
+        await message.answer(caption, parse_mode="HTML")
+
+
 @router.message(F.text == "📋 Консультация")
 async def start_consultation(message: Message):
     await message.answer(
@@ -77,9 +149,7 @@ async def handle_photo(message: Message):
 
     # Скачиваем фото максимального разрешения
     photo = message.photo[-1]
-    file = await message.bot.get_file(photo.file_id)
-    photo_bytes = await message.bot.download_file(file.file_path)
-    image_data = photo_bytes.read()
+    image_data = await _download(message, photo.file_id, "photo")
 
     result = _sanitize_html(await process_document_photo(image_data))
 
@@ -92,7 +162,6 @@ async def handle_photo(message: Message):
 
     # Сохраняем распознанный текст в caption для callback
     if len(result) > LONG_ANSWER_THRESHOLD:
-        pdf_buf = generate_pdf(result, title="Распознанный документ")
         summary = _sanitize_html(await ask_llm(
             system="Кратко опиши содержимое распознанного документа в 2-3 предложениях (до 800 символов). "
                    "Укажи тип, номер, дату, сумму, НДС. Отвечай на русском. Используй HTML.",
@@ -102,20 +171,7 @@ async def handle_photo(message: Message):
         if len(caption) > CAPTION_MAX_LEN:
             caption = caption[: CAPTION_MAX_LEN - 3] + "..."
 
-        try:
-            await message.answer_document(
-                document=BufferedInputFile(pdf_buf.read(), filename="document_ocr.pdf"),
-                caption=caption,
-                parse_mode="HTML",
-                reply_markup=kb,
-            )
-        except Exception:
-            pdf_buf.seek(0)
-            await message.answer_document(
-                document=BufferedInputFile(pdf_buf.read(), filename="document_ocr.pdf"),
-                reply_markup=kb,
-            )
-            await message.answer(caption, parse_mode="HTML")
+        await _send_pdf(message, result, "Распознанный документ", "document_ocr.pdf", caption, reply_markup=kb)
     else:
         await message.answer(result, parse_mode="HTML", reply_markup=kb)
 
@@ -132,6 +188,19 @@ async def ocr_nds_hint(cb: CallbackQuery):
 
 # ─── Обработка PDF-документов ──────────────
 
+def _extract_pdf_text(pdf_bytes: bytes) -> list[str]:
+    """Извлекает текст страниц через pdfplumber (синхронно — вызывать в потоке)."""
+    import pdfplumber
+
+    text_parts: list[str] = []
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text_parts.append(page_text)
+    return text_parts
+
+
 @router.message(F.document)
 async def handle_document(message: Message):
     """Извлечение текста из PDF и анализ через LLM."""
@@ -145,20 +214,10 @@ async def handle_document(message: Message):
 
     await message.answer("📄 Читаю PDF-документ...")
 
-    file = await message.bot.get_file(doc.file_id)
-    file_data = await message.bot.download_file(file.file_path)
-    pdf_bytes = file_data.read()
+    pdf_bytes = await _download(message, doc.file_id, "document")
 
-    # Извлекаем текст через pdfplumber
-    import pdfplumber
-
-    text_parts: list[str] = []
     try:
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
+        text_parts = await asyncio.to_thread(_extract_pdf_text, pdf_bytes)
     except Exception as e:
         await message.answer(f"⚠️ Не удалось прочитать PDF: {e}")
         return
@@ -193,7 +252,6 @@ async def handle_document(message: Message):
     ])
 
     if len(result) > LONG_ANSWER_THRESHOLD:
-        pdf_buf = generate_pdf(result, title="Анализ документа")
         summary = _sanitize_html(await ask_llm(
             system="Кратко опиши содержимое документа в 2-3 предложениях (до 800 символов). "
                    "Укажи тип, номер, дату, сумму, НДС. Отвечай на русском. Используй HTML.",
@@ -202,20 +260,7 @@ async def handle_document(message: Message):
         caption = f"📄 <b>Анализ документа</b>\n\n{summary}"
         if len(caption) > CAPTION_MAX_LEN:
             caption = caption[: CAPTION_MAX_LEN - 3] + "..."
-        try:
-            await message.answer_document(
-                document=BufferedInputFile(pdf_buf.read(), filename="analysis.pdf"),
-                caption=caption,
-                parse_mode="HTML",
-                reply_markup=kb,
-            )
-        except Exception:
-            pdf_buf.seek(0)
-            await message.answer_document(
-                document=BufferedInputFile(pdf_buf.read(), filename="analysis.pdf"),
-                reply_markup=kb,
-            )
-            await message.answer(caption, parse_mode="HTML")
+        await _send_pdf(message, result, "Анализ документа", "analysis.pdf", caption, reply_markup=kb)
     else:
         await message.answer(result, parse_mode="HTML", reply_markup=kb)
 
@@ -227,9 +272,7 @@ async def handle_voice(message: Message):
     """Распознавание голосового сообщения через Whisper API + консультация."""
     await message.answer("🎤 Распознаю голосовое сообщение...")
 
-    file = await message.bot.get_file(message.voice.file_id)
-    voice_data = await message.bot.download_file(file.file_path)
-    audio_bytes = voice_data.read()
+    audio_bytes = await _download(message, message.voice.file_id, "voice")
 
     text = await transcribe_voice(audio_bytes)
     if text.startswith("⚠️"):
@@ -237,6 +280,8 @@ async def handle_voice(message: Message):
         return
 
     await message.answer(f"📝 <b>Распознано:</b> {text}", parse_mode="HTML")
+    if await _answer_locally(message, text):
+        return
     await message.answer("⏳ Ищу информацию...")
 
     user_id = message.from_user.id
@@ -257,7 +302,6 @@ async def handle_voice(message: Message):
     add_message(user_id, "assistant", answer)
 
     if len(answer) > LONG_ANSWER_THRESHOLD:
-        pdf_buf = generate_pdf(answer, title="Консультация бот-бухгалтера")
         summary = _sanitize_html(await ask_llm(
             system="Ты помощник. Сделай краткое саммари в 2-3 предложениях (до 800 символов). "
                    "Сохрани ключевые цифры и выводы. Отвечай на русском. Используй HTML.",
@@ -266,18 +310,7 @@ async def handle_voice(message: Message):
         caption = f"📄 <b>Полный ответ — в PDF</b>\n\n{summary}"
         if len(caption) > CAPTION_MAX_LEN:
             caption = caption[: CAPTION_MAX_LEN - 3] + "..."
-        try:
-            await message.answer_document(
-                document=BufferedInputFile(pdf_buf.read(), filename="consultation.pdf"),
-                caption=caption,
-                parse_mode="HTML",
-            )
-        except Exception:
-            pdf_buf.seek(0)
-            await message.answer_document(
-                document=BufferedInputFile(pdf_buf.read(), filename="consultation.pdf"),
-            )
-            await message.answer(caption, parse_mode="HTML")
+        await _send_pdf(message, answer, "Консультация бот-бухгалтера", "consultation.pdf", caption)
     else:
         await message.answer(answer, parse_mode="HTML")
 
@@ -287,6 +320,8 @@ async def handle_voice(message: Message):
 @router.message(F.text)
 async def handle_question(message: Message):
     """Обработка любого текстового сообщения как вопроса (fallback)."""
+    if await _answer_locally(message, message.text):
+        return
     await message.answer("⏳ Ищу информацию...")
 
     user_id = message.from_user.id
@@ -295,11 +330,11 @@ async def handle_question(message: Message):
     context_chunks = await search_knowledge(message.text)
     context = "\n\n---\n\n".join(context_chunks) if context_chunks else ""
 
-    user_prompt = message.text
+    user_prompt = message.text + _territory_hint(message.text)
     if context:
         user_prompt = (
             f"Контекст из базы знаний:\n\n{context}\n\n---\n\n"
-            f"Вопрос пользователя: {message.text}"
+            f"Вопрос пользователя: {user_prompt}"
         )
 
     history = get_history(user_id)[:-1]  # без текущего сообщения — оно в user_prompt
@@ -307,8 +342,6 @@ async def handle_question(message: Message):
     add_message(user_id, "assistant", answer)
 
     if len(answer) > LONG_ANSWER_THRESHOLD:
-        # Генерируем PDF
-        pdf_buf = generate_pdf(answer, title="Консультация бот-бухгалтера")
 
         # Генерируем саммари
         summary = _sanitize_html(await ask_llm(
@@ -321,18 +354,6 @@ async def handle_question(message: Message):
         if len(caption) > CAPTION_MAX_LEN:
             caption = caption[: CAPTION_MAX_LEN - 3] + "..."
 
-        try:
-            await message.answer_document(
-                document=BufferedInputFile(pdf_buf.read(), filename="consultation.pdf"),
-                caption=caption,
-                parse_mode="HTML",
-            )
-        except Exception:
-            # Fallback: отправляем PDF без caption, затем текст отдельно
-            pdf_buf.seek(0)
-            await message.answer_document(
-                document=BufferedInputFile(pdf_buf.read(), filename="consultation.pdf"),
-            )
-            await message.answer(caption, parse_mode="HTML")
+        await _send_pdf(message, answer, "Консультация бот-бухгалтера", "consultation.pdf", caption)
     else:
         await message.answer(answer, parse_mode="HTML")
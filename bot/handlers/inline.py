@@ -0,0 +1,116 @@
+"""Inline-режим: «@бот ндфл 3000000» в любом чате → готовый расчёт.
+
+Запрос разбирается теми же правилами, что числовые и справочные вопросы
+консультанту (intents.py, facts.py). Готовые ответы лежат в LRU-кэше по
+разобранному запросу — «НДФЛ 3 000 000» и «ндфл 3000000» дают одну запись;
+Telegram дополнительно кэширует ответ у себя на INLINE_CACHE_TIME.
+
+Telegram шлёт запрос на каждое нажатие клавиши, поэтому промах кэша
+рендерится не сразу: через DEBOUNCE_S, и только если пользователь за это
+время не напечатал дальше («3», «30», «300»… → один расчёт «3000000»).
+Inline-режим включается у @BotFather (/setinline).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import re
+from typing import NamedTuple, Optional
+
+from aiogram import F, Router
+from aiogram.types import InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+
+from bot.config.registry import rates
+from bot.config.settings import allowed_users
+from bot.services import facts, intents
+from bot.utils.cache import LRUCache
+
+router = Router()
+
+DEBOUNCE_S = 0.4
+INLINE_CACHE_TIME = 3600        # сек — сколько Telegram отдаёт ответ сам
+MISS_CACHE_TIME = 5             # пустой ответ на недописанный запрос
+
+_TITLES = {
+    "ndfl": "НДФЛ",
+    "nds": "НДС",
+    "transport": "Транспортный налог",
+    "insurance": "Страховые взносы",
+    "salary": "Зарплата с РК",
+}
+_TAG = re.compile(r"<[^>]+>")
+
+
+class _Rendered(NamedTuple):
+    title: str
+    description: str
+    html: str
+
+
+_cache = LRUCache("inline", maxsize=512)
+# Пользователь → id его последнего запроса (для debounce)
+_latest: dict[int, str] = {}
+
+
+def _key(query: str) -> Optional[tuple]:
+    """Нормализованный ключ запроса: разобранный расчёт или факт и набор
+    ставок (после /reload_rates набор новый — старые записи не попадаются)."""
+    intent = intents.parse(query)
+    if intent is not None:
+        try:
+            return ("calc", intent, rates(intent.year))
+        except ValueError:
+            return None
+    found = facts.match(query)
+    if found is not None:
+        fact, r = found
+        return ("fact", fact, r)
+    return None
+
+
+def _render(key: tuple) -> _Rendered:
+    kind, item, r = key
+    if kind == "calc":
+        html, title = intents.answer(item._replace(year=r.year)), _TITLES[item.kind]
+    else:
+        html, title = facts.answer(item, r), f"{item.title} — {r.year}"
+    lines = [line.strip() for line in _TAG.sub("", html).splitlines() if line.strip()]
+    return _Rendered(title, " · ".join(lines[1:3]), html)
+
+
+def _article(key: tuple, rendered: _Rendered) -> InlineQueryResultArticle:
+    kind, item, r = key
+    ident = repr((kind, item if kind == "calc" else item.key, r.year))
+    return InlineQueryResultArticle(
+        id=hashlib.md5(ident.encode()).hexdigest(),
+        title=rendered.title,
+        description=rendered.description,
+        input_message_content=InputTextMessageContent(
+            message_text=rendered.html, parse_mode="HTML",
+        ),
+    )
+
+
+@router.inline_query(F.query)
+async def inline_calc(query: InlineQuery):
+    key = _key(query.query)
+    if key is None:
+        await query.answer([], cache_time=MISS_CACHE_TIME)
+        return
+
+    rendered = _cache.get(key)
+    if rendered is None:
+        user_id = query.from_user.id
+        _latest[user_id] = query.id
+        await asyncio.sleep(DEBOUNCE_S)
+        if _latest.get(user_id) != query.id:
+            return      # пользователь печатает дальше — ответим на следующий запрос
+        _latest.pop(user_id, None)
+        rendered = _render(key)
+        _cache.set(key, rendered)
+
+    # С белым списком кэш Telegram — по пользователю: иначе тот же запрос
+    # постороннего получит ответ из кэша, минуя AccessMiddleware
+    await query.answer([_article(key, rendered)], cache_time=INLINE_CACHE_TIME,
+                       is_personal=bool(allowed_users))
@@ -1,5 +1,10 @@
-"""Точка входа — aiogram 3.x polling."""
+"""Точка входа — aiogram 3.x polling.
 
+python -m bot.main                    — запуск бота
+python -m bot.main --profile-startup  — время импорта и RSS по модулям
+"""
+
+import argparse
 import asyncio
 import logging
 
@@ -8,8 +13,41 @@ from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 
 from bot.config.settings import settings
-from bot.handlers import calculator, common, consultant, documents
+from bot.handlers import calculator, common, consultant, documents, inline
 from bot.middlewares.access import AccessMiddleware
+from bot.middlewares.metrics import RouterMetricsMiddleware, UpdateQueueMiddleware
+from bot.services import render_pool
+from bot.utils.loop_monitor import loop_monitor
+from bot.utils.metrics import start_metrics_server
+from bot.utils.startup import prewarm_modules, profile_startup
+
+
+def build_dispatcher() -> Dispatcher:
+    """Диспетчер со всеми роутерами и middleware (используется и в нагрузочном тесте)."""
+    dp = Dispatcher()
+
+    # Middleware — whitelist по chat_id
+    dp.message.middleware(AccessMiddleware())
+    dp.callback_query.middleware(AccessMiddleware())
+    dp.inline_query.middleware(AccessMiddleware())
+
+    # Роутеры (порядок важен: consultant последний — ловит свободный текст)
+    routers = {
+        "common": common.router,
+        "calculator": calculator.router,
+        "documents": documents.router,
+        "inline": inline.router,
+        "consultant": consultant.router,
+    }
+    dp.include_routers(*routers.values())
+
+    # Метрики: время обработки по роутерам + апдейты в работе
+    dp.update.outer_middleware(UpdateQueueMiddleware())
+    for name, router in routers.items():
+        router.message.middleware(RouterMetricsMiddleware(name))
+        router.callback_query.middleware(RouterMetricsMiddleware(name))
+        router.inline_query.middleware(RouterMetricsMiddleware(name))
+    return dp
 
 
 async def main():
@@ -22,24 +60,45 @@ async def main():
         token=settings.bot_token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
+    dp = build_dispatcher()
 
-    dp = Dispatcher()
+    if settings.metrics_port:
+        await start_metrics_server(settings.metrics_host, settings.metrics_port)
+    if settings.api_port:
+        from bot.api import start_api_server
 
-    # Middleware — whitelist по chat_id
-    dp.message.middleware(AccessMiddleware())
-    dp.callback_query.middleware(AccessMiddleware())
+        await start_api_server(
+            settings.api_host, settings.api_port,
+            settings.api_max_concurrency, settings.api_token,
+        )
+    if settings.loop_lag_threshold_ms:
+        loop_monitor.start(threshold=settings.loop_lag_threshold_ms / 1000)
 
-    # Роутеры (порядок важен: consultant последний — ловит свободный текст)
-    dp.include_routers(
-        common.router,
-        calculator.router,
-        documents.router,
-        consultant.router,
-    )
+    # Тяжёлые сервисные модули грузятся лениво; прогрев — по желанию
+    if settings.prewarm_modules:
+        asyncio.get_running_loop().run_in_executor(None, prewarm_modules)
+
+    # Процессы рендеринга поднимаются в фоне, polling их не ждёт
+    warmup = asyncio.create_task(render_pool.start())
 
     logging.info("Бот-бухгалтер запущен")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        warmup.cancel()
+        render_pool.shutdown()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(prog="python -m bot.main")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="вывести время импорта и прирост RSS по модулям и выйти",
+    )
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        print(profile_startup())
+    else:
+        asyncio.run(main())
@@ -5,7 +5,7 @@ from __future__ import annotations
 from typing import Any, Awaitable, Callable, Optional
 
 from aiogram import BaseMiddleware
-from aiogram.types import CallbackQuery, Message, TelegramObject
+from aiogram.types import CallbackQuery, InlineQuery, Message, TelegramObject
 
 from bot.config.settings import allowed_users
 
@@ -25,6 +25,9 @@ class AccessMiddleware(BaseMiddleware):
             chat_id = event.chat.id
         elif isinstance(event, CallbackQuery) and event.message:
             chat_id = event.message.chat.id
+        elif isinstance(event, InlineQuery):
+            # Inline-запрос приходит без чата — проверяем самого пользователя
+            chat_id = event.from_user.id
 
         if chat_id is not None and chat_id not in allowed_users:
             if isinstance(event, Message):
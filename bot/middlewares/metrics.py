@@ -0,0 +1,54 @@
+"""Middleware метрик — время обработки апдейтов по роутерам и очередь диспетчера."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from bot.utils.metrics import QUEUE_DEPTH, UPDATE_ERRORS, UPDATE_SECONDS
+
+
+class RouterMetricsMiddleware(BaseMiddleware):
+    """Внутренний middleware роутера: срабатывает, только если хендлер найден."""
+
+    def __init__(self, router_name: str):
+        self.router_name = router_name
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        event_name = type(event).__name__
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            UPDATE_ERRORS.inc(router=self.router_name, event=event_name)
+            raise
+        finally:
+            UPDATE_SECONDS.observe(
+                time.perf_counter() - started,
+                router=self.router_name,
+                event=event_name,
+            )
+
+
+class UpdateQueueMiddleware(BaseMiddleware):
+    """Внешний middleware диспетчера: сколько апдейтов сейчас в обработке."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        QUEUE_DEPTH.inc(queue="updates")
+        try:
+            return await handler(event, data)
+        finally:
+            QUEUE_DEPTH.dec(queue="updates")
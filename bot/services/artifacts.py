@@ -0,0 +1,66 @@
+"""Кэш готовых отчётов: повторный Excel/PDF уходит по file_id Telegram.
+
+Ключ — (задание render_pool, отпечаток входных данных, набор ставок). Набор
+ставок входит в ключ объектом: после /reload_rates он новый, и старые
+отчёты больше не находятся. Первая отправка загружает байты, Telegram
+возвращает file_id документа — повтор (тот же отчёт другому пользователю)
+отправляется по нему: без генерации и без загрузки. Байты дополнительно
+лежат в LRU, ограниченном по суммарному размеру (ARTIFACT_CACHE_MB), — на
+случай, если отправка по file_id не удалась или первая ещё не завершилась.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, Message
+
+from bot.config.registry import RateSet
+from bot.config.settings import settings
+from bot.services.render_pool import render
+from bot.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_file_ids = LRUCache("artifact_file_id", maxsize=4096)
+_payloads = LRUCache(
+    "artifact_bytes", maxsize=1024,
+    max_weight=settings.artifact_cache_mb * 1024 * 1024, weigh=len,
+)
+
+
+def key(job: str, inputs: tuple, r: Optional[RateSet] = None) -> tuple:
+    """Ключ отчёта. inputs — то, от чего отчёт зависит (параметры расчёта
+    или текст); в ключе — только его хэш, длинный текст не хранится."""
+    digest = hashlib.sha256(repr(inputs).encode()).digest()
+    return job, digest, r
+
+
+async def send_document(
+    send: Callable[..., Awaitable[Message]],
+    cache_key: Hashable,
+    job: str,
+    args: tuple,
+    filename: str,
+    **kwargs: Any,
+) -> Message:
+    """Отправляет отчёт через send (message.answer_document и т.п.):
+    по file_id, из кэша байтов или после генерации render(job, *args)."""
+    file_id = _file_ids.get(cache_key)
+    if file_id is not None:
+        try:
+            return await send(document=file_id, **kwargs)
+        except TelegramBadRequest as e:
+            logger.warning("file_id отчёта %s не принят, загружаю заново: %s", job, e)
+
+    data = _payloads.get(cache_key)
+    if data is None:
+        data = await render(job, *args)
+        _payloads.set(cache_key, data)
+    sent = await send(document=BufferedInputFile(data, filename=filename), **kwargs)
+    if sent.document is not None:
+        _file_ids.set(cache_key, sent.document.file_id)
+    return sent
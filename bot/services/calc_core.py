@@ -0,0 +1,467 @@
+"""Расчётное ядро калькуляторов — чистые функции и неизменяемые результаты.
+
+Результат считается один раз на набор входных параметров (мемоизация по
+кортежу аргументов) и затем отдаётся любому рендереру: HTML для чата
+(calculators.py), XLSX (excel_export.py), PDF (pdf_export.py).
+
+Внутри — целые копейки (kopeck.py); Decimal появляется только в полях
+результата, значения и их представление те же, что при расчёте на Decimal.
+
+Ставки — из реестра на год расчёта (year=None — текущий). Кэш результатов
+ключуется набором ставок, поэтому после /reload_rates расчёт идёт заново.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import NamedTuple, Optional
+
+from bot.config.registry import RateSet, rates
+from bot.services import kopeck
+from bot.services.contributions import schedule_constant, tariff, within_month
+from bot.services.kopeck import half_up, mul, to_decimal
+from bot.services.tax_scale import Bracket, Scales, compiled, transport_scale, year_scales
+from bot.utils.cache import memoize
+
+TWO_PLACES = Decimal("0.01")
+
+MONTH_NAMES = (
+    "январь", "февраль", "март", "апрель", "май", "июнь",
+    "июль", "август", "сентябрь", "октябрь", "ноябрь", "декабрь",
+)
+
+VEHICLE_TYPE_NAMES = {
+    "car": "Легковой автомобиль",
+    "truck": "Грузовой автомобиль",
+    "bus": "Автобус",
+    "motorcycle": "Мотоцикл",
+}
+
+
+# Процент надбавки → доля, как Decimal(pct) / 100
+_SHARES = tuple(Decimal(pct) / 100 for pct in range(101))
+
+
+def _round(value: Decimal) -> Decimal:
+    return value.quantize(TWO_PLACES, ROUND_HALF_UP)
+
+
+class _Core(NamedTuple):
+    """Ставки года точными дробями."""
+    insurance: kopeck.Rate
+    # Группа → (доля РК сверх 1, максимальная надбавка)
+    groups: dict[str, tuple[kopeck.Rate, kopeck.Rate]]
+    nds: dict[int, Decimal]         # ставка НДС в процентах → доля
+    scales: Scales
+    # Ступени НДФЛ, пройденные целиком, — одинаковы для любого дохода выше
+    ndfl_brackets: tuple[NdflBracket, ...]
+    # Группа → (название, РК, максимальная надбавка, доп. отпуск, неделя для женщин)
+    territories: dict[str, tuple[str, Decimal, Decimal, int, int]]
+    mrot: int
+
+
+def _compile(r: RateSet) -> _Core:
+    s = r.derive(year_scales)
+    return _Core(
+        kopeck.rate(r.INSURANCE_BASE),
+        {
+            key: (kopeck.rate(g["rk"] - 1), kopeck.rate(g["max_nadbavka"]))
+            for key, g in r.TERRITORY_GROUPS.items()
+        },
+        {
+            int(rate * 100): rate
+            for rate in (r.NDS_BASE_RATE, r.NDS_REDUCED_RATE,
+                         r.NDS_USN_REDUCED_5, r.NDS_USN_REDUCED_7)
+        },
+        s,
+        tuple(_ndfl_bracket(s.ndfl.bracket(i, bound)) for i, bound in enumerate(s.ndfl.bounds)),
+        {
+            key: (g["name"], g["rk"], g["max_nadbavka"], g["extra_vacation"], g["women_work_week"])
+            for key, g in r.TERRITORY_GROUPS.items()
+        },
+        r.MROT,
+    )
+
+
+def _ndfl_bracket(b: Bracket) -> NdflBracket:
+    return NdflBracket(
+        lower=Decimal(b.lower),
+        upper=Decimal(b.upper),
+        rate=b.rate,
+        taxable=Decimal(b.taxable),
+        tax=to_decimal(b.tax),
+    )
+
+
+def nds_rates(year: Optional[int] = None) -> dict[int, Decimal]:
+    """Ставки НДС года: процент → доля (основная, льготная, УСН 5% и 7%)."""
+    return rates(year).derive(_compile).nds
+
+
+def apply_scale(income: int, scale: list) -> Decimal:
+    """НДФЛ по прогрессивной шкале [(верхняя граница | None, ставка), ...]."""
+    return to_decimal(compiled(scale).tax(income))
+
+
+# ─────────────────────────────────────────────
+# РЕЗУЛЬТАТЫ
+# ─────────────────────────────────────────────
+
+@dataclass(frozen=True, slots=True)
+class SalaryResult:
+    year: int
+    territory: str
+    territory_name: str
+    rk: Decimal
+    nadbavka: Decimal          # доля, уже ограниченная максимумом группы
+    oklad: Decimal
+    rk_sum: Decimal
+    nadb_sum: Decimal
+    gross: Decimal
+    ndfl_base_monthly: Decimal
+    ndfl_north_monthly: Decimal
+    ndfl_monthly: Decimal
+    net: Decimal
+    insurance_monthly: Decimal  # взносы работодателя по базовому тарифу
+    extra_vacation: int
+    women_work_week: int
+    mrot: int
+
+    @property
+    def rk_extra(self) -> Decimal:
+        return self.rk - 1
+
+    @property
+    def nadbavka_pct(self) -> int:
+        return int(self.nadbavka * 100)
+
+    @property
+    def below_mrot(self) -> bool:
+        return self.oklad < self.mrot
+
+    @property
+    def employer_cost(self) -> Decimal:
+        return self.gross + self.insurance_monthly
+
+
+@dataclass(frozen=True, slots=True)
+class NdflBracket:
+    lower: Decimal
+    upper: Decimal
+    rate: Decimal
+    taxable: Decimal
+    tax: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class NdflResult:
+    year: int
+    income: Decimal
+    tax: Decimal
+    effective_pct: Decimal
+    net: Decimal
+    net_monthly: Decimal
+    brackets: tuple[NdflBracket, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class ContributionMonth:
+    name: str
+    salary: Decimal
+    cumulative: Decimal
+    rate: Optional[Decimal]     # None — месяц перехода через ЕПБ
+    contribution: Decimal
+    crosses_limit: bool
+
+
+@dataclass(frozen=True, slots=True)
+class ContributionsResult:
+    year: int
+    monthly: Decimal
+    annual: Decimal
+    epb: int
+    rate_within: Decimal
+    rate_above: Decimal
+    monthly_within: Decimal     # взносы в месяц до исчерпания ЕПБ
+    total: Decimal
+    exhaust_month: str
+    months: tuple[ContributionMonth, ...]
+    tariff: str = "Основной тариф"
+    rate_reduced: Optional[Decimal] = None     # МСП: сверх порога за месяц
+    msp_threshold: int = 0                     # ₽ в месяц
+
+    @property
+    def schedule_total(self) -> Decimal:
+        return sum((m.contribution for m in self.months), Decimal(0))
+
+
+@dataclass(frozen=True, slots=True)
+class NdsResult:
+    year: int
+    rate_pct: int
+    rate: Decimal
+    amount: Decimal
+    nds: Decimal
+    total: Decimal
+    nds_from_total: Decimal
+
+    @property
+    def net_from_total(self) -> Decimal:
+        return self.total - self.nds_from_total
+
+
+@dataclass(frozen=True, slots=True)
+class TransportResult:
+    year: int
+    vehicle_type: str
+    vehicle_name: str
+    horsepower: int
+    rate: Decimal
+    tax: Decimal
+
+
+# ─────────────────────────────────────────────
+# РАСЧЁТЫ
+# ─────────────────────────────────────────────
+
+class SalaryKop(NamedTuple):
+    """Числа расчёта зарплаты в копейках (в месяц)."""
+    rk: int
+    nadbavka: int
+    gross: int
+    ndfl_base: int
+    ndfl_north: int
+    ndfl: int
+    net: int
+    insurance: int
+
+
+def salary_kop(
+    territory: str, oklad: int, nadbavka_pct: int, year: Optional[int] = None,
+) -> SalaryKop:
+    """Ядро compute_salary без Decimal — для пакетных и API-расчётов."""
+    return _salary_kop(rates(year).derive(_compile), territory, oklad, nadbavka_pct)
+
+
+def _salary_kop(core: _Core, territory: str, oklad: int, nadbavka_pct: int) -> SalaryKop:
+    # Ставки передаются готовыми: повторный rates() и derive на каждый
+    # расчёт съедали выигрыш копеечного ядра
+    try:
+        rk_rate, max_rate = core.groups[territory]
+    except KeyError:
+        raise ValueError("Неизвестная группа территорий.") from None
+    nadb_rate = (
+        kopeck.Rate(nadbavka_pct, 100)
+        if nadbavka_pct * max_rate.den < max_rate.num * 100 else max_rate
+    )
+
+    oklad_k = oklad * 100
+    rk_k = mul(oklad_k, rk_rate)
+    nadb_k = mul(oklad_k, nadb_rate)
+    gross_k = oklad_k + rk_k + nadb_k
+
+    # НДФЛ: основная часть — шкала 13–22%, северная — 13%/15%;
+    # годовые базы — в целых рублях
+    s = core.scales
+    ndfl_base = s.ndfl.tax(oklad * 12)
+    ndfl_north = s.north.tax(kopeck.trunc_div((rk_k + nadb_k) * 12, 100))
+    ndfl = half_up(ndfl_base + ndfl_north, 12)
+    return SalaryKop(
+        rk_k, nadb_k, gross_k,
+        half_up(ndfl_base, 12), half_up(ndfl_north, 12), ndfl,
+        gross_k - ndfl, mul(gross_k, core.insurance),
+    )
+
+
+def compute_salary(
+    territory: str, oklad: int, nadbavka_pct: int, year: Optional[int] = None,
+) -> SalaryResult:
+    """Зарплата с районным коэффициентом и северной надбавкой."""
+    return _salary(rates(year), territory, oklad, nadbavka_pct)
+
+
+@memoize("calc_salary")
+def _salary(r: RateSet, territory: str, oklad: int, nadbavka_pct: int) -> SalaryResult:
+    core = r.derive(_compile)
+    k = _salary_kop(core, territory, oklad, nadbavka_pct)
+    name, rk, max_nadbavka, extra_vacation, women_work_week = core.territories[territory]
+    share = _SHARES[nadbavka_pct] if 0 <= nadbavka_pct < len(_SHARES) else Decimal(nadbavka_pct) / 100
+    return SalaryResult(
+        year=r.year,
+        territory=territory,
+        territory_name=name,
+        rk=rk,
+        nadbavka=min(share, max_nadbavka),
+        oklad=Decimal(oklad),
+        rk_sum=to_decimal(k.rk),
+        nadb_sum=to_decimal(k.nadbavka),
+        gross=to_decimal(k.gross),
+        ndfl_base_monthly=to_decimal(k.ndfl_base),
+        ndfl_north_monthly=to_decimal(k.ndfl_north),
+        ndfl_monthly=to_decimal(k.ndfl),
+        net=to_decimal(k.net),
+        insurance_monthly=to_decimal(k.insurance),
+        extra_vacation=extra_vacation,
+        women_work_week=women_work_week,
+        mrot=core.mrot,
+    )
+
+
+def compute_ndfl(annual_income: int, year: Optional[int] = None) -> NdflResult:
+    """НДФЛ по прогрессивной шкале года с детализацией по ступеням."""
+    return _ndfl(rates(year), annual_income)
+
+
+@memoize("calc_ndfl")
+def _ndfl(r: RateSet, annual_income: int) -> NdflResult:
+    core = r.derive(_compile)
+    scale = core.scales.ndfl
+    # Один поиск ступени на налог и детализацию — как CompiledScale.tax,
+    # но налог верхней ступени нужен и отдельно
+    last = scale.index(annual_income)
+    lower = scale.lowers[last]
+    top_units = (annual_income - lower) * scale.scaled[last] * 100
+    tax_k = half_up(scale.cumulative[last] * 100 + top_units, scale.den)
+    brackets: tuple[NdflBracket, ...] = ()
+    if annual_income > 0:
+        # Нижние ступени — готовые, заново считается только верхняя
+        brackets = core.ndfl_brackets[:last] + (NdflBracket(
+            lower=Decimal(lower),
+            upper=Decimal(annual_income),
+            rate=scale.rates[last],
+            taxable=Decimal(annual_income - lower),
+            tax=to_decimal(half_up(top_units, scale.den)),
+        ),)
+
+    net_k = annual_income * 100 - tax_k
+    return NdflResult(
+        year=r.year,
+        income=Decimal(annual_income),
+        tax=to_decimal(tax_k),
+        # tax/income·100 в сотых долях процента
+        effective_pct=(
+            to_decimal(half_up(tax_k * 100, annual_income)) if annual_income else Decimal(0)
+        ),
+        net=to_decimal(net_k),
+        net_monthly=to_decimal(half_up(net_k, 12)),
+        brackets=brackets,
+    )
+
+
+class ContributionsKop(NamedTuple):
+    """Взносы в копейках: за год, номер месяца исчерпания ЕПБ (0 — не
+    исчерпана) и помесячный график."""
+    total: int
+    exhaust_month: int
+    months: tuple[int, ...]
+
+
+def contributions_kop(
+    monthly_salary: int, tariff_key: str = "general", year: Optional[int] = None,
+) -> ContributionsKop:
+    """Ядро compute_contributions без Decimal: год по реестру взносов
+    (contributions.py) для одного сотрудника."""
+    months, exhaust = schedule_constant(monthly_salary * 100, tariff_key, year)
+    return ContributionsKop(sum(months), exhaust, months)
+
+
+def compute_contributions(
+    monthly_salary: int, tariff_key: str = "general", year: Optional[int] = None,
+) -> ContributionsResult:
+    """Страховые взносы за год, месяц исчерпания ЕПБ и помесячный график."""
+    return _contributions(rates(year), monthly_salary, tariff_key)
+
+
+@memoize("calc_contributions")
+def _contributions(r: RateSet, monthly_salary: int, tariff_key: str) -> ContributionsResult:
+    t = tariff(tariff_key, r.year)
+    k = contributions_kop(monthly_salary, tariff_key, r.year)
+    epb = r.EPB
+    # Годовой ФОТ ровно в ЕПБ — база не превышена
+    exhaust_month = (
+        MONTH_NAMES[k.exhaust_month - 1]
+        if k.exhaust_month and monthly_salary * 12 > epb else "не исчерпана за год"
+    )
+
+    monthly = Decimal(monthly_salary)
+    # МСП: выплата сверх порога — месяц по смешанной ставке
+    mixed = t.reduced is not None and monthly_salary > t.threshold
+    # В графике не больше нескольких разных сумм — Decimal на каждую один раз
+    amounts = {v: to_decimal(v) for v in set(k.months)}
+    months: list[ContributionMonth] = []
+    for i, (name, contrib_k) in enumerate(zip(MONTH_NAMES, k.months), 1):
+        prev, cumulative = monthly_salary * (i - 1), monthly_salary * i
+        crosses = prev < epb < cumulative
+        if crosses or mixed:
+            rate = None
+        elif prev >= epb:
+            rate = t.above
+        else:
+            rate = t.within
+        months.append(ContributionMonth(
+            name=name,
+            salary=monthly,
+            cumulative=Decimal(cumulative),
+            rate=rate,
+            contribution=amounts[contrib_k],
+            crosses_limit=crosses,
+        ))
+
+    return ContributionsResult(
+        year=r.year,
+        monthly=monthly,
+        annual=Decimal(monthly_salary * 12),
+        epb=epb,
+        rate_within=t.within,
+        rate_above=t.above,
+        monthly_within=to_decimal(within_month(monthly_salary * 100, tariff_key, r.year)),
+        total=to_decimal(k.total),
+        exhaust_month=exhaust_month,
+        months=tuple(months),
+        tariff=t.name,
+        rate_reduced=t.reduced,
+        msp_threshold=t.threshold,
+    )
+
+
+def compute_nds(amount: int, rate_pct: int, year: Optional[int] = None) -> NdsResult:
+    """НДС — прямой и обратный расчёт."""
+    return _nds(rates(year), amount, rate_pct)
+
+
+@memoize("calc_nds")
+def _nds(r: RateSet, amount: int, rate_pct: int) -> NdsResult:
+    rate = r.derive(_compile).nds.get(rate_pct, r.NDS_BASE_RATE)
+    amount_d = Decimal(amount)
+    nds = _round(amount_d * rate)
+    total = amount_d + nds
+    return NdsResult(
+        year=r.year,
+        rate_pct=rate_pct,
+        rate=rate,
+        amount=amount_d,
+        nds=nds,
+        total=total,
+        nds_from_total=_round(total * (rate / (1 + rate))),
+    )
+
+
+def compute_transport_tax(
+    vehicle_type: str, horsepower: int, year: Optional[int] = None,
+) -> TransportResult:
+    """Транспортный налог по ставкам Иркутской области."""
+    return _transport(rates(year), vehicle_type, horsepower)
+
+
+@memoize("calc_transport")
+def _transport(r: RateSet, vehicle_type: str, horsepower: int) -> TransportResult:
+    rate = transport_scale(vehicle_type, r.year).rate(horsepower)
+    return TransportResult(
+        year=r.year,
+        vehicle_type=vehicle_type,
+        vehicle_name=VEHICLE_TYPE_NAMES.get(vehicle_type, vehicle_type),
+        horsepower=horsepower,
+        rate=rate,
+        tax=_round(Decimal(horsepower) * rate),
+    )
@@ -0,0 +1,249 @@
+"""Страховые взносы помесячно нарастающим итогом (ст. 431 НК РФ).
+
+Взносы за месяц = взносы с базы с начала года − уже начисленное, поэтому
+помесячный график всегда сходится с годовой суммой. По каждому сотруднику
+хранится накопленная база: она определяет, какая часть выплаты укладывается
+в ЕПБ. У МСП часть выплаты сверх 1,5 МРОТ за месяц идёт по пониженному
+тарифу. Состояние хранится по столбцам, как в ndfl_ytd: месяц всей
+организации считается за один проход, итоги — в стиле РСВ.
+"""
+
+from __future__ import annotations
+
+import math
+from decimal import Decimal
+from fractions import Fraction
+from typing import NamedTuple, Optional, Sequence
+
+from bot.config.registry import RateSet, rates
+from bot.services import kopeck
+from bot.services.kopeck import half_up
+
+
+class Tariff(NamedTuple):
+    name: str
+    within: Decimal                 # до ЕПБ
+    above: Decimal                  # свыше ЕПБ
+    reduced: Optional[Decimal]      # МСП: с части выплаты сверх порога за месяц
+    threshold: int = 0              # ₽ в месяц, порог для reduced (0 — без него)
+
+
+TARIFF_NAMES = {
+    "general": "Основной тариф",
+    "msp": "МСП (приоритетные ОКВЭД)",
+    "msp_manufacturing": "МСП — обрабатывающие производства",
+    "it": "IT-компании",
+}
+# Тариф → ставки набора: до ЕПБ, свыше ЕПБ, сверх порога МСП и сам порог
+_TARIFF_RATES = {
+    "general": ("INSURANCE_BASE", "INSURANCE_ABOVE", None, None),
+    "msp": ("INSURANCE_BASE", "INSURANCE_ABOVE", "MSP_REDUCED_RATE", "MSP_THRESHOLD"),
+    "msp_manufacturing": ("INSURANCE_BASE", "INSURANCE_ABOVE", "MANUFACTURING_MSP_RATE",
+                          "MANUFACTURING_MSP_THRESHOLD"),
+    "it": ("IT_RATE_WITHIN", "IT_RATE_ABOVE", None, None),
+}
+
+
+class _Compiled(NamedTuple):
+    den: int
+    within: int
+    above: int
+    reduced: int
+    threshold: int      # коп., 0 — без деления выплаты
+
+
+class _Year(NamedTuple):
+    tariffs: dict[str, Tariff]
+    compiled: dict[str, _Compiled]
+    epb: int                                # коп.
+    trauma: dict[int, kopeck.Rate]
+
+
+def _compile(tariff: Tariff) -> _Compiled:
+    """Ставки тарифа → числители над общим знаменателем."""
+    parts = [Fraction(tariff.within), Fraction(tariff.above), Fraction(tariff.reduced or 0)]
+    den = math.lcm(*(f.denominator for f in parts))
+    within, above, reduced = (int(f * den) for f in parts)
+    return _Compiled(den, within, above, reduced, tariff.threshold * 100)
+
+
+def _compile_year(r: RateSet) -> _Year:
+    tariffs = {
+        key: Tariff(
+            TARIFF_NAMES[key], r.values[within], r.values[above],
+            r.values[reduced] if reduced else None,
+            r.values[threshold] if threshold else 0,
+        )
+        for key, (within, above, reduced, threshold) in _TARIFF_RATES.items()
+    }
+    return _Year(
+        tariffs,
+        {key: _compile(t) for key, t in tariffs.items()},
+        r.EPB * 100,
+        {cls: kopeck.rate(rate) for cls, rate in r.TRAUMA_RATES.items()},
+    )
+
+
+def _year(year: Optional[int]) -> _Year:
+    return rates(year).derive(_compile_year)
+
+
+def _compiled(tariff_key: str, year: Optional[int]) -> tuple[_Compiled, int]:
+    """Тариф и ЕПБ (коп.) года."""
+    y = _year(year)
+    if tariff_key not in y.compiled:
+        raise ValueError(f"Неизвестный тариф: {tariff_key}")
+    return y.compiled[tariff_key], y.epb
+
+
+def tariff(key: str, year: Optional[int] = None) -> Tariff:
+    tariffs = _year(year).tariffs
+    if key not in tariffs:
+        raise ValueError(f"Неизвестный тариф: {key}")
+    return tariffs[key]
+
+
+def within_month(pay: int, tariff_key: str = "general", year: Optional[int] = None) -> int:
+    """Взносы с месячной выплаты (коп.), пока ЕПБ не исчерпана."""
+    (den, r_within, _, r_reduced, threshold), _ = _compiled(tariff_key, year)
+    if threshold and pay > threshold:
+        return half_up(threshold * r_within + (pay - threshold) * r_reduced, den)
+    return half_up(pay * r_within, den)
+
+
+def annual_constant(pay: int, tariff_key: str = "general", year: Optional[int] = None) -> int:
+    """Взносы за год при одинаковой выплате pay (коп.) каждый месяц — то же,
+    что 12 проводок ContributionLedger, но за O(1)."""
+    (den, r_within, r_above, r_reduced, threshold), epb = _compiled(tariff_key, year)
+    if pay <= 0:
+        return 0
+    regular = threshold if threshold and pay > threshold else pay
+    excess = pay - regular
+    crossing = -(-epb // pay)               # месяц, в котором база доходит до ЕПБ
+    if crossing > 12:
+        within = 12 * regular
+    else:
+        within = regular * (crossing - 1) + min(regular, epb - (crossing - 1) * pay)
+    return half_up(
+        within * r_within + (12 * regular - within) * r_above + 12 * excess * r_reduced, den
+    )
+
+
+def schedule_constant(
+    pay: int, tariff_key: str = "general", year: Optional[int] = None,
+) -> tuple[tuple[int, ...], int]:
+    """Помесячные взносы при одинаковой выплате pay (коп.) и месяц исчерпания
+    ЕПБ (0 — не исчерпана) — то же, что 12 проводок ContributionLedger на
+    одного сотрудника, без списков по сотрудникам и итогов организации."""
+    (den, r_within, r_above, r_reduced, threshold), epb = _compiled(tariff_key, year)
+    regular = threshold if threshold and pay > threshold else pay
+    excess_units = (pay - regular) * r_reduced
+    months = []
+    base = units = paid = exhaust = 0
+    for month in range(1, 13):
+        room = epb - base if base < epb else 0
+        within = regular if regular <= room else room
+        units += within * r_within + (regular - within) * r_above + excess_units
+        accrued = half_up(units, den)
+        months.append(accrued - paid)
+        paid = accrued
+        base += pay
+        if not exhaust and base >= epb:
+            exhaust = month
+    return tuple(months), exhaust
+
+
+class OrgMonth(NamedTuple):
+    """Итоги организации за месяц, копейки."""
+    month: int                # 1–12
+    base: int                 # выплаты, облагаемые взносами
+    base_above: int           # из них сверх ЕПБ
+    contributions: int
+    trauma: int
+    over_epb: int             # сотрудников с исчерпанной ЕПБ
+
+
+class ContributionLedger:
+    """Накопленная база и начисленные взносы по сотрудникам (копейки).
+    Ставки и ЕПБ фиксируются на год реестра при создании."""
+
+    __slots__ = ("size", "tariff", "compiled", "epb", "trauma_rate", "base", "units",
+                 "paid", "trauma_paid", "exhaust_month", "months")
+
+    def __init__(
+        self,
+        size: int,
+        tariff_key: str = "general",
+        trauma_class: Optional[int] = None,
+        year: Optional[int] = None,
+    ):
+        self.compiled, self.epb = _compiled(tariff_key, year)
+        trauma = _year(year).trauma
+        if trauma_class is not None and trauma_class not in trauma:
+            raise ValueError(f"Неизвестный класс профриска: {trauma_class}")
+        self.size = size
+        self.tariff = tariff_key
+        self.trauma_rate = trauma[trauma_class] if trauma_class else None
+        self.base = [0] * size
+        self.units = [0] * size            # точные взносы с начала года × den
+        self.paid = [0] * size
+        self.trauma_paid = [0] * size
+        self.exhaust_month = [0] * size    # месяц исчерпания ЕПБ, 0 — не исчерпана
+        self.months: list[OrgMonth] = []
+
+    def post(self, pay: Sequence[int]) -> tuple[list[int], list[int]]:
+        """Проводит месяц выплат. Возвращает взносы и взносы на травматизм
+        за этот месяц по каждому сотруднику."""
+        den, r_within, r_above, r_reduced, threshold = self.compiled
+        trauma = self.trauma_rate
+        epb = self.epb
+        month = len(self.months) + 1
+        out, out_trauma = [], []
+        base_above = over = 0
+        for i in range(self.size):
+            p = pay[i]
+            prev = self.base[i]
+            total = prev + p
+            self.base[i] = total
+            room = epb - prev if prev < epb else 0
+            if threshold and p > threshold:
+                regular, excess = threshold, p - threshold
+            else:
+                regular, excess = p, 0
+            within = regular if regular <= room else room
+            self.units[i] += within * r_within + (regular - within) * r_above + excess * r_reduced
+            accrued = half_up(self.units[i], den)
+            out.append(accrued - self.paid[i])
+            self.paid[i] = accrued
+
+            if trauma:
+                accrued = half_up(total * trauma.num, trauma.den)
+                out_trauma.append(accrued - self.trauma_paid[i])
+                self.trauma_paid[i] = accrued
+            else:
+                out_trauma.append(0)
+
+            if total >= epb:
+                over += 1
+                base_above += p if prev >= epb else total - epb
+                if not self.exhaust_month[i]:
+                    self.exhaust_month[i] = month
+        self.months.append(OrgMonth(
+            month, sum(pay), base_above, sum(out), sum(out_trauma), over,
+        ))
+        return out, out_trauma
+
+
+def simulate_year(
+    pay: Sequence[Sequence[int]],
+    tariff_key: str = "general",
+    trauma_class: Optional[int] = None,
+    year: Optional[int] = None,
+) -> ContributionLedger:
+    """Выплаты по месяцам (строки — месяцы, столбцы — сотрудники, копейки)
+    → проведённый реестр с годовыми итогами и помесячными OrgMonth."""
+    size = len(pay[0]) if pay else 0
+    ledger = ContributionLedger(size, tariff_key, trauma_class, year)
+    for month in pay:
+        ledger.post(month)
+    return ledger
@@ -0,0 +1,354 @@
+"""Справочные вопросы по ставкам — ответ из реестра, без RAG и LLM.
+
+«Какой МРОТ в 2026?», «ЕПБ 2026?», «ставка УСН льготная Иркутская
+область?», «срок уплаты НДФЛ» — ответ дословно лежит в наборе ставок года.
+Каждый факт — группы ключевых основ (в вопросе должна встретиться хотя бы
+одна основа из каждой группы) и шаблон ответа по RateSet; источник — из
+таблицы [sources] файла ставок. Индекс основ строится один раз на набор
+(RateSet.derive). Каждое значимое слово вопроса должно быть основой факта,
+его допустимым словом (Fact.extra) или общим (_FILLER): «взносы ИП за
+сотрудников» — не «взносы ИП за себя». Если подходящего факта нет или их
+несколько равных — match() возвращает None, и вопрос уходит консультанту.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date
+from decimal import Decimal
+from typing import Callable, NamedTuple, Optional
+
+from bot.config.rates import calc_min_salary
+from bot.config.registry import RateSet, rates
+
+# Длиннее — это уже не справка, а вопрос с обстоятельствами
+MAX_LENGTH = 120
+
+_WORD = re.compile(r"[a-zа-я0-9]+")
+# Слова, которые не меняют смысл справки: вопросительные, служебные, «год»
+_FILLER_WORDS = frozenset((
+    "как", "какой", "какая", "какое", "какие", "каков", "какова", "каковы",
+    "сколько", "что", "чем", "для", "при", "где", "это", "мне", "нам", "нас",
+    "все", "сейчас", "теперь", "будет", "был", "была", "были", "есть", "или",
+    "год", "году", "года", "годы",
+))
+_FILLER = ("текущ", "действ", "нынешн", "актуальн", "размер", "сумм", "величин",
+           "значени", "област", "росси", "подскаж", "скаж", "напомн", "уточн",
+           "составля", "установлен", "равн", "иркутск")
+_YEAR = re.compile(r"\b(20[2-3]\d)\b")
+# «как рассчитать», «нужно ли» — это консультация, а не справка
+_EXPLAIN = re.compile(
+    r"\b(?:почему|зачем|нужно ли|надо ли|можно ли|если|"
+    r"как (?:рассчит|считат|посчит|оформ|учест|отраз|получ|заполн))\w*"
+)
+
+
+def _rub(value: int) -> str:
+    return f"{value:,}".replace(",", " ") + " ₽"
+
+
+def _num(value: Decimal) -> str:
+    """10.50 → 10,5; 105.0 → 105."""
+    return f"{value:.2f}".rstrip("0").rstrip(".").replace(".", ",")
+
+
+def _pct(rate: Decimal) -> str:
+    return _num(rate * 100) + "%"
+
+
+def _date(value: str) -> str:
+    """ISO-дата из файла ставок → 31.12.2026; текстовые сроки — как есть."""
+    try:
+        return date.fromisoformat(value).strftime("%d.%m.%Y")
+    except ValueError:
+        return value
+
+
+def _scale(scale: tuple) -> str:
+    lines, lower = [], 0
+    for upto, rate in scale:
+        bounds = f"до {_rub(upto)}" if upto else f"свыше {_rub(lower)}"
+        lines.append(f"  {bounds} — {_pct(rate)}")
+        lower = upto
+    return "\n".join(lines)
+
+
+# ─────────────────────────────────────────────
+# ФАКТЫ
+# ─────────────────────────────────────────────
+
+def _mrot(r: RateSet) -> str:
+    groups = "\n".join(
+        f"  {key} ({g['name']}): {_rub(calc_min_salary(key, r.year))}"
+        for key, g in r.TERRITORY_GROUPS.items()
+    )
+    return f"{_rub(r.MROT)} в месяц.\n\nМинимум с РК и максимальной надбавкой:\n{groups}"
+
+
+def _epb(r: RateSet) -> str:
+    return (
+        f"Предельная база по страховым взносам: {_rub(r.EPB)} в год.\n"
+        f"До базы — {_pct(r.INSURANCE_BASE)}, свыше — {_pct(r.INSURANCE_ABOVE)}."
+    )
+
+
+def _msp(r: RateSet) -> str:
+    manufacturing = (
+        "порога" if r.MANUFACTURING_MSP_THRESHOLD == r.MSP_THRESHOLD else
+        f"{_rub(r.MANUFACTURING_MSP_THRESHOLD)} "
+        f"({str(r.MANUFACTURING_THRESHOLD_MROT_MULT).replace('.', ',')} МРОТ)"
+    )
+    return (
+        f"Выплаты до {_rub(r.MSP_THRESHOLD)} в месяц "
+        f"({str(r.MSP_THRESHOLD_MROT_MULT).replace('.', ',')} МРОТ) — {_pct(r.INSURANCE_BASE)}, "
+        f"сверх — {_pct(r.MSP_REDUCED_RATE)}.\n"
+        f"Обрабатывающие производства сверх {manufacturing} — {_pct(r.MANUFACTURING_MSP_RATE)}."
+    )
+
+
+def _ndfl(r: RateSet) -> str:
+    return (
+        f"Основная шкала (годовой доход):\n{_scale(r.NDFL_SCALE)}\n\n"
+        f"РК и северная надбавка:\n{_scale(r.NDFL_SCALE_NORTH)}\n\n"
+        f"Нерезиденты — {_pct(r.NDFL_NON_RESIDENT)}."
+    )
+
+
+def _children(r: RateSet) -> str:
+    d = r.NDFL_DEDUCTIONS
+    return (
+        f"В месяц: на 1-го ребёнка {_rub(d.child_1)}, на 2-го {_rub(d.child_2)}, "
+        f"на 3-го и следующих {_rub(d.child_3_plus)}; "
+        f"ребёнок-инвалид — {_rub(d.child_disabled)} (опекуну {_rub(d.child_disabled_guardian)}).\n"
+        f"Пока доход с начала года не превысит {_rub(d.child_income_limit)}."
+    )
+
+
+def _ndfl_deadlines(r: RateSet) -> str:
+    d = r.DEADLINES
+    return (
+        f"Уведомление: {d['ndfl_notification_25']}.\n"
+        f"НДФЛ, удержанный с 1 по 22 число: {d['ndfl_payment_1_22']}; "
+        f"с 23 по конец месяца: {d['ndfl_payment_23_end']}.\n"
+        f"6-НДФЛ: {d['6ndfl_quarterly']}."
+    )
+
+
+def _deadlines(r: RateSet) -> str:
+    d = r.DEADLINES
+    return (
+        f"ЕНП: {d['ens_payment']}.\n"
+        f"РСВ, 6-НДФЛ, НДС, прибыль: {d['rsv_quarterly']}.\n"
+        f"Бухотчётность: {_date(d['buh_annual'])}.\n"
+        f"УСН: ООО — {_date(d['usn_ooo'])}, ИП — {_date(d['usn_ip'])}.\n"
+        f"Взносы ИП: фиксированные — {_date(d['ip_fixed'])}, 1% — {_date(d['ip_1pct'])}."
+    )
+
+
+def _nds(r: RateSet) -> str:
+    return (
+        f"Основная — {_pct(r.NDS_BASE_RATE)}, льготная — {_pct(r.NDS_REDUCED_RATE)}, "
+        f"экспорт — {_pct(r.NDS_ZERO_RATE)}.\n"
+        f"УСН: {_pct(r.NDS_USN_REDUCED_5)} или {_pct(r.NDS_USN_REDUCED_7)}; "
+        f"освобождение при доходе до {_rub(r.NDS_USN_THRESHOLD)}."
+    )
+
+
+def _usn(r: RateSet) -> str:
+    return (
+        f"Доходы — {_pct(r.USN_INCOME_RATE)}, доходы минус расходы — "
+        f"{_pct(r.USN_INCOME_EXPENSE_RATE)} (минимальный налог {_pct(r.USN_MIN_TAX_RATE)}).\n"
+        f"Лимит дохода — {_rub(r.USN_INCOME_LIMIT)}."
+    )
+
+
+def _usn_regional(r: RateSet) -> str:
+    u = r.USN_REGIONAL
+    return (
+        f"Доходы: {_pct(u['income_standard'])}, льготная — {_pct(u['income_reduced'])}.\n"
+        f"Доходы минус расходы: {_pct(u['income_expense_standard'])}, "
+        f"льготная — {_pct(u['income_expense_reduced'])}.\n"
+        f"Доля льготной деятельности — не меньше {_pct(u['min_revenue_share'])}."
+    )
+
+
+def _profit(r: RateSet) -> str:
+    return (
+        f"{_pct(r.PROFIT_TAX_TOTAL)}: федеральный бюджет {_pct(r.PROFIT_TAX_FEDERAL)}, "
+        f"региональный {_pct(r.PROFIT_TAX_REGIONAL)}."
+    )
+
+
+def _ip(r: RateSet) -> str:
+    return (
+        f"Фиксированные: {_rub(r.IP_FIXED_CONTRIBUTIONS)}, срок — {_date(r.IP_FIXED_DEADLINE)}.\n"
+        f"{_pct(r.IP_ADDITIONAL_RATE)} с дохода свыше {_rub(r.IP_ADDITIONAL_INCOME_THRESHOLD)}, "
+        f"не больше {_rub(r.IP_ADDITIONAL_MAX)}, срок — {_date(r.IP_ADDITIONAL_DEADLINE)}."
+    )
+
+
+def _psn(r: RateSet) -> str:
+    return f"Лимит дохода на патенте — {_rub(r.PSN_INCOME_LIMIT)}."
+
+
+def _property(r: RateSet) -> str:
+    p = r.PROPERTY_TAX_ORG
+    return (
+        f"Имущество организаций: до {_pct(p['max_rate'])}, "
+        f"по кадастровой стоимости — {_pct(p['cadastral_rate'])}."
+    )
+
+
+def _rk(r: RateSet) -> str:
+    return "\n".join(
+        f"  {key} — {g['name']}: РК {g['rk']}, надбавка до {_pct(g['max_nadbavka'])}"
+        for key, g in r.TERRITORY_GROUPS.items()
+    )
+
+
+def _transport(r: RateSet) -> str:
+    names = {"car": "Легковые", "truck": "Грузовые", "bus": "Автобусы", "motorcycle": "Мотоциклы"}
+    lines = []
+    for vehicle, brackets in r.TRANSPORT_TAX.items():
+        steps = ", ".join(
+            f"{lo}–{hi} л.с. {_num(rate)} ₽" if hi < 9999 else f"от {lo} л.с. {_num(rate)} ₽"
+            for lo, hi, rate in brackets
+        )
+        lines.append(f"  {names.get(vehicle, vehicle)}: {steps}")
+    return "Ставки за 1 л.с.:\n" + "\n".join(lines)
+
+
+class Fact(NamedTuple):
+    key: str
+    title: str
+    # Группы основ: из каждой группы в вопросе должна быть хотя бы одна
+    keywords: tuple[tuple[str, ...], ...]
+    render: Callable[[RateSet], str]
+    source: str = ""        # ключ в RateSet.citations
+    # Основы, которые могут быть в вопросе, но не обязательны
+    extra: tuple[str, ...] = ()
+
+
+FACTS = (
+    Fact("mrot", "МРОТ", (("мрот", "минималк", "минимальная зарплат", "минимальный размер оплат"),),
+         _mrot, "mrot", ("труд",)),
+    Fact("epb", "Предельная база взносов", (("епб", "предельн"),), _epb, "insurance",
+         ("баз", "взнос", "страхов")),
+    Fact("msp", "Взносы МСП", (("мсп", "малого"), ("взнос", "тариф", "ставк", "порог")), _msp, "msp",
+         ("бизнес", "пониж", "предприят", "льгот")),
+    Fact("ndfl", "Ставки НДФЛ", (("ндфл", "подоходн"), ("ставк", "шкал", "прогресс", "процент")), _ndfl, "ndfl",
+         ("налог", "доход")),
+    Fact("children", "Вычеты на детей", (("вычет",), ("дет", "ребен")), _children, "ndfl_deductions",
+         ("стандартн", "ндфл", "размер")),
+    Fact("ndfl_deadlines", "Сроки по НДФЛ", (("ндфл",), ("срок", "когда", "до какого", "уплат", "перечисл")),
+         _ndfl_deadlines, extra=("плат", "числ", "налог")),
+    Fact("deadlines", "Ключевые сроки", (("срок", "календар"), ("уплат", "сдач", "отчет", "налог")), _deadlines,
+         extra=("плат", "взнос", "основн", "ключев")),
+    Fact("nds", "Ставки НДС", (("ндс",), ("ставк", "процент")), _nds, "nds", ("налог",)),
+    Fact("usn", "УСН", (("усн", "упрощен"), ("ставк", "лимит", "процент")), _usn, "usn",
+         ("налог", "доход", "расход")),
+    Fact("usn_regional", "УСН — льготы Иркутской области",
+         (("усн", "упрощен"), ("льгот", "иркутск", "регион")), _usn_regional, "usn_regional",
+         ("ставк", "пониж", "налог", "процент")),
+    Fact("profit", "Налог на прибыль", (("прибыл",), ("ставк", "налог", "процент")), _profit,
+         extra=("организац",)),
+    Fact("ip", "Взносы ИП за себя", (("ип", "предпринимател"), ("взнос", "фиксирован")), _ip,
+         extra=("себ", "страхов", "плат", "уплат")),
+    Fact("psn", "Патент", (("патент", "псн"), ("лимит", "доход")), _psn, extra=("ип",)),
+    Fact("property", "Налог на имущество", (("имуществ",), ("ставк", "налог")), _property, "property_tax",
+         ("организац",)),
+    Fact("rk", "Районные коэффициенты", (("рк", "районн", "северн"),), _rk, "rk",
+         ("коэф", "надбавк", "групп", "территор")),
+    Fact("transport", "Транспортный налог", (("транспортн",), ("ставк", "налог")), _transport,
+         "transport_tax"),
+)
+
+
+# ─────────────────────────────────────────────
+# ПОИСК
+# ─────────────────────────────────────────────
+
+class _Index(NamedTuple):
+    # основа → (факт, группа); группа -1 — допустимая основа (Fact.extra),
+    # факт -1 — общая (_FILLER)
+    stems: dict[str, list[tuple[int, int]]]
+    lengths: tuple[int, ...]                    # длины основ — для срезов слова
+
+
+def _compile(r: RateSet) -> _Index:
+    stems: dict[str, list[tuple[int, int]]] = {}
+    for i, fact in enumerate(FACTS):
+        for g, group in enumerate(fact.keywords):
+            for stem in group:
+                stems.setdefault(stem, []).append((i, g))
+        for stem in fact.extra:
+            stems.setdefault(stem, []).append((i, -1))
+    for stem in _FILLER:
+        stems.setdefault(stem, []).append((-1, -1))
+    return _Index(stems, tuple(sorted({len(s) for s in stems if " " not in s})))
+
+
+def _normalize(text: str) -> str:
+    return text.casefold().replace("ё", "е")
+
+
+def match(text: str) -> Optional[tuple[Fact, RateSet]]:
+    """Факт и набор ставок года для справочного вопроса или None."""
+    t = _normalize(text)
+    if len(t) > MAX_LENGTH or _EXPLAIN.search(t):
+        return None
+    m = _YEAR.search(t)
+    try:
+        r = rates(int(m.group(1)) if m else None)
+    except ValueError:
+        return None
+    index = r.derive(_compile)
+
+    groups: dict[int, set[int]] = {}
+    words: dict[int, int] = {}          # факт → сколько слов вопроса совпало
+
+    def hit(places: list[tuple[int, int]]) -> None:
+        for fact, group in places:
+            if group < 0:
+                continue
+            groups.setdefault(fact, set()).add(group)
+            words[fact] = words.get(fact, 0) + 1
+
+    # Фразы из нескольких слов («до какого») — по тексту целиком
+    phrases = []
+    for stem, places in index.stems.items():
+        if " " in stem and (at := t.find(stem)) >= 0:
+            hit(places)
+            phrases.append((at, at + len(stem), places))
+
+    content: list[set[int]] = []        # значимые слова → факты, которым они известны
+    for m in _WORD.finditer(t):
+        word = m.group()
+        places = [p for n in index.lengths for p in index.stems.get(word[:n], ())]
+        hit(places)
+        places += [p for start, end, ps in phrases if start < m.end() and m.start() < end for p in ps]
+        if len(word) > 2 and not word.isdigit() and word not in _FILLER_WORDS:
+            content.append({fact for fact, _ in places})
+
+    # Полные совпадения без посторонних слов; при равенстве групп — тот, где совпало больше слов
+    complete = sorted(
+        (
+            (len(g), words[i], i) for i, g in groups.items()
+            if len(g) == len(FACTS[i].keywords) and all(i in c or -1 in c for c in content)
+        ),
+        reverse=True,
+    )
+    if not complete:
+        return None
+    if len(complete) > 1 and complete[0][:2] == complete[1][:2]:
+        return None
+    return FACTS[complete[0][2]], r
+
+
+def answer(fact: Fact, r: RateSet) -> str:
+    """HTML-ответ: заголовок с годом, значения, источник."""
+    text = f"<b>{fact.title} — {r.year}</b>\n\n{fact.render(r)}"
+    source = r.citations.get(fact.source)
+    if source:
+        text += f"\n\n<i>Источник: {source}</i>"
+    return text
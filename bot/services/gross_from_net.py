@@ -0,0 +1,106 @@
+"""Обратный расчёт: какой оклад дать, чтобы «на руки» было не меньше заданного.
+
+«На руки» как функция оклада кусочно-линейна: изломы — там, где годовая
+основная часть (12 × оклад) или северная (12 × оклад × (РК − 1 + надбавка))
+переходит границу своей шкалы НДФЛ. Для пары (группа, надбавка) изломы и
+значения в них считаются один раз точными дробями; оклад для суммы — bisect
+по таблице и решение линейного уравнения на отрезке. Затем поправка до
+целого рубля по копеечному ядру (salary_kop), как в калькуляторе.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right
+from fractions import Fraction
+from typing import NamedTuple, Optional, Sequence
+
+from bot.config.registry import RateSet, rates
+from bot.services.calc_core import salary_kop
+from bot.services.tax_scale import CompiledScale, year_scales
+from bot.utils.cache import memoize
+
+
+class GrossSolution(NamedTuple):
+    oklad: int          # ₽
+    gross: int          # коп.
+    net: int            # коп., не меньше цели
+    target: int         # коп.
+
+    @property
+    def overshoot(self) -> int:
+        return self.net - self.target
+
+
+def _tax(scale: CompiledScale, income: Fraction) -> Fraction:
+    """Налог без округления, ₽ (доход — дробь рублей)."""
+    i = bisect_left(scale.bounds, income)
+    return Fraction(scale.cumulative[i] + (income - scale.lowers[i]) * scale.scaled[i], scale.den)
+
+
+class _Segments(NamedTuple):
+    starts: tuple[Fraction, ...]    # оклад в начале отрезка, ₽
+    nets: tuple[Fraction, ...]      # «на руки» в начале отрезка, ₽
+    slopes: tuple[Fraction, ...]
+
+
+@memoize("net_segments")
+def _segments(r: RateSet, territory: str, nadbavka_pct: int) -> _Segments:
+    group = r.TERRITORY_GROUPS[territory]
+    k = Fraction(group["rk"] - 1) + min(Fraction(nadbavka_pct, 100), Fraction(group["max_nadbavka"]))
+    s = r.derive(year_scales)
+
+    def net(oklad: Fraction) -> Fraction:
+        return oklad * (1 + k) - (_tax(s.ndfl, 12 * oklad) + _tax(s.north, 12 * oklad * k)) / 12
+
+    points = {Fraction(0)}
+    points.update(Fraction(b, 12) for b in s.ndfl.bounds)
+    if k:
+        points.update(Fraction(b) / (12 * k) for b in s.north.bounds)
+    starts = tuple(sorted(points))
+    nets = tuple(net(s) for s in starts)
+    ends = starts[1:] + (starts[-1] + 1,)
+    slopes = tuple(
+        (net(e) - n) / (e - s) for s, e, n in zip(starts, ends, nets)
+    )
+    return _Segments(starts, nets, slopes)
+
+
+def solve_many(
+    territory: str,
+    nadbavka_pct: int,
+    targets: Sequence[int],
+    year: Optional[int] = None,
+) -> list[GrossSolution]:
+    """Минимальный оклад (целые ₽) для каждой суммы «на руки» (копейки)."""
+    r = rates(year)
+    if territory not in r.TERRITORY_GROUPS:
+        raise ValueError("Неизвестная группа территорий.")
+    seg = _segments(r, territory, nadbavka_pct)
+
+    def _net_kop(oklad: int) -> int:
+        return salary_kop(territory, oklad, nadbavka_pct, r.year).net
+
+    out = []
+    for target in targets:
+        if target <= 0:
+            out.append(GrossSolution(0, 0, 0, target))
+            continue
+        goal = Fraction(target, 100)
+        j = bisect_right(seg.nets, goal) - 1
+        oklad = math.ceil(seg.starts[j] + (goal - seg.nets[j]) / seg.slopes[j])
+        # Поправка на округления: РК и надбавка — до копейки, налог — по шкале
+        while _net_kop(oklad) < target:
+            oklad += 1
+        while oklad > 0 and _net_kop(oklad - 1) >= target:
+            oklad -= 1
+        k = salary_kop(territory, oklad, nadbavka_pct, r.year)
+        out.append(GrossSolution(oklad, k.gross, k.net, target))
+    return out
+
+
+def solve_gross(
+    territory: str, net: int, nadbavka_pct: int, year: Optional[int] = None,
+) -> GrossSolution:
+    """Оклад, при котором «на руки» не меньше net (₽)."""
+    return solve_many(territory, nadbavka_pct, (net * 100,), year)[0]
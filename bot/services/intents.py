@@ -0,0 +1,170 @@
+"""Числовые вопросы консультанту, на которые отвечает калькулятор, а не LLM.
+
+«НДФЛ с 3 000 000», «НДС 22% с 500000», «транспортный налог 150 л.с.»,
+«взносы с зарплаты 150 тыс», «зарплата в Братске оклад 60000 надбавка 50%»:
+правила ниже выделяют вид расчёта и параметры, ответ — те же calc_* из
+calculators.py. Если правило не уверено (вопрос «как/почему», два вида
+расчёта сразу, не хватает числа) — parse() возвращает None, и вопрос идёт
+в RAG + LLM как раньше.
+"""
+
+from __future__ import annotations
+
+import re
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+from bot.config.registry import rates
+from bot.services.calc_core import nds_rates
+from bot.services.calculators import (
+    calc_insurance_contributions,
+    calc_ndfl_progressive,
+    calc_nds,
+    calc_salary,
+    calc_transport_tax,
+)
+from bot.services.territory import find as find_territory
+
+# Длиннее — уже не «посчитай», а рассказ с вопросом
+MAX_LENGTH = 160
+# Больше — не расчёт, а опечатка или проверка бота
+MAX_AMOUNT = 10**13
+
+# Вид расчёта → признак в тексте
+_KINDS = {
+    "ndfl": re.compile(r"\bндфл\b|подоходн"),
+    "nds": re.compile(r"\bндс\b"),
+    "transport": re.compile(r"транспортн\w* налог"),
+    "insurance": re.compile(r"взнос"),
+    "salary": re.compile(r"зарплат|оклад|\bзп\b"),
+}
+# Вопросы «почему/как/можно ли» — к консультанту, даже если есть число
+_EXPLAIN = re.compile(
+    r"\b(?:как|почему|зачем|когда|куда|нужно ли|надо ли|можно ли|ли|если|"
+    r"облага\w*|вычет\w*|срок\w*|деклараци\w*|отчет\w*|штраф\w*)\b"
+)
+
+# «3 000 000», «3,5 млн», «500 тыс», «150к»
+_AMOUNT = re.compile(
+    r"(?<![\d,.])(\d{1,3}(?:[  ]\d{3})+|\d+(?:[.,]\d+)?)\s*"
+    r"(млн|миллион\w*|тыс\w*|к\b)?"
+)
+_MULTIPLIERS = {"млн": 1_000_000, "миллион": 1_000_000, "тыс": 1_000, "к": 1_000}
+_PERCENT = re.compile(r"(\d{1,2})\s*%")
+_HORSEPOWER = re.compile(r"(\d{1,4})\s*(?:л\.?\s*с\.?|лс\b|лошад)")
+# «в 2025 году», «на 2026», «2025 г.» — год ставок, а не сумма
+_YEAR = re.compile(r"\b(?:в|на|за)\s+(20[2-3]\d)(?!\d)|\b(20[2-3]\d)\s*(?:г\b\.?|год\w*)")
+_MONTHLY = re.compile(r"в месяц|ежемесячн|/\s*мес|месячн")
+_ANNUAL = re.compile(r"в год|за год|годов")
+
+_VEHICLES = (
+    ("truck", re.compile(r"грузов")),
+    ("bus", re.compile(r"автобус")),
+    ("motorcycle", re.compile(r"мотоцикл|мото\b|мопед")),
+)
+
+
+class Intent(NamedTuple):
+    kind: str           # ndfl | nds | transport | insurance | salary
+    params: tuple
+    year: Optional[int] = None
+
+
+def _normalize(text: str) -> str:
+    return text.casefold().replace("ё", "е")
+
+
+def _amounts(text: str) -> Optional[list[int]]:
+    """Суммы в рублях по порядку: проценты, л.с. и год уже вырезаны.
+    None — если число можно прочесть по-разному: «1.000.000», «1,000»
+    (разряды через точку или запятую) — или оно больше MAX_AMOUNT."""
+    out = []
+    for m in _AMOUNT.finditer(text):
+        number, unit = re.sub(r"[  ]", "", m.group(1)), m.group(2)
+        parts = re.split(r"[.,]", number)
+        if len(parts) > 2 or (len(parts) == 2 and len(parts[1]) == 3 and not unit):
+            return None
+        value = Decimal(".".join(parts))
+        if unit:
+            value *= next(v for k, v in _MULTIPLIERS.items() if unit.startswith(k))
+        if value > MAX_AMOUNT:
+            return None
+        out.append(int(value))
+    return out
+
+
+def parse(text: str) -> Optional[Intent]:
+    """Вид расчёта и параметры или None, если вопрос не для калькулятора."""
+    t = _normalize(text)
+    if len(t) > MAX_LENGTH or _EXPLAIN.search(t):
+        return None
+    kinds = [k for k, pattern in _KINDS.items() if pattern.search(t)]
+    # «Взносы с зарплаты 150 000», «НДФЛ с зарплаты» — про налог, а не про оклад
+    from_salary = "salary" in kinds and len(kinds) == 2
+    if from_salary:
+        kinds.remove("salary")
+    if len(kinds) != 1:
+        return None
+    kind = kinds[0]
+
+    year = None
+    m = _YEAR.search(t)
+    if m:
+        year = int(m.group(1) or m.group(2))
+        t = t[:m.start()] + " " + t[m.end():]
+        # Года без файла ставок — к консультанту, а не «ставки не загружены»
+        try:
+            rates(year)
+        except ValueError:
+            return None
+
+    if kind == "transport":
+        m = _HORSEPOWER.search(t)
+        if not m:
+            return None
+        vehicle = next((v for v, p in _VEHICLES if p.search(t)), "car")
+        return Intent("transport", (vehicle, int(m.group(1))), year)
+
+    percents = [int(p) for p in _PERCENT.findall(t)]
+    amounts = _amounts(_PERCENT.sub(" ", t))
+    if amounts is None or (len(amounts) != 1 and kind != "salary"):
+        return None
+    # Одинокое «2026» — скорее год, чем сумма
+    if amounts and 2020 <= amounts[0] <= 2039 and len(amounts) == 1:
+        return None
+
+    if kind == "ndfl":
+        monthly = _MONTHLY.search(t) or (from_salary and not _ANNUAL.search(t))
+        income = amounts[0] * (12 if monthly else 1)
+        return Intent("ndfl", (income,), year)
+    if kind == "nds":
+        try:
+            available = nds_rates(year)
+        except ValueError:
+            return None
+        if len(percents) > 1 or (percents and percents[0] not in available):
+            return None
+        return Intent("nds", (amounts[0], percents[0] if percents else next(iter(available))), year)
+    if kind == "insurance":
+        monthly = amounts[0] // 12 if _ANNUAL.search(t) else amounts[0]
+        return Intent("insurance", (monthly,), year)
+
+    # Зарплата: территория, один оклад и один процент надбавки
+    territory = find_territory(t, year)
+    if territory is None or len(amounts) != 1 or len(percents) != 1:
+        return None
+    return Intent("salary", (territory.group, amounts[0], percents[0]), year)
+
+
+_ANSWERS = {
+    "ndfl": calc_ndfl_progressive,
+    "nds": calc_nds,
+    "transport": calc_transport_tax,
+    "insurance": calc_insurance_contributions,
+    "salary": calc_salary,
+}
+
+
+def answer(intent: Intent) -> str:
+    """HTML-ответ калькулятора для распознанного вопроса."""
+    return _ANSWERS[intent.kind](*intent.params, year=intent.year)
@@ -0,0 +1,52 @@
+"""Целочисленная арифметика в копейках с округлением ROUND_HALF_UP.
+
+Ставки из rates.py (Decimal) один раз превращаются в точные дроби
+(числитель, знаменатель); дальше только операции над int, результат
+совпадает с Decimal(...).quantize(Decimal("0.01"), ROUND_HALF_UP) бит в бит.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from fractions import Fraction
+from typing import NamedTuple
+
+
+_CENT = Decimal("0.01")
+
+
+class Rate(NamedTuple):
+    num: int
+    den: int
+
+
+def rate(value) -> Rate:
+    """Decimal/int/str/Fraction → точная дробь."""
+    f = Fraction(value)
+    return Rate(f.numerator, f.denominator)
+
+
+def half_up(num: int, den: int) -> int:
+    """num/den, округлённое до целого половиной от нуля (ROUND_HALF_UP)."""
+    if den < 0:
+        num, den = -num, -den
+    if num < 0:
+        return -((-2 * num + den) // (2 * den))
+    return (2 * num + den) // (2 * den)
+
+
+def trunc_div(num: int, den: int) -> int:
+    """Деление с отбрасыванием дробной части к нулю, как int(Decimal)."""
+    q = abs(num) // abs(den)
+    return q if (num < 0) == (den < 0) else -q
+
+
+def mul(kopecks: int, r: Rate) -> int:
+    """Сумма × ставка, округлённая до копейки."""
+    return half_up(kopecks * r.num, r.den)
+
+
+def to_decimal(kopecks: int) -> Decimal:
+    """Копейки → Decimal с двумя знаками (как после quantize(0.01)).
+    Умножение 0.01 на int точное и втрое быстрее Decimal(kopecks).scaleb(-2)."""
+    return _CENT * kopecks
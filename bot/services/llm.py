@@ -1,11 +1,55 @@
 """Единый интерфейс LLM — авто-выбор Anthropic или OpenAI по наличию ключа."""
 
+import functools
 import logging
 
 from bot.config.settings import settings
+from bot.utils.metrics import LLM_SECONDS, LLM_TOKENS, track
 
 logger = logging.getLogger(__name__)
 
+ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
+OPENAI_MODEL = "gpt-5.2"
+
+# USD за 1 млн токенов (вход, выход) — для оценки расходов в /stats
+MODEL_PRICES_USD = {
+    ANTHROPIC_MODEL: (3.0, 15.0),
+    OPENAI_MODEL: (1.75, 14.0),
+}
+
+
+@functools.lru_cache(maxsize=4)
+def _openai_client(api_key: str, base_url: str):
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=api_key, base_url=base_url or None)
+
+
+@functools.lru_cache(maxsize=4)
+def _anthropic_client(api_key: str):
+    import anthropic
+
+    return anthropic.AsyncAnthropic(api_key=api_key)
+
+
+def openai_client():
+    """Общий клиент OpenAI на процесс.
+
+    Создание клиента синхронно грузит CA-бандл для SSL (сотни мс на event loop),
+    поэтому клиент создаётся один раз, а не на каждый запрос.
+    """
+    return _openai_client(settings.openai_api_key, settings.openai_base_url)
+
+
+def anthropic_client():
+    """Общий клиент Anthropic на процесс (см. openai_client)."""
+    return _anthropic_client(settings.anthropic_api_key)
+
+
+def _count_tokens(provider: str, model: str, prompt: int, completion: int) -> None:
+    LLM_TOKENS.inc(prompt, provider=provider, model=model, direction="prompt")
+    LLM_TOKENS.inc(completion, provider=provider, model=model, direction="completion")
+
 
 async def ask_llm(
     system: str,
@@ -26,17 +70,20 @@ async def ask_llm(
 async def _ask_anthropic(
     system: str, user: str, history: list[dict[str, str]] | None = None,
 ) -> str:
-    import anthropic
-
     try:
-        client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+        client = anthropic_client()
         messages = list(history or [])
         messages.append({"role": "user", "content": user})
-        response = await client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4096,
-            system=system,
-            messages=messages,
+        with track("llm"), LLM_SECONDS.time(provider="anthropic", model=ANTHROPIC_MODEL):
+            response = await client.messages.create(
+                model=ANTHROPIC_MODEL,
+                max_tokens=4096,
+                system=system,
+                messages=messages,
+            )
+        _count_tokens(
+            "anthropic", ANTHROPIC_MODEL,
+            response.usage.input_tokens, response.usage.output_tokens,
         )
         return response.content[0].text
     except Exception as e:
@@ -47,18 +94,22 @@ async def _ask_anthropic(
 async def _ask_openai(
     system: str, user: str, history: list[dict[str, str]] | None = None,
 ) -> str:
-    from openai import AsyncOpenAI
-
     try:
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
+        client = openai_client()
         messages = [{"role": "system", "content": system}]
         messages.extend(history or [])
         messages.append({"role": "user", "content": user})
-        response = await client.chat.completions.create(
-            model="gpt-5.2",
-            messages=messages,
-            max_completion_tokens=4096,
-        )
+        with track("llm"), LLM_SECONDS.time(provider="openai", model=OPENAI_MODEL):
+            response = await client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                max_completion_tokens=4096,
+            )
+        if response.usage:
+            _count_tokens(
+                "openai", OPENAI_MODEL,
+                response.usage.prompt_tokens, response.usage.completion_tokens,
+            )
         return response.choices[0].message.content
     except Exception as e:
         logger.error("OpenAI API error: %s", e)
@@ -0,0 +1,154 @@
+"""Северная надбавка по стажу: текущий процент и даты повышения.
+
+Порядок из NADBAVKA_SCHEDULE один раз разворачивается в таблицу ступеней
+(стаж в месяцах → процент), поэтому процент на дату — bisect по таблице,
+а даты будущих повышений — её хвост, без перебора месяцев. Стаж — полные
+месяцы работы у нынешнего работодателя плюс ранее накопленный северный
+стаж (в месяцах). Порядок берётся из ставок года даты расчёта (для дат
+до первого загруженного года — самого раннего).
+"""
+
+from __future__ import annotations
+
+import calendar
+from bisect import bisect_right
+from datetime import date
+from typing import NamedTuple, Optional, Sequence
+
+from bot.config.registry import RateSet, rates
+
+# Группа территорий → порядок начисления
+GROUP_SCHEDULE = {
+    "А": "rks",
+    "Б": "priravnennye",
+    "В": "priravnennye",
+    "Г": "priravnennye",
+    "Д": "south",
+}
+
+
+class Step(NamedTuple):
+    months: int     # стаж, с которого действует процент
+    pct: int
+
+
+def _build(schedule: dict) -> tuple[Step, ...]:
+    steps = []
+    months, pct = schedule["initial_months"], schedule["initial_pct"]
+    while True:
+        steps.append(Step(months, int(pct * 100)))
+        if pct >= schedule["max_pct"]:
+            return tuple(steps)
+        slow = "threshold_pct" in schedule and pct >= schedule["threshold_pct"]
+        months += schedule["slow_increment_months"] if slow else schedule["increment_months"]
+        pct = min(pct + schedule["increment_pct"], schedule["max_pct"])
+
+
+class _Schedules(NamedTuple):
+    steps: dict[str, tuple[Step, ...]]
+    months: dict[str, tuple[int, ...]]      # Step.months — для bisect
+
+
+def _compile(r: RateSet) -> _Schedules:
+    steps = {key: _build(s) for key, s in r.NADBAVKA_SCHEDULE.items()}
+    return _Schedules(steps, {key: tuple(s.months for s in st) for key, st in steps.items()})
+
+
+def _schedules(year: Optional[int]) -> _Schedules:
+    return rates(year, exact=False).derive(_compile)
+
+
+def steps(schedule: str, year: Optional[int] = None) -> tuple[Step, ...]:
+    """Ступени порядка начисления по ставкам года."""
+    return _schedules(year).steps[schedule]
+
+
+def schedule_for(territory: str) -> str:
+    if territory not in GROUP_SCHEDULE:
+        raise ValueError("Неизвестная группа территорий.")
+    return GROUP_SCHEDULE[territory]
+
+
+def add_months(d: date, months: int) -> date:
+    year, month = divmod(d.month - 1 + months, 12)
+    year += d.year
+    return date(year, month + 1, min(d.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def service_months(hire: date, on: date, prior_months: int = 0) -> int:
+    """Полные месяцы стажа на дату on."""
+    if on < hire:
+        return prior_months
+    full = (on.year - hire.year) * 12 + on.month - hire.month
+    if add_months(hire, full) > on:     # 31.01 → 28.02 — уже полный месяц
+        full -= 1
+    return prior_months + full
+
+
+def pct_at(schedule: str, months: int, year: Optional[int] = None) -> int:
+    """Процент надбавки при стаже months."""
+    s = _schedules(year)
+    i = bisect_right(s.months[schedule], months)
+    return s.steps[schedule][i - 1].pct if i else 0
+
+
+class Projection(NamedTuple):
+    territory: str
+    schedule: str
+    service_months: int
+    pct: int
+    max_pct: int
+    increases: tuple[tuple[date, int], ...]     # (дата, новый процент)
+
+
+def project(
+    territory: str,
+    hire: date,
+    prior_months: int = 0,
+    on: Optional[date] = None,
+) -> Projection:
+    """Процент надбавки на дату on (по умолчанию — сегодня) и даты повышений."""
+    if prior_months < 0:
+        raise ValueError("Стаж не может быть отрицательным.")
+    schedule = schedule_for(territory)
+    on = on or date.today()
+    months = service_months(hire, on, prior_months)
+    s = _schedules(on.year)
+    table = s.steps[schedule]
+    i = bisect_right(s.months[schedule], months)
+    # Стаж Step.months наберётся через Step.months − prior_months месяцев от приёма
+    increases = tuple(
+        (add_months(hire, st.months - prior_months), st.pct) for st in table[i:]
+    )
+    return Projection(
+        territory, schedule, months, table[i - 1].pct if i else 0, table[-1].pct, increases,
+    )
+
+
+def monthly_pcts(
+    territory: str,
+    hire: date,
+    prior_months: int = 0,
+    year: Optional[int] = None,
+) -> tuple[int, ...]:
+    """Процент надбавки на 1-е число каждого месяца года."""
+    schedule = schedule_for(territory)
+    year = year or date.today().year
+    return tuple(
+        pct_at(schedule, service_months(hire, date(year, m, 1), prior_months), year)
+        for m in range(1, 13)
+    )
+
+
+def current_pcts(
+    territories: Sequence[str],
+    hires: Sequence[date],
+    prior_months: Sequence[int],
+    on: Optional[date] = None,
+) -> list[int]:
+    """Процент надбавки на дату для списка сотрудников."""
+    on = on or date.today()
+    return [
+        pct_at(schedule_for(t), service_months(h, on, p), on.year)
+        for t, h, p in zip(territories, hires, prior_months)
+    ]
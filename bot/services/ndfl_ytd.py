@@ -0,0 +1,153 @@
+"""НДФЛ нарастающим итогом с начала года (п. 3 ст. 226 НК РФ).
+
+Налог за месяц = налог с дохода с начала года − уже удержанное. Основная
+часть (оклад, премии) и северная (РК + надбавка) идут по своим шкалам и
+копятся отдельно, поэтому переход 13% → 15% приходится ровно на месяц,
+в котором доход пересёк границу. Налог считается в полных рублях
+(п. 6 ст. 52 НК РФ). Состояние хранится по столбцам — один элемент на
+сотрудника, месяц обрабатывается за O(1) на человека.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Mapping, NamedTuple, Optional, Sequence
+
+from bot.config.registry import rates
+from bot.services.calc_core import MONTH_NAMES, salary_kop
+from bot.services.kopeck import half_up
+from bot.services.tax_scale import CompiledScale, scales, year_scales
+
+
+def _tax_rub(scale: CompiledScale, income_kop: int) -> int:
+    """Налог с дохода в копейках, округлённый до рубля; результат — в копейках."""
+    if income_kop <= 0:
+        return 0
+    return half_up(scale.units(income_kop), scale.den * 100) * 100
+
+
+def _rate(scale: CompiledScale, income_kop: int) -> Decimal:
+    return scale.rates[scale.index(-(-income_kop // 100))]
+
+
+class Ledger:
+    """Данные с начала года по сотрудникам (копейки). Шкалы и лимит вычета
+    фиксируются на год реестра при создании."""
+
+    __slots__ = ("size", "year", "scale", "scale_north", "limit", "month", "income",
+                 "base", "north", "deduction", "withheld_base", "withheld_north")
+
+    def __init__(self, size: int, year: Optional[int] = None):
+        r = rates(year)
+        s = r.derive(year_scales)
+        self.size = size
+        self.year = r.year
+        self.scale, self.scale_north = s.ndfl, s.north
+        self.limit = r.NDFL_DEDUCTIONS.child_income_limit * 100
+        self.month = 0
+        self.income = [0] * size          # весь доход — для лимита вычета на детей
+        self.base = [0] * size
+        self.north = [0] * size
+        self.deduction = [0] * size
+        self.withheld_base = [0] * size
+        self.withheld_north = [0] * size
+
+    def post(
+        self,
+        base: Sequence[int],
+        north: Sequence[int],
+        child_deduction: Optional[Sequence[int]] = None,
+    ) -> tuple[list[int], list[int]]:
+        """Проводит месяц. base/north — начисления месяца, child_deduction —
+        месячный вычет на детей. Возвращает удержание месяца (осн., сев.)."""
+        self.month += 1
+        limit, scale, scale_north = self.limit, self.scale, self.scale_north
+        out_base, out_north = [], []
+        for i in range(self.size):
+            income = self.income[i] + base[i] + north[i]
+            self.income[i] = income
+            if child_deduction and child_deduction[i] and income <= limit:
+                self.deduction[i] += child_deduction[i]
+            self.base[i] += base[i]
+            self.north[i] += north[i]
+
+            tax_base = _tax_rub(scale, self.base[i] - self.deduction[i])
+            tax_north = _tax_rub(scale_north, self.north[i])
+            out_base.append(tax_base - self.withheld_base[i])
+            out_north.append(tax_north - self.withheld_north[i])
+            self.withheld_base[i] = tax_base
+            self.withheld_north[i] = tax_north
+        return out_base, out_north
+
+
+# ─────────────────────────────────────────────
+# ОДИН СОТРУДНИК
+# ─────────────────────────────────────────────
+
+class YtdMonth(NamedTuple):
+    month: str
+    base: int                 # начислено, осн. часть
+    north: int                # РК + надбавка
+    deduction: int            # вычет на детей с начала года
+    ytd_base: int
+    ytd_north: int
+    ndfl_base: int            # удержано за месяц
+    ndfl_north: int
+    rate_base: Decimal        # ставка последнего рубля с начала года
+    rate_north: Decimal
+
+    @property
+    def ndfl(self) -> int:
+        return self.ndfl_base + self.ndfl_north
+
+    @property
+    def net(self) -> int:
+        return self.base + self.north - self.ndfl
+
+
+def simulate_year(
+    base: Sequence[int],
+    north: Sequence[int],
+    child_deduction: int = 0,
+    year: Optional[int] = None,
+) -> tuple[YtdMonth, ...]:
+    """Помесячные начисления (копейки, до 12 месяцев) → таблица удержаний."""
+    ledger = Ledger(1, year)
+    months = []
+    for name, b, n in zip(MONTH_NAMES, base, north):
+        (wb,), (wn,) = ledger.post((b,), (n,), (child_deduction,))
+        months.append(YtdMonth(
+            name, b, n, ledger.deduction[0], ledger.base[0], ledger.north[0], wb, wn,
+            _rate(ledger.scale, ledger.base[0] - ledger.deduction[0]),
+            _rate(ledger.scale_north, ledger.north[0]),
+        ))
+    return tuple(months)
+
+
+def salary_months(
+    territory: str,
+    oklad: int,
+    nadbavka_pct: int,
+    bonuses: Optional[Mapping[int, int]] = None,
+    child_deduction: int = 0,
+    monthly_oklad: Optional[Sequence[int]] = None,
+    year: Optional[int] = None,
+) -> tuple[YtdMonth, ...]:
+    """Год по окладу (₽) с РК и надбавкой. bonuses — {номер месяца: премия, ₽},
+    monthly_oklad — переменная оплата по месяцам вместо постоянного оклада.
+    РК и надбавка начисляются и на премии."""
+    bonuses = bonuses or {}
+    pays = monthly_oklad or [oklad] * 12
+    base, north = [], []
+    for month, pay in enumerate(pays, 1):
+        accrued = pay + bonuses.get(month, 0)
+        k = salary_kop(territory, accrued, nadbavka_pct, year)
+        base.append(accrued * 100)
+        north.append(k.rk + k.nadbavka)
+    return simulate_year(base, north, child_deduction * 100, year)
+
+
+def crossing_month(months: Sequence[YtdMonth], year: Optional[int] = None) -> Optional[YtdMonth]:
+    """Первый месяц, в котором основная часть ушла выше первой ступени."""
+    first = scales(year).ndfl.rates[0]
+    return next((m for m in months if m.rate_base != first), None)
@@ -1,12 +1,13 @@
 """OCR через Vision API — распознавание бухгалтерских документов."""
 
+import asyncio
 import base64
 import io
 import logging
 
-from PIL import Image
-
 from bot.config.settings import settings
+from bot.services.llm import anthropic_client, openai_client
+from bot.utils.metrics import timed
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,8 @@ MAX_IMAGE_SIDE = 1280  # макс. сторона в пикселях
 
 def _compress_image(image_bytes: bytes) -> bytes:
     """Сжимает изображение до MAX_IMAGE_SIDE и качества 85% JPEG."""
+    from PIL import Image
+
     img = Image.open(io.BytesIO(image_bytes))
     if img.mode in ("RGBA", "P"):
         img = img.convert("RGB")
@@ -42,6 +45,7 @@ OCR_SYSTEM_PROMPT = (
 )
 
 
+@timed("ocr")
 async def process_document_photo(image_bytes: bytes) -> str:
     """Отправляет изображение в Vision API и возвращает распознанный текст."""
     if settings.anthropic_api_key:
@@ -52,12 +56,10 @@ async def process_document_photo(image_bytes: bytes) -> str:
 
 
 async def _ocr_openai(image_bytes: bytes) -> str:
-    from openai import AsyncOpenAI
-
     try:
-        compressed = _compress_image(image_bytes)
+        compressed = await asyncio.to_thread(_compress_image, image_bytes)
         b64 = base64.b64encode(compressed).decode("utf-8")
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
+        client = openai_client()
         response = await client.chat.completions.create(
             model="gpt-5.2",
             messages=[
@@ -88,12 +90,10 @@ async def _ocr_openai(image_bytes: bytes) -> str:
 
 
 async def _ocr_anthropic(image_bytes: bytes) -> str:
-    import anthropic
-
     try:
-        compressed = _compress_image(image_bytes)
+        compressed = await asyncio.to_thread(_compress_image, image_bytes)
         b64 = base64.b64encode(compressed).decode("utf-8")
-        client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+        client = anthropic_client()
         response = await client.messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=4096,
@@ -0,0 +1,400 @@
+"""Пакетный расчёт зарплаты по списку сотрудников (XLSX/CSV → XLSX).
+
+Данные хранятся по столбцам — списки целых копеек, без Decimal на каждую
+строку. Округление — ROUND_HALF_UP, как в calc_core: при нуле детей
+начисления, НДФЛ и «на руки» совпадают с compute_salary до копейки.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from fractions import Fraction
+from typing import IO, NamedTuple, Optional
+
+from bot.config.registry import NdflDeductions, rates
+from bot.services import kopeck
+from bot.services import nadbavka as nadbavka_schedule
+from bot.services.calc_core import MONTH_NAMES
+from bot.services.contributions import ContributionLedger, tariff
+from bot.services.kopeck import half_up
+from bot.services.ndfl_ytd import Ledger
+from bot.services.sheets import header_map, read_rows
+from bot.services.tax_scale import year_scales
+from bot.utils.metrics import rendered, timed
+
+MAX_ROWS = 5000
+
+# Ключевые слова заголовков → столбец
+_HEADER_KEYS = {
+    "name": ("фио", "сотрудник", "работник", "имя"),
+    "territory": ("групп", "террит", "район"),
+    "oklad": ("оклад", "ставка"),
+    "nadbavka": ("надбав",),
+    "children": ("дет", "ребен", "ребён"),
+    "bonus_month": ("месяц",),
+    "bonus": ("прем", "бонус"),
+    "hire": ("приём", "прием", "дата"),
+    "prior": ("стаж",),
+}
+# Порядок столбцов в файле без заголовка
+_COLUMNS = (
+    "name", "territory", "oklad", "nadbavka", "children", "bonus", "bonus_month",
+    "hire", "prior",
+)
+
+
+def _child_deduction_monthly(children: int, d: NdflDeductions) -> int:
+    """Стандартный вычет на детей в месяц, ₽ (1-й, 2-й, 3-й и следующие)."""
+    return (
+        (d.child_1 if children >= 1 else 0)
+        + (d.child_2 if children >= 2 else 0)
+        + d.child_3_plus * max(children - 2, 0)
+    )
+
+
+# ─────────────────────────────────────────────
+# ЧТЕНИЕ
+# ─────────────────────────────────────────────
+
+@dataclass(slots=True)
+class Staff:
+    names: list[str] = field(default_factory=list)
+    territories: list[str] = field(default_factory=list)
+    oklad: list[int] = field(default_factory=list)         # копейки
+    nadbavka_pct: list[int] = field(default_factory=list)
+    children: list[int] = field(default_factory=list)
+    bonus: list[int] = field(default_factory=list)         # копейки, разовая премия
+    bonus_month: list[int] = field(default_factory=list)   # 1–12, 0 — без премии
+    # Надбавка по стажу (nadbavka.py): % на 1-е число каждого месяца года,
+    # None — процент указан в файле и не меняется
+    pct_months: list[Optional[tuple[int, ...]]] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def _to_kopecks(value, what: str) -> int:
+    if isinstance(value, (int, float)):
+        value = str(value)
+    text = str(value).replace(" ", "").replace(" ", "").replace(",", ".")
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"{what} «{value}» — не число")
+    if not amount.is_finite():
+        raise ValueError(f"{what} «{value}» — не число")
+    kop = int((amount * 100).to_integral_value())
+    if kop < 0:
+        raise ValueError(f"{what} «{value}» — отрицательное число")
+    return kop
+
+
+def _to_number(value, what: str) -> float:
+    """Конечное число из ячейки; inf и nan — ошибка строки, а не всего файла."""
+    try:
+        number = float(str(value).replace(",", ".").strip())
+    except ValueError:
+        raise ValueError(f"{what} «{value}» — не число")
+    if not math.isfinite(number):
+        raise ValueError(f"{what} «{value}» — не число")
+    return number
+
+
+def _to_pct(value) -> int:
+    if value in (None, ""):
+        return 0
+    pct = _to_number(str(value).replace("%", ""), "надбавка")
+    if 0 < pct < 1:  # 0,3 вместо 30%
+        pct *= 100
+    return int(round(pct))
+
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for fmt in ("%d.%m.%Y", "%Y-%m-%d", "%d.%m.%y"):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"дата «{value}» — нужен формат ДД.ММ.ГГГГ")
+
+
+def read_staff(data: bytes, filename: str, on: Optional[date] = None) -> Staff:
+    """Разбирает таблицу сотрудников. Строки с ошибками пропускаются и
+    попадают в Staff.errors. Без заголовка столбцы берутся по порядку:
+    ФИО, группа, оклад, надбавка %, дети, премия, месяц премии (по
+    умолчанию декабрь), дата приёма, северный стаж до приёма (мес.).
+
+    Если надбавка не указана, а дата приёма есть, процент считается по стажу
+    на дату on (по умолчанию — сегодня) и помесячно меняется в течение года."""
+    on = on or date.today()
+    groups = rates(on.year, exact=False).TERRITORY_GROUPS
+    rows = read_rows(data, filename)
+    if not rows:
+        raise ValueError("Файл пуст.")
+
+    mapping = header_map(rows[0], _HEADER_KEYS)
+    if "oklad" in mapping:
+        rows, first_line = rows[1:], 2
+    else:
+        mapping, first_line = {c: i for i, c in enumerate(_COLUMNS)}, 1
+    if len(rows) > MAX_ROWS:
+        raise ValueError(f"Слишком много строк: {len(rows)} (максимум {MAX_ROWS}).")
+
+    staff = Staff()
+    for line, row in enumerate(rows, first_line):
+        cells = {c: row[i] if i < len(row) else None for c, i in mapping.items()}
+        try:
+            territory = str(cells.get("territory") or "").strip().upper()
+            if territory not in groups:
+                raise ValueError(f"неизвестная группа территорий «{territory}»")
+            oklad = _to_kopecks(cells.get("oklad"), "оклад")
+            nadbavka = _to_pct(cells.get("nadbavka"))
+            children = int(_to_number(cells.get("children") or 0, "дети"))
+            bonus = _to_kopecks(cells.get("bonus") or 0, "премия")
+            bonus_month = int(_to_number(
+                cells.get("bonus_month") or (12 if bonus else 0), "месяц премии",
+            ))
+            if bonus and not 1 <= bonus_month <= 12:
+                raise ValueError(f"месяц премии «{bonus_month}» — нужен 1–12")
+            pct_months = None
+            if cells.get("nadbavka") in (None, "") and cells.get("hire") not in (None, ""):
+                hire = _to_date(cells["hire"])
+                prior = int(_to_number(cells.get("prior") or 0, "стаж"))
+                pct_months = nadbavka_schedule.monthly_pcts(territory, hire, prior, on.year)
+                nadbavka = nadbavka_schedule.project(territory, hire, prior, on).pct
+        except ValueError as e:
+            staff.errors.append(f"строка {line}: {e}")
+            continue
+        except ArithmeticError:
+            staff.errors.append(f"строка {line}: число вне допустимого диапазона")
+            continue
+        staff.names.append(str(cells.get("name") or f"Сотрудник {line}").strip())
+        staff.territories.append(territory)
+        staff.oklad.append(oklad)
+        staff.nadbavka_pct.append(max(nadbavka, 0))
+        staff.children.append(max(children, 0))
+        staff.bonus.append(bonus)
+        staff.bonus_month.append(bonus_month if bonus else 0)
+        staff.pct_months.append(pct_months)
+    return staff
+
+
+# ─────────────────────────────────────────────
+# РАСЧЁТ
+# ─────────────────────────────────────────────
+
+class MonthTotals(NamedTuple):
+    month: str
+    accrued: int
+    ndfl_base: int
+    ndfl_north: int
+    contributions: int
+    trauma: int
+    base_above: int           # выплаты сверх ЕПБ
+
+
+@dataclass(slots=True)
+class Payroll:
+    """Результат по столбцам; суммы — копейки. rk…net — за обычный месяц
+    (НДФЛ — годовой ÷ 12, как в калькуляторе), остальное — за год;
+    ndfl_year — удержано нарастающим итогом с учётом премий."""
+    staff: Staff
+    rk: list[int]
+    nadbavka: list[int]
+    gross: list[int]
+    ndfl: list[int]
+    net: list[int]
+    accrued_year: list[int]
+    deduction: list[int]
+    ndfl_year: list[int]
+    contributions: list[int]
+    trauma: list[int]
+    employer_cost: list[int]
+    months: tuple[MonthTotals, ...]
+    tariff: str
+    year: int
+
+    def total(self, column: str) -> int:
+        return sum(getattr(self, column))
+
+    def summary(self) -> str:
+        def rub(kopecks: int) -> str:
+            return f"{kopecks / 100:,.2f}".replace(",", "\u00a0").replace(".", ",")
+
+        return (
+            f"👥 Сотрудников: {len(self.staff)} (ставки {self.year} г.)\n"
+            f"Тариф взносов: {self.tariff}\n"
+            f"ФОТ в месяц: {rub(self.total('gross'))} ₽\n"
+            f"НДФЛ за год: {rub(self.total('ndfl_year'))} ₽\n"
+            f"Взносы за год: {rub(self.total('contributions'))} ₽\n"
+            f"Стоимость за год: {rub(self.total('employer_cost'))} ₽"
+        )
+
+
+@timed("payroll_batch")
+def compute_payroll(
+    staff: Staff,
+    tariff_key: str = "general",
+    trauma_class: Optional[int] = None,
+    year: Optional[int] = None,
+) -> Payroll:
+    """Начисления, НДФЛ (основная и северная шкалы), взносы и стоимость
+    сотрудника для всех строк. НДФЛ и взносы — помесячно нарастающим итогом."""
+    r = rates(year)
+    # Коэффициенты зависят только от (группа, надбавка %) — считаем один раз
+    keys = set(zip(staff.territories, staff.nadbavka_pct))
+    for territory, pcts in zip(staff.territories, staff.pct_months):
+        keys.update((territory, pct) for pct in pcts or ())
+    factors: dict[tuple[str, int], tuple[int, int, int, int]] = {}
+    for key in keys:
+        group = r.TERRITORY_GROUPS[key[0]]
+        nadb = min(Fraction(key[1], 100), Fraction(group["max_nadbavka"]))
+        factors[key] = (*kopeck.rate(group["rk"] - 1), nadb.numerator, nadb.denominator)
+
+    def north_of(amount: int, key: tuple[str, int]) -> int:
+        rk_num, rk_den, n_num, n_den = factors[key]
+        return half_up(amount * rk_num, rk_den) + half_up(amount * n_num, n_den)
+
+    rk, nadb = [], []
+    for territory, pct, oklad in zip(staff.territories, staff.nadbavka_pct, staff.oklad):
+        rk_num, rk_den, n_num, n_den = factors[territory, pct]
+        rk.append(half_up(oklad * rk_num, rk_den))
+        nadb.append(half_up(oklad * n_num, n_den))
+    gross = [o + k + n for o, k, n in zip(staff.oklad, rk, nadb)]
+
+    # Год нарастающим итогом: премия — в своём месяце, РК и надбавка — и на неё;
+    # у кого надбавка по стажу — процент своего месяца
+    child = [_child_deduction_monthly(c, r.NDFL_DEDUCTIONS) * 100 for c in staff.children]
+    north = [k + n for k, n in zip(rk, nadb)]
+    by_schedule = [i for i, pcts in enumerate(staff.pct_months) if pcts]
+    ledger = Ledger(len(staff), r.year)
+    insurance = ContributionLedger(len(staff), tariff_key, trauma_class, r.year)
+    months = []
+    for month, name in enumerate(MONTH_NAMES, 1):
+        base_m, north_m = staff.oklad, north
+        if by_schedule or month in staff.bonus_month:
+            base_m, north_m = list(base_m), list(north_m)
+            for i in by_schedule:
+                north_m[i] = north_of(
+                    staff.oklad[i], (staff.territories[i], staff.pct_months[i][month - 1])
+                )
+            for i, bm in enumerate(staff.bonus_month):
+                if bm == month:
+                    pcts = staff.pct_months[i]
+                    pct = pcts[month - 1] if pcts else staff.nadbavka_pct[i]
+                    base_m[i] += staff.bonus[i]
+                    north_m[i] += north_of(staff.bonus[i], (staff.territories[i], pct))
+        withheld_base, withheld_north = ledger.post(base_m, north_m, child)
+        insurance.post([b + n for b, n in zip(base_m, north_m)])
+        org = insurance.months[-1]
+        months.append(MonthTotals(
+            name, org.base, sum(withheld_base), sum(withheld_north),
+            org.contributions, org.trauma, org.base_above,
+        ))
+    deduction = ledger.deduction
+    ndfl_year = [b + n for b, n in zip(ledger.withheld_base, ledger.withheld_north)]
+
+    # Оценка на обычный месяц: годовые базы в целых рублях (как в calc_core)
+    s = r.derive(year_scales)
+    ndfl_base = s.ndfl.tax_many(
+        max((o * 12 - d) // 100, 0) for o, d in zip(staff.oklad, deduction)
+    )
+    ndfl_north = s.north.tax_many((k + n) * 12 // 100 for k, n in zip(rk, nadb))
+    ndfl = [half_up(b + n, 12) for b, n in zip(ndfl_base, ndfl_north)]
+    net = [g - t for g, t in zip(gross, ndfl)]
+
+    employer_cost = [
+        a + c + t for a, c, t in zip(ledger.income, insurance.paid, insurance.trauma_paid)
+    ]
+
+    return Payroll(
+        staff, rk, nadb, gross, ndfl, net, ledger.income, deduction, ndfl_year,
+        insurance.paid, insurance.trauma_paid, employer_cost, tuple(months),
+        tariff(tariff_key, r.year).name, r.year,
+    )
+
+
+# ─────────────────────────────────────────────
+# ВЫГРУЗКА
+# ─────────────────────────────────────────────
+
+_REPORT_COLUMNS = (
+    ("ФИО", 32),
+    ("Группа", 8),
+    ("Оклад, ₽", 14),
+    ("Надбавка, %", 11),
+    ("Дети", 6),
+    ("Премия, ₽", 14),
+    ("РК, ₽/мес", 14),
+    ("Надбавка, ₽/мес", 14),
+    ("Начислено, ₽/мес", 16),
+    ("НДФЛ, ₽/мес", 14),
+    ("На руки, ₽/мес", 16),
+    ("Начислено, ₽/год", 18),
+    ("Вычет на детей, ₽/год", 16),
+    ("НДФЛ нараст., ₽/год", 16),
+    ("Взносы, ₽/год", 16),
+    ("Травматизм, ₽/год", 16),
+    ("Стоимость, ₽/год", 18),
+)
+_MONEY = (
+    "rk", "nadbavka", "gross", "ndfl", "net",
+    "accrued_year", "deduction", "ndfl_year", "contributions", "trauma", "employer_cost",
+)
+_MONTH_COLUMNS = (
+    ("Месяц", 14),
+    ("Начислено, ₽", 18),
+    ("НДФЛ осн., ₽", 16),
+    ("НДФЛ сев., ₽", 16),
+    ("НДФЛ итого, ₽", 16),
+    ("Сверх ЕПБ, ₽", 18),
+    ("Взносы, ₽", 16),
+    ("Травматизм, ₽", 16),
+)
+
+
+@rendered("xlsx", "payroll")
+def export_payroll_report(p: Payroll) -> IO[bytes]:
+    """XLSX: реестр по сотрудникам с итогами и лист помесячных итогов
+    организации — НДФЛ и взносы, как в РСВ (write-only, построчно)."""
+    from bot.services.xlsx_stream import Book
+
+    book = Book()
+    sheet = book.sheet("Зарплата", widths=[width for _, width in _REPORT_COLUMNS])
+    sheet.header([title for title, _ in _REPORT_COLUMNS])
+
+    s = p.staff
+    columns = [getattr(p, name) for name in _MONEY]
+    styles = ("data", "data", "money", "data", "data", "money") + ("money",) * len(columns)
+    for i in range(len(s)):
+        row = [s.names[i], s.territories[i], s.oklad[i] / 100,
+               s.nadbavka_pct[i], s.children[i], s.bonus[i] / 100]
+        row.extend(col[i] / 100 for col in columns)
+        sheet.row(row, styles)
+
+    totals = ["ИТОГО", "", sum(s.oklad) / 100, "", sum(s.children), sum(s.bonus) / 100]
+    totals.extend(sum(col) / 100 for col in columns)
+    sheet.total(totals)
+
+    sheet = book.sheet("По месяцам", widths=[width for _, width in _MONTH_COLUMNS])
+    sheet.header([title for title, _ in _MONTH_COLUMNS])
+    values = [
+        (m.accrued, m.ndfl_base, m.ndfl_north, m.ndfl_base + m.ndfl_north,
+         m.base_above, m.contributions, m.trauma)
+        for m in p.months
+    ]
+    styles = ("data",) + ("money",) * len(values[0])
+    for m, row in zip(p.months, values):
+        sheet.row([m.month.capitalize()] + [v / 100 for v in row], styles)
+    sheet.total(["ИТОГО"] + [sum(col) / 100 for col in zip(*values)])
+
+    return book.save()
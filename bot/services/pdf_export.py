@@ -4,12 +4,10 @@ import io
 import re
 import textwrap
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.units import mm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+from bot.utils.metrics import rendered
+
+# reportlab импортируется внутри функций — тяжёлый модуль грузится
+# только при первой генерации PDF
 
 # ─── Регистрация кириллического шрифта ──────
 _FONT_REGISTERED = False
@@ -19,6 +17,9 @@ def _register_fonts():
     global _FONT_REGISTERED
     if _FONT_REGISTERED:
         return
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
     # DejaVu Sans поставляется с большинством Linux-дистрибутивов
     for path in (
         "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
@@ -54,8 +55,14 @@ def _strip_html(text: str) -> str:
     return text
 
 
+@rendered("pdf", "text")
 def generate_pdf(text: str, title: str = "Ответ бот-бухгалтера") -> io.BytesIO:
     """Генерирует PDF-документ с текстом. Возвращает BytesIO."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
     _register_fonts()
 
     buf = io.BytesIO()
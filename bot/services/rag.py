@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
 from pathlib import Path
-from typing import Optional
-
-import chromadb
+from typing import TYPE_CHECKING, Optional
 
 from bot.config.settings import settings
+from bot.utils.metrics import track
+
+if TYPE_CHECKING:
+    import chromadb
 
 logger = logging.getLogger(__name__)
 
@@ -18,16 +22,21 @@ CHUNK_OVERLAP = 100
 
 _client: Optional[chromadb.HttpClient] = None
 _collection = None
+_init_lock = threading.Lock()
 
 
 def _get_collection():
     global _client, _collection
     if _collection is None:
-        _client = chromadb.HttpClient(
-            host=settings.chroma_host,
-            port=settings.chroma_port,
-        )
-        _collection = _client.get_or_create_collection(COLLECTION_NAME)
+        with _init_lock:
+            if _collection is None:
+                import chromadb
+
+                _client = chromadb.HttpClient(
+                    host=settings.chroma_host,
+                    port=settings.chroma_port,
+                )
+                _collection = _client.get_or_create_collection(COLLECTION_NAME)
     return _collection
 
 
@@ -101,8 +110,12 @@ def index_directory(kb_path: Path) -> int:
 async def search_knowledge(query: str, n_results: int = 5) -> list[str]:
     """Поиск по базе знаний, возвращает релевантные чанки."""
     try:
-        collection = _get_collection()
-        results = collection.query(query_texts=[query], n_results=n_results)
+        with track("rag_search"):
+            # HTTP-клиент chromadb синхронный — уводим запрос с event loop
+            collection = await asyncio.to_thread(_get_collection)
+            results = await asyncio.to_thread(
+                collection.query, query_texts=[query], n_results=n_results,
+            )
         if results and results["documents"]:
             return results["documents"][0]
     except Exception as e:
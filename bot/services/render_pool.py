@@ -0,0 +1,157 @@
+"""Генерация отчётов (XLSX, PDF, PNG) в пуле процессов, вне цикла бота.
+
+openpyxl, reportlab и PIL держат GIL: даже в asyncio.to_thread большой PDF
+тормозит все апдейты. Здесь отчёт строится в отдельном процессе — в нём
+заранее импортированы генераторы и зарегистрирован шрифт DejaVu Sans, —
+а хендлер ждёт future и получает готовые байты.
+
+    data = await render("xlsx:salary", result)
+    data = await render("pdf:text", answer, "Консультация")
+
+Задание — имя из JOBS («формат:отчёт», как у @rendered) и аргументы,
+которые pickle передаёт в процесс. Выполняется не больше RENDER_WORKERS
+заданий, ждать очереди могут ещё RENDER_QUEUE; остальные хендлеры стоят на
+входе, пока очередь не освободится (backpressure). RENDER_WORKERS=0 — без
+пула, в потоке, как раньше.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, NamedTuple, Optional
+
+from bot.config.settings import settings
+from bot.utils.metrics import QUEUE_DEPTH, RENDER_BYTES, RENDER_SECONDS, RENDER_WAIT
+
+logger = logging.getLogger(__name__)
+
+# Задание → (модуль, функция); функция возвращает файл с указателем в начале
+JOBS = {
+    "xlsx:salary": ("bot.services.excel_export", "export_salary_report"),
+    "xlsx:ndfl": ("bot.services.excel_export", "export_ndfl_report"),
+    "xlsx:contributions": ("bot.services.excel_export", "export_contributions_report"),
+    "xlsx:payroll": ("bot.services.payroll_batch", "export_payroll_report"),
+    "xlsx:fleet": ("bot.services.transport_fleet", "export_fleet_report"),
+    "xlsx:sweep": ("bot.services.salary_sweep", "export_sweep_report"),
+    "png:sweep": ("bot.services.salary_sweep", "render_sweep_chart"),
+    "pdf:text": ("bot.services.pdf_export", "generate_pdf"),
+}
+
+
+# ─────────────────────────────────────────────
+# ПРОЦЕСС-ИСПОЛНИТЕЛЬ
+# ─────────────────────────────────────────────
+
+def _init_worker() -> None:
+    """Импорт генераторов и шрифтов один раз на процесс, а не на задание."""
+    # Ctrl+C получает бот, пул он остановит сам
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for module in {module for module, _ in JOBS.values()}:
+        importlib.import_module(module)
+    from bot.services.pdf_export import _register_fonts
+
+    _register_fonts()
+
+
+class _Done(NamedTuple):
+    data: bytes
+    seconds: float      # генерация в процессе, без очереди и передачи
+
+
+def _run(job: str, args: tuple, kwargs: dict) -> _Done:
+    module, func = JOBS[job]
+    started = time.perf_counter()
+    buf = getattr(importlib.import_module(module), func)(*args, **kwargs)
+    data = buf.read()
+    return _Done(data, time.perf_counter() - started)
+
+
+# ─────────────────────────────────────────────
+# ПУЛ
+# ─────────────────────────────────────────────
+
+_executor: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: у бота есть потоки (сторож цикла, to_thread), fork с ними небезопасен
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.render_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _executor
+
+
+def _queue() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.render_workers + settings.render_queue)
+    return _slots
+
+
+async def start() -> None:
+    """Поднимает процессы заранее: первое задание не ждёт импорта openpyxl."""
+    if settings.render_workers <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    pool = _pool()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            loop.run_in_executor(pool, time.sleep, 0.05) for _ in range(settings.render_workers)
+        ))
+    except BrokenProcessPool:
+        logger.exception("Пул рендеринга не запустился")
+        shutdown()
+        return
+    logger.info("Пул рендеринга: %d процессов за %.1f с",
+                settings.render_workers, time.perf_counter() - started)
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def render(job: str, *args: Any, **kwargs: Any) -> bytes:
+    """Готовый отчёт в байтах. Ждёт место в очереди, если пул занят."""
+    if job not in JOBS:
+        raise ValueError(f"Неизвестный отчёт: {job}")
+    fmt, report = job.split(":")
+    if settings.render_workers <= 0:
+        done = await asyncio.to_thread(_run, job, args, kwargs)
+        return done.data
+
+    queued = time.perf_counter()
+    QUEUE_DEPTH.inc(queue="render")
+    try:
+        async with _queue():
+            loop = asyncio.get_running_loop()
+            try:
+                done = await loop.run_in_executor(_pool(), _run, job, args, kwargs)
+            except BrokenProcessPool:
+                # Процесс упал (память, сигнал) — следующий запрос поднимет пул заново
+                logger.error("Пул рендеринга сломан, пересоздаю")
+                shutdown()
+                raise
+    finally:
+        QUEUE_DEPTH.dec(queue="render")
+
+    total = time.perf_counter() - queued
+    RENDER_SECONDS.observe(done.seconds, format=fmt, report=report)
+    RENDER_WAIT.observe(max(total - done.seconds, 0.0), format=fmt, report=report)
+    RENDER_BYTES.observe(len(done.data), format=fmt, report=report)
+    return done.data
@@ -0,0 +1,234 @@
+"""Сетка «что если»: оклад × группа территорий × надбавка за один вызов.
+
+Та же арифметика, что у salary_kop, но по столбцам: НДФЛ с основной части
+зависит только от оклада и считается один раз на всю сетку (tax_many),
+коэффициенты — один раз на пару (группа, надбавка), взносы за год — в
+замкнутом виде (contributions.annual_constant). Результат — сводная
+таблица XLSX и компактный график PNG.
+"""
+
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import IO, Optional, Sequence
+
+from bot.config.registry import rates
+from bot.services import kopeck
+from bot.services.contributions import annual_constant, tariff
+from bot.services.kopeck import half_up
+from bot.services.tax_scale import year_scales
+from bot.utils.metrics import rendered, timed
+
+MAX_POINTS = 50_000
+
+
+@dataclass(slots=True)
+class Sweep:
+    """Сетка по столбцам: оклады (₽) — внутренний цикл, пары (группа, надбавка)
+    — внешний. Суммы — копейки: за месяц, взносы и стоимость — за год."""
+    oklads: tuple[int, ...]
+    series: tuple[tuple[str, int], ...]
+    gross: list[int]
+    ndfl: list[int]
+    net: list[int]
+    contributions: list[int]
+    employer_cost: list[int]
+    tariff: str
+    year: int
+
+    def __len__(self) -> int:
+        return len(self.gross)
+
+    def column(self, name: str, series: int) -> list[int]:
+        """Значения показателя для одной пары (группа, надбавка)."""
+        n = len(self.oklads)
+        return getattr(self, name)[series * n:(series + 1) * n]
+
+
+@timed("salary_sweep")
+def sweep(
+    oklads: Sequence[int],
+    territories: Sequence[str],
+    nadbavka_pcts: Sequence[int],
+    tariff_key: str = "general",
+    year: Optional[int] = None,
+) -> Sweep:
+    """Считает всю сетку. Значения в каждой точке совпадают с salary_kop."""
+    r = rates(year)
+    groups = r.TERRITORY_GROUPS
+    for territory in territories:
+        if territory not in groups:
+            raise ValueError(f"Неизвестная группа территорий: {territory}")
+    name = tariff(tariff_key, r.year).name
+    s = r.derive(year_scales)
+    series = tuple((t, p) for t in territories for p in nadbavka_pcts)
+    if len(oklads) * len(series) > MAX_POINTS:
+        raise ValueError(f"Слишком большая сетка: {len(oklads) * len(series)} точек "
+                         f"(максимум {MAX_POINTS}).")
+
+    oklads = tuple(oklads)
+    base_k = [o * 100 for o in oklads]
+    # Основная часть НДФЛ не зависит от группы и надбавки
+    ndfl_base = s.ndfl.tax_many(o * 12 for o in oklads)
+
+    gross, ndfl, net, contributions, cost = [], [], [], [], []
+    for territory, pct in series:
+        group = groups[territory]
+        rk_num, rk_den = kopeck.rate(group["rk"] - 1)
+        nadb = min(Fraction(pct, 100), Fraction(group["max_nadbavka"]))
+        n_num, n_den = nadb.numerator, nadb.denominator
+        north = [half_up(b * rk_num, rk_den) + half_up(b * n_num, n_den) for b in base_k]
+        ndfl_north = s.north.tax_many(kopeck.trunc_div(n * 12, 100) for n in north)
+        for b, n, tb, tn in zip(base_k, north, ndfl_base, ndfl_north):
+            g = b + n
+            t = half_up(tb + tn, 12)
+            c = annual_constant(g, tariff_key, r.year)
+            gross.append(g)
+            ndfl.append(t)
+            net.append(g - t)
+            contributions.append(c)
+            cost.append(g * 12 + c)
+    return Sweep(oklads, series, gross, ndfl, net, contributions, cost, name, r.year)
+
+
+def oklad_range(start: int, stop: int, step: int) -> tuple[int, ...]:
+    """Оклады от start до stop включительно с шагом step."""
+    if step <= 0 or stop < start or start < 0:
+        raise ValueError("Диапазон окладов: от ≤ до, шаг > 0.")
+    # len(range) — без построения: «0-50000000 1» не должен занять память и цикл
+    points = range(start, stop + 1, step)
+    if len(points) > MAX_POINTS:
+        raise ValueError(f"Слишком большая сетка: {len(points)} окладов (максимум {MAX_POINTS}).")
+    return tuple(points)
+
+
+def parse_grid(text: str) -> tuple[tuple[int, ...], list[str], list[int]]:
+    """«50000-200000 10000; А Б Д; 0 30 50» → оклады, группы, надбавки.
+    Группы и надбавки можно не указывать: тогда все группы и 0/30/50%."""
+    parts = [p.strip() for p in text.replace("–", "-").split(";")]
+    tokens = parts[0].split()
+    step = tokens.pop() if len(tokens) > 1 else "10000"
+    start, _, stop = "".join(tokens).partition("-")
+    try:
+        start, stop, step = int(start), int(stop or start), int(step)
+    except ValueError:
+        raise ValueError("Оклады: «от-до шаг», например 50000-200000 10000.") from None
+    oklads = oklad_range(start, stop, step)
+    territories = (parts[1].upper().replace(",", " ").split() if len(parts) > 1 else []) or list(rates().TERRITORY_GROUPS)
+    try:
+        pcts = [int(x) for x in parts[2].replace(",", " ").replace("%", "").split()] if len(parts) > 2 else []
+    except ValueError:
+        raise ValueError("Надбавки — числа через пробел, например 0 30 50.") from None
+    return oklads, territories, pcts or [0, 30, 50]
+
+
+# ─────────────────────────────────────────────
+# ВЫГРУЗКА
+# ─────────────────────────────────────────────
+
+METRICS = (
+    ("net", "На руки, ₽ в мес"),
+    ("ndfl", "НДФЛ, ₽ в мес"),
+    ("contributions", "Взносы, ₽ в год"),
+    ("employer_cost", "Стоимость, ₽ в год"),
+)
+
+
+def _series_label(series: tuple[str, int], year: int) -> str:
+    territory, pct = series
+    return f"{territory} (РК {rates(year).TERRITORY_GROUPS[territory]['rk']}) / {pct}%"
+
+
+@rendered("xlsx", "sweep")
+def export_sweep_report(s: Sweep) -> IO[bytes]:
+    """Сводные таблицы: лист на показатель, строки — оклады, столбцы — пары
+    (группа, надбавка)."""
+    from bot.services.xlsx_stream import Book
+
+    book = Book()
+    labels = [_series_label(x, s.year) for x in s.series]
+    styles = ("data",) + ("money",) * len(labels)
+    for metric, title in METRICS:
+        sheet = book.sheet(title.split(",")[0], widths=[14] + [20] * len(labels))
+        sheet.header([title, *labels])
+        columns = [s.column(metric, i) for i in range(len(s.series))]
+        for row, oklad in enumerate(s.oklads):
+            sheet.row([oklad, *(column[row] / 100 for column in columns)], styles)
+
+    return book.save()
+
+
+_FONT_PATHS = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+)
+
+
+def _font(size: int):
+    """DejaVu Sans (кириллица), как в pdf_export; иначе — встроенный шрифт PIL."""
+    from PIL import ImageFont
+
+    for path in _FONT_PATHS:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+_PALETTE = (
+    (31, 78, 121), (192, 80, 77), (155, 187, 89), (128, 100, 162),
+    (75, 172, 198), (247, 150, 70), (89, 89, 89), (196, 189, 151),
+)
+
+
+@rendered("png", "sweep")
+def render_sweep_chart(
+    s: Sweep, metric: str = "employer_cost", width: int = 800, height: int = 480,
+) -> io.BytesIO:
+    """Линии показателя по окладу для каждой пары (группа, надбавка)."""
+    from PIL import Image, ImageDraw
+
+    title = dict(METRICS)[metric]
+    legend_rows = -(-len(s.series) // 4)
+    left, right, top, bottom = 90, 20, 30, 46 + 14 * legend_rows
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    font = _font(11)
+
+    columns = [s.column(metric, i) for i in range(len(s.series))]
+    x_min, x_max = s.oklads[0], s.oklads[-1]
+    y_max = max(max(c) for c in columns) / 100 or 1
+    plot_w, plot_h = width - left - right, height - top - bottom
+
+    def xy(oklad: int, value: int) -> tuple[float, float]:
+        x = left + (oklad - x_min) / ((x_max - x_min) or 1) * plot_w
+        return x, top + plot_h - value / 100 / y_max * plot_h
+
+    draw.text((left, 8), title, fill="black", font=font)
+    draw.line([(left, top), (left, top + plot_h), (left + plot_w, top + plot_h)], fill="black")
+    for i in range(5):
+        value = y_max * i / 4
+        y = top + plot_h - plot_h * i / 4
+        draw.line([(left - 4, y), (left + plot_w, y)], fill=(225, 225, 225))
+        draw.text((4, y - 6), f"{value:,.0f}".replace(",", " "), fill="black", font=font)
+    for oklad in (x_min, (x_min + x_max) // 2, x_max):
+        x, _ = xy(oklad, 0)
+        draw.text((min(x - 20, width - 60), top + plot_h + 6), f"{oklad:,}".replace(",", " "), fill="black", font=font)
+    draw.text((left + plot_w // 2 - 20, top + plot_h + 20), "оклад, ₽", fill="black", font=font)
+
+    for i, column in enumerate(columns):
+        color = _PALETTE[i % len(_PALETTE)]
+        draw.line([xy(o, v) for o, v in zip(s.oklads, column)], fill=color, width=2)
+        lx = left + (i % 4) * 170
+        ly = top + plot_h + 38 + (i // 4) * 14
+        draw.line([(lx, ly + 6), (lx + 14, ly + 6)], fill=color, width=3)
+        draw.text((lx + 18, ly), _series_label(s.series[i], s.year), fill="black", font=font)
+
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    buf.seek(0)
+    return buf
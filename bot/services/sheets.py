@@ -0,0 +1,44 @@
+"""Чтение таблиц (XLSX/CSV), присланных в бот: строки и сопоставление заголовков."""
+
+from __future__ import annotations
+
+import csv
+import io
+from typing import Mapping
+
+
+def read_rows(data: bytes, filename: str) -> list[tuple]:
+    """Непустые строки первого листа XLSX или CSV (разделитель — ; , или табуляция,
+    кодировка — UTF-8 или cp1251)."""
+    if filename.lower().endswith(".csv"):
+        try:
+            text = data.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            text = data.decode("cp1251")
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=";,\t")
+        except csv.Error:
+            dialect = csv.excel
+        rows = [tuple(r) for r in csv.reader(io.StringIO(text), dialect)]
+    else:
+        from openpyxl import load_workbook
+
+        wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+        try:
+            rows = list(wb.active.iter_rows(values_only=True))
+        finally:
+            wb.close()
+    return [r for r in rows if any(c not in (None, "") for c in r)]
+
+
+def header_map(row: tuple, keys: Mapping[str, tuple[str, ...]]) -> dict[str, int]:
+    """Столбец → номер ячейки заголовка по ключевым словам. Каждая ячейка
+    отходит первому подходящему столбцу в порядке keys."""
+    mapping: dict[str, int] = {}
+    for i, cell in enumerate(row):
+        text = str(cell or "").strip().lower()
+        for column, words in keys.items():
+            if column not in mapping and any(w in text for w in words):
+                mapping[column] = i
+                break
+    return mapping
@@ -4,19 +4,20 @@ import io
 import logging
 
 from bot.config.settings import settings
+from bot.services.llm import openai_client
+from bot.utils.metrics import timed
 
 logger = logging.getLogger(__name__)
 
 
+@timed("stt")
 async def transcribe_voice(audio_bytes: bytes, filename: str = "voice.ogg") -> str:
     """Транскрибирует аудио через Whisper API и возвращает текст."""
     if not settings.openai_api_key:
         return "⚠️ Не настроен OpenAI API-ключ для распознавания голоса."
 
-    from openai import AsyncOpenAI
-
     try:
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
+        client = openai_client()
         audio_file = io.BytesIO(audio_bytes)
         audio_file.name = filename
         response = await client.audio.transcriptions.create(
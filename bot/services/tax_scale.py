@@ -0,0 +1,195 @@
+"""Налоговые шкалы, скомпилированные из ставок года (registry.py).
+
+НДФЛ: ставки приведены к общему знаменателю, для каждой границы заранее
+посчитан налог со всех нижних ступеней, ступень дохода ищется bisect'ом —
+налог, предельная ставка и детализация получаются без прохода по шкале.
+Доход — целые рубли, налог — копейки (ROUND_HALF_UP, как на Decimal).
+
+Транспортный налог: ставка за л.с. по интервалам мощности, интервал —
+тоже bisect'ом по верхним границам.
+
+Шкалы года компилируются один раз на набор ставок (scales(year)) и после
+/reload_rates собираются заново.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from decimal import Decimal
+from fractions import Fraction
+from typing import Iterable, Mapping, NamedTuple, Optional, Sequence
+
+from bot.config.registry import RateSet, rates
+from bot.services import kopeck
+from bot.services.kopeck import half_up
+from bot.utils.cache import memoize
+
+
+class Bracket(NamedTuple):
+    lower: int               # ₽
+    upper: int               # ₽, верх облагаемой части
+    rate: Decimal
+    taxable: int             # ₽
+    tax: int                 # коп.
+
+
+class ScaleResult(NamedTuple):
+    tax: int                 # коп.
+    marginal_rate: Decimal
+    brackets: tuple[Bracket, ...]
+
+
+class CompiledScale:
+    """Шкала [(верхняя граница | None, ставка), ...] в виде таблиц."""
+
+    __slots__ = ("rates", "den", "lowers", "bounds", "scaled", "cumulative")
+
+    def __init__(self, scale: Sequence[tuple[Optional[int], Decimal]]):
+        fractions = [Fraction(rate) for _, rate in scale]
+        self.rates = tuple(rate for _, rate in scale)
+        self.den = math.lcm(*(f.denominator for f in fractions))
+        self.scaled = tuple(int(f * self.den) for f in fractions)
+        # Конечные верхние границы; последняя ступень — без границы
+        self.bounds = tuple(bound for bound, _ in scale if bound is not None)
+        self.lowers = (0, *self.bounds)
+        cumulative = [0]
+        for i, bound in enumerate(self.bounds):
+            cumulative.append(cumulative[-1] + (bound - self.lowers[i]) * self.scaled[i])
+        self.cumulative = tuple(cumulative)   # налог ниже lowers[i], ₽·den
+
+    def index(self, income: int) -> int:
+        """Номер ступени: доход, равный границе, остаётся в нижней ступени."""
+        return bisect_left(self.bounds, income)
+
+    def tax(self, income: int) -> int:
+        """Налог с годового дохода (₽) в копейках."""
+        i = bisect_left(self.bounds, income)
+        return half_up(
+            (self.cumulative[i] + (income - self.lowers[i]) * self.scaled[i]) * 100,
+            self.den,
+        )
+
+    def units(self, income_kop: int) -> int:
+        """Точный налог с дохода в копейках, умноженный на den (коп.·den).
+
+        Округление — за вызывающим: half_up(units, den) до копейки,
+        half_up(units, den * 100) до рубля.
+        """
+        i = bisect_left(self.bounds, -(-income_kop // 100))
+        return self.cumulative[i] * 100 + (income_kop - self.lowers[i] * 100) * self.scaled[i]
+
+    def marginal_rate(self, income: int) -> Decimal:
+        return self.rates[bisect_left(self.bounds, income)]
+
+    def bracket(self, i: int, upper: int) -> Bracket:
+        """Ступень i с облагаемой частью до upper (₽)."""
+        lower = self.lowers[i]
+        taxable = upper - lower
+        return Bracket(
+            lower, upper, self.rates[i], taxable,
+            half_up(taxable * self.scaled[i] * 100, self.den),
+        )
+
+    def breakdown(self, income: int) -> tuple[Bracket, ...]:
+        """Облагаемая часть и налог по каждой затронутой ступени."""
+        if income <= 0:
+            return ()
+        last = bisect_left(self.bounds, income)
+        bounds = self.bounds
+        return tuple(
+            self.bracket(i, income if i == last else bounds[i]) for i in range(last + 1)
+        )
+
+    def evaluate(self, income: int) -> ScaleResult:
+        """Налог, предельная ставка и детализация за один поиск ступени."""
+        return ScaleResult(
+            self.tax(income), self.marginal_rate(income), self.breakdown(income)
+        )
+
+    def tax_many(self, incomes: Iterable[int]) -> list[int]:
+        """Налог по списку доходов (столбцу) — без вызова метода на строку."""
+        bounds, lowers, scaled, cumulative, den = (
+            self.bounds, self.lowers, self.scaled, self.cumulative, self.den
+        )
+        two_den = 2 * den
+        out = []
+        for income in incomes:
+            i = bisect_left(bounds, income)
+            units = (cumulative[i] + (income - lowers[i]) * scaled[i]) * 100
+            out.append(
+                (2 * units + den) // two_den if units >= 0 else half_up(units, den)
+            )
+        return out
+
+
+@memoize("tax_scales", maxsize=64)
+def _compiled(scale: tuple) -> CompiledScale:
+    return CompiledScale(scale)
+
+
+def compiled(scale: Sequence) -> CompiledScale:
+    """Скомпилированная шкала [(граница | None, ставка), ...] — одна на шкалу."""
+    return _compiled(tuple(scale))
+
+
+# ─────────────────────────────────────────────
+# ТРАНСПОРТНЫЙ НАЛОГ
+# ─────────────────────────────────────────────
+
+class TransportScale:
+    """Интервалы [(от, до, ставка ₽/л.с.), ...]: мощность свыше верхней границы
+    предыдущего интервала и не выше своей попадает в интервал, в том числе
+    дробная (100,5 л.с. — в «101–150»)."""
+
+    __slots__ = ("lowest", "highs", "rates", "exact")
+
+    def __init__(self, brackets: Sequence[tuple[int, int, Decimal]]):
+        self.lowest = brackets[0][0]
+        self.highs = tuple(high for _, high, _ in brackets)
+        self.rates = tuple(rate for _, _, rate in brackets)
+        self.exact = tuple(kopeck.rate(rate) for rate in self.rates)
+
+    def index(self, horsepower) -> int:
+        i = bisect_left(self.highs, horsepower)
+        if horsepower < self.lowest or i == len(self.highs):
+            raise ValueError("Не удалось определить ставку для данной мощности.")
+        return i
+
+    def rate(self, horsepower) -> Decimal:
+        return self.rates[self.index(horsepower)]
+
+
+def transport_scale(vehicle_type: str, year: Optional[int] = None) -> TransportScale:
+    try:
+        return scales(year).transport[vehicle_type]
+    except KeyError:
+        raise ValueError("Неизвестный тип ТС.") from None
+
+
+# ─────────────────────────────────────────────
+# ШКАЛЫ ГОДА
+# ─────────────────────────────────────────────
+
+class Scales(NamedTuple):
+    ndfl: CompiledScale
+    north: CompiledScale            # РК и северная надбавка
+    dividends: CompiledScale
+    svo: CompiledScale
+    transport: Mapping[str, TransportScale]
+
+
+def year_scales(r: RateSet) -> Scales:
+    """Шкалы набора ставок; строятся один раз на набор (RateSet.derive)."""
+    return Scales(
+        compiled(r.NDFL_SCALE),
+        compiled(r.NDFL_SCALE_NORTH),
+        compiled(r.NDFL_DIVIDENDS),
+        compiled(r.NDFL_SVO),
+        {vehicle: TransportScale(b) for vehicle, b in r.TRANSPORT_TAX.items()},
+    )
+
+
+def scales(year: Optional[int] = None) -> Scales:
+    """Скомпилированные шкалы года (без года — текущего)."""
+    return rates(year).derive(year_scales)
@@ -0,0 +1,137 @@
+"""Поиск группы территорий по названию: «усть кут», «братский р-н», «в Бодайбо».
+
+Индекс строится один раз на набор ставок (RateSet.derive) из списков
+territories в TERRITORY_GROUPS: названия нормализуются (регистр, ё → е,
+дефисы и точки, «г.», «район», «р-н»), ключи лежат отсортированным списком —
+поиск по префиксу через bisect. Если ни точного, ни однозначного префиксного
+совпадения нет — ближайший ключ по расстоянию Левенштейна с порогом по длине.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from typing import NamedTuple, Optional
+
+from bot.config.registry import RateSet, rates
+
+# Слова, которые не различают территории: «г. Братск» = «Братск»
+_NOISE = frozenset({
+    "г", "гор", "город", "городе", "района", "район", "районе", "рн", "р",
+    "мо", "муниципальный", "муниципальное", "образование", "в", "во",
+})
+_WORD = re.compile(r"[a-zа-я0-9]+")
+# «Иркутская область» — регион, а не г. Иркутск
+_REGION = re.compile(r"иркутск\w*\s+обл\w*")
+
+# Окончания падежей после основы: «Братске», «Бодайбинского района»
+MAX_SUFFIX = 3
+MAX_WINDOW = 3      # слов в названии территории
+
+
+class TerritoryMatch(NamedTuple):
+    group: str          # ключ группы: «А»…«Д»
+    territory: str      # название, как в справочнике
+    distance: int       # 0 — точное/префиксное совпадение, иначе правки
+
+
+def normalize(text: str) -> str:
+    """«г. Усть-Кут» → «усть кут», «Братский р-н» → «братский»."""
+    text = text.casefold().replace("ё", "е").replace("р-н", " ")
+    text = _REGION.sub(" ", text)
+    return " ".join(w for w in _WORD.findall(text) if w not in _NOISE)
+
+
+class _Index(NamedTuple):
+    keys: list[str]                     # отсортированы — для bisect
+    entries: dict[str, TerritoryMatch]
+
+
+def _compile(r: RateSet) -> _Index:
+    entries: dict[str, TerritoryMatch] = {}
+    for group, data in r.TERRITORY_GROUPS.items():
+        for name in data["territories"]:
+            key = normalize(name)
+            entries.setdefault(key, TerritoryMatch(group, name, 0))
+            # Основа прилагательного: «катангск» — для «Катангского района»
+            if key.endswith("ий"):
+                entries.setdefault(key[:-2], TerritoryMatch(group, name, 0))
+    return _Index(sorted(entries), entries)
+
+
+def _levenshtein(a: str, b: str, limit: int) -> int:
+    """Расстояние правки; больше limit — limit + 1 (ранний выход)."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+def _prefixed(index: _Index, prefix: str) -> list[str]:
+    """Ключи, начинающиеся с prefix."""
+    out = []
+    for key in index.keys[bisect_left(index.keys, prefix):]:
+        if not key.startswith(prefix):
+            break
+        out.append(key)
+    return out
+
+
+def _lookup(index: _Index, key: str) -> Optional[TerritoryMatch]:
+    """Точное совпадение или основа с падежным окончанием (≤ MAX_SUFFIX букв)."""
+    found = index.entries.get(key)
+    if found is not None:
+        return found
+    for cut in range(1, min(MAX_SUFFIX, len(key) - 4) + 1):
+        if not key[-cut:].isalpha():
+            break       # отрезаем только буквы: «братск 60» — не «братск»
+        found = index.entries.get(key[:-cut])
+        if found is not None:
+            return found
+    return None
+
+
+def resolve(text: str, year: Optional[int] = None) -> Optional[TerritoryMatch]:
+    """Группа территорий для названия, введённого целиком."""
+    index = rates(year).derive(_compile)
+    key = normalize(text)
+    if len(key) < 2:
+        return None
+    found = _lookup(index, key)
+    if found is not None:
+        return found
+
+    # Начало названия: «бодайб», «усть ил» — если все варианты в одной группе
+    candidates = _prefixed(index, key)
+    if candidates and len({index.entries[c].group for c in candidates}) == 1:
+        return index.entries[min(candidates, key=len)]
+
+    limit = 1 if len(key) <= 5 else 2
+    best, best_distance = None, limit + 1
+    for candidate in index.keys:
+        d = _levenshtein(key, candidate, limit)
+        if d < best_distance:
+            best, best_distance = candidate, d
+    if best is None:
+        return None
+    return index.entries[best]._replace(distance=best_distance)
+
+
+def find(text: str, year: Optional[int] = None) -> Optional[TerritoryMatch]:
+    """Первая территория, названная в свободном тексте («зарплата в Братске»).
+    Без нечёткого поиска — в вопросе слишком много похожих слов."""
+    index = rates(year).derive(_compile)
+    words = normalize(text).split()
+    for start in range(len(words)):
+        for size in range(min(MAX_WINDOW, len(words) - start), 0, -1):
+            found = _lookup(index, " ".join(words[start:start + size]))
+            if found is not None:
+                return found
+    return None
@@ -0,0 +1,279 @@
+"""Транспортный налог организации по автопарку (XLSX/CSV → XLSX).
+
+Налог за год = мощность × ставка × доля в праве × (месяцев владения / 12),
+авансы за I–III кварталы — ¼ × мощность × ставка × доля × (месяцев
+владения в квартале / 3), к доплате по итогам года — налог минус авансы
+(ст. 362 НК РФ). Суммы — в полных рублях (п. 6 ст. 52 НК РФ). Данные по
+столбцам, все машины считаются за один проход.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from fractions import Fraction
+from typing import IO, Optional
+
+from bot.config.registry import rates
+from bot.services.calc_core import VEHICLE_TYPE_NAMES
+from bot.services.kopeck import half_up
+from bot.services.sheets import header_map, read_rows
+from bot.services.tax_scale import transport_scale
+from bot.utils.metrics import rendered, timed
+
+MAX_ROWS = 5000
+
+_HEADER_KEYS = {
+    "name": ("наимен", "модел", "марк", "номер"),
+    "type": ("тип", "вид"),
+    "horsepower": ("мощн", "л.с"),
+    "start": ("с месяца", "перв", "начал", "регистрац"),
+    "months": ("месяц", "мес."),
+    "share": ("дол",),
+}
+# Порядок столбцов в файле без заголовка
+_COLUMNS = ("name", "type", "horsepower", "months", "share", "start")
+
+_TYPE_WORDS = {
+    "car": ("car", "легк"),
+    "truck": ("truck", "груз"),
+    "bus": ("bus", "автобус"),
+    "motorcycle": ("motorcycle", "мото"),
+}
+
+QUARTERS = ("transport_org_q1", "transport_org_q2", "transport_org_q3")
+
+
+def _vehicle_type(value) -> str:
+    text = str(value or "").strip().lower()
+    for vehicle, words in _TYPE_WORDS.items():
+        if any(w in text for w in words):
+            return vehicle
+    raise ValueError(f"неизвестный тип ТС «{value}»")
+
+
+def _horsepower(value) -> int:
+    """Мощность в сотых долях л.с."""
+    try:
+        hp = Decimal(str(value).replace(" ", "").replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(f"мощность «{value}» — не число")
+    if not hp.is_finite():
+        raise ValueError(f"мощность «{value}» — не число")
+    if hp <= 0:
+        raise ValueError("мощность должна быть больше нуля")
+    return int((hp * 100).to_integral_value())
+
+
+def _share(value) -> Fraction:
+    """Доля в праве: «1/2», 0,5, «50%» или целое 2–100 (процент). Пусто — 1."""
+    if value in (None, ""):
+        return Fraction(1)
+    text = str(value).replace(" ", "").replace(",", ".")
+    percent = text.endswith("%")
+    try:
+        share = Fraction(text.removesuffix("%"))
+    except (ValueError, ZeroDivisionError):
+        raise ValueError(f"доля «{value}» — нужна дробь, например 1/2")
+    # Без «%» процентом считаем только целое 2–100: «1,5» — не 1,5 %, а ошибка
+    if percent or share > 1 and share.denominator == 1 and share <= 100:
+        share /= 100
+    if not 0 < share <= 1:
+        raise ValueError(f"доля «{value}» вне диапазона 0–1 (проценты — со знаком %, например 50%)")
+    return share
+
+
+def _month(value, default: int, what: str) -> int:
+    if value in (None, ""):
+        return default
+    number = float(str(value).replace(",", "."))
+    if not math.isfinite(number):
+        raise ValueError(f"{what} «{value}» — не число")
+    month = int(number)
+    if not 1 <= month <= 12:
+        raise ValueError(f"{what} «{value}» — нужно 1–12")
+    return month
+
+
+# ─────────────────────────────────────────────
+# ЧТЕНИЕ
+# ─────────────────────────────────────────────
+
+@dataclass(slots=True)
+class Fleet:
+    names: list[str] = field(default_factory=list)
+    types: list[str] = field(default_factory=list)
+    horsepower: list[int] = field(default_factory=list)     # сотые доли л.с.
+    months: list[int] = field(default_factory=list)         # месяцев владения
+    start: list[int] = field(default_factory=list)          # первый месяц владения
+    share: list[Fraction] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def read_fleet(data: bytes, filename: str, year: Optional[int] = None) -> Fleet:
+    """Разбирает таблицу автопарка. Строки с ошибками пропускаются и попадают
+    в Fleet.errors. Без заголовка столбцы берутся по порядку: наименование,
+    тип, мощность, месяцев владения (по умолчанию 12), доля (1), первый месяц
+    владения (январь)."""
+    rows = read_rows(data, filename)
+    if not rows:
+        raise ValueError("Файл пуст.")
+
+    mapping = header_map(rows[0], _HEADER_KEYS)
+    if "horsepower" in mapping:
+        rows, first_line = rows[1:], 2
+    else:
+        mapping, first_line = {c: i for i, c in enumerate(_COLUMNS)}, 1
+    if len(rows) > MAX_ROWS:
+        raise ValueError(f"Слишком много строк: {len(rows)} (максимум {MAX_ROWS}).")
+
+    fleet = Fleet()
+    for line, row in enumerate(rows, first_line):
+        cells = {c: row[i] if i < len(row) else None for c, i in mapping.items()}
+        try:
+            vehicle = _vehicle_type(cells.get("type"))
+            hp = _horsepower(cells.get("horsepower"))
+            transport_scale(vehicle, year).index(Fraction(hp, 100))
+            start = _month(cells.get("start"), 1, "первый месяц владения")
+            months = _month(cells.get("months"), 13 - start, "месяцев владения")
+            if start + months > 13:
+                raise ValueError(f"{months} мес. владения с {start}-го месяца — больше года")
+            share = _share(cells.get("share"))
+        except ValueError as e:
+            fleet.errors.append(f"строка {line}: {e}")
+            continue
+        except ArithmeticError:
+            fleet.errors.append(f"строка {line}: число вне допустимого диапазона")
+            continue
+        fleet.names.append(str(cells.get("name") or f"ТС {line}").strip())
+        fleet.types.append(vehicle)
+        fleet.horsepower.append(hp)
+        fleet.months.append(months)
+        fleet.start.append(start)
+        fleet.share.append(share)
+    return fleet
+
+
+# ─────────────────────────────────────────────
+# РАСЧЁТ
+# ─────────────────────────────────────────────
+
+@dataclass(slots=True)
+class FleetTax:
+    """Результат по столбцам, суммы — целые рубли."""
+    fleet: Fleet
+    rates: list[Decimal]
+    annual: list[int]
+    advances: tuple[list[int], list[int], list[int]]    # I–III кварталы
+    final: list[int]                                     # к доплате по итогам года
+    year: int
+
+    def total(self, column: str) -> int:
+        return sum(getattr(self, column))
+
+    def summary(self) -> str:
+        def rub(value: int) -> str:
+            return f"{value:,}".replace(",", " ")
+
+        lines = [
+            f"🚛 Транспортных средств: {len(self.fleet)} (ставки {self.year} г.)",
+            f"Налог за год: {rub(self.total('annual'))} ₽",
+        ]
+        for i, (key, column) in enumerate(zip(QUARTERS, self.advances), 1):
+            lines.append(f"Аванс за {i} кв. (до {_deadline(key, self.year)}): {rub(sum(column))} ₽")
+        lines.append(
+            f"К доплате за год (до {_deadline('transport_org_annual', self.year)}): "
+            f"{rub(self.total('final'))} ₽"
+        )
+        return "\n".join(lines)
+
+
+def _deadline(key: str, year: int) -> str:
+    return date.fromisoformat(rates(year).DEADLINES[key]).strftime("%d.%m.%Y")
+
+
+@timed("transport_fleet")
+def compute_fleet(fleet: Fleet, year: Optional[int] = None) -> FleetTax:
+    """Налог за год, авансы за I–III кварталы и доплата по каждой машине."""
+    year = rates(year).year
+    bracket_rates, annual, final = [], [], []
+    advances = ([], [], [])
+    for vehicle, hp, months, start, share in zip(
+        fleet.types, fleet.horsepower, fleet.months, fleet.start, fleet.share
+    ):
+        scale = transport_scale(vehicle, year)
+        i = scale.index(Fraction(hp, 100))
+        rate = scale.exact[i]
+        bracket_rates.append(scale.rates[i])
+        # num / den — налог за месяц владения: сотые л.с. × ставка × доля / 12
+        num = hp * rate.num * share.numerator
+        den = 100 * rate.den * share.denominator * 12
+        tax = half_up(num * months, den)
+        annual.append(tax)
+
+        end = start + months                  # первый месяц после владения
+        paid = 0
+        for q, column in enumerate(advances):
+            owned = max(0, min(end, q * 3 + 4) - max(start, q * 3 + 1))
+            advance = half_up(num * owned, den)
+            column.append(advance)
+            paid += advance
+        final.append(tax - paid)
+    return FleetTax(fleet, bracket_rates, annual, advances, final, year)
+
+
+# ─────────────────────────────────────────────
+# ВЫГРУЗКА
+# ─────────────────────────────────────────────
+
+def _report_columns(year: int) -> tuple[tuple[str, int], ...]:
+    return (
+        ("Наименование", 32),
+        ("Тип", 18),
+        ("Мощность, л.с.", 12),
+        ("Ставка, ₽/л.с.", 12),
+        ("Доля", 8),
+        ("Месяцев", 9),
+        ("Налог за год, ₽", 16),
+        (f"Аванс I кв., ₽\n(до {_deadline('transport_org_q1', year)})", 16),
+        (f"Аванс II кв., ₽\n(до {_deadline('transport_org_q2', year)})", 16),
+        (f"Аванс III кв., ₽\n(до {_deadline('transport_org_q3', year)})", 16),
+        (f"К доплате, ₽\n(до {_deadline('transport_org_annual', year)})", 16),
+    )
+
+
+@rendered("xlsx", "fleet")
+def export_fleet_report(t: FleetTax) -> IO[bytes]:
+    """XLSX-реестр автопарка с итоговой строкой (write-only, построчно)."""
+    from bot.services.xlsx_stream import Book
+
+    columns = _report_columns(t.year)
+    book = Book()
+    sheet = book.sheet(f"Транспортный налог {t.year}", widths=[width for _, width in columns])
+    sheet.header([title for title, _ in columns])
+
+    f = t.fleet
+    styles = ("data", "data", "decimal", "data", "data", "data", "rubles") + ("rubles",) * (len(t.advances) + 1)
+    for i in range(len(f)):
+        share = f.share[i]
+        sheet.row([
+            f.names[i],
+            VEHICLE_TYPE_NAMES.get(f.types[i], f.types[i]),
+            f.horsepower[i] / 100,
+            float(t.rates[i]),
+            str(share) if share.denominator != 1 else 1,
+            f.months[i],
+            t.annual[i],
+            *(column[i] for column in t.advances),
+            t.final[i],
+        ], styles)
+
+    sheet.total(["ИТОГО", "", "", "", "", "", t.total("annual"),
+                 *(sum(column) for column in t.advances), t.total("final")])
+
+    return book.save()
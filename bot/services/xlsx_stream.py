@@ -0,0 +1,119 @@
+"""Потоковая запись XLSX: openpyxl write-only и именованные стили.
+
+Строки уходят во временный файл листа сразу при добавлении, поэтому память
+не растёт с числом строк; готовая книга собирается в SpooledTemporaryFile —
+в памяти, пока не больше SPOOL_MAX, дальше на диске. Оформление — набор
+NamedStyle (STYLES), общий для всех отчётов: шрифты, заливки, рамки и
+выравнивания создаются один раз на модуль, ячейка получает ссылку на
+готовый стиль по имени вместо своих объектов Font/Alignment.
+
+    book = Book()
+    sheet = book.sheet("Реестр", widths=(30, 16))
+    sheet.header(["ФИО", "Сумма, ₽"])
+    sheet.row(["Иванов", 1234.5], (None, "money"))
+    sheet.row(["ИТОГО", 1234.5], "total")
+    buf = book.save()
+"""
+
+from __future__ import annotations
+
+import tempfile
+from itertools import repeat
+from typing import IO, Any, Iterable, Optional, Sequence, Union
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+# Больше — книга пишется на диск, а не в память
+SPOOL_MAX = 8 * 1024 * 1024
+
+HEADER_FONT = Font(bold=True, size=11)
+HEADER_FILL = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+TOTAL_FONT = Font(bold=True, size=11, color="1F4E79")
+TOTAL_FILL = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
+_THIN = Side(style="thin")
+THIN_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+NUM_FMT = "#,##0.00"
+INT_FMT = "#,##0"
+
+_CENTER_WRAP = Alignment(horizontal="center", vertical="center", wrap_text=True)
+_RIGHT = Alignment(horizontal="right")
+
+# Имя → параметры NamedStyle; стили добавляются в каждую книгу при создании
+STYLES: dict[str, dict[str, Any]] = {
+    "header": dict(font=HEADER_FONT, fill=HEADER_FILL, border=THIN_BORDER,
+                   alignment=_CENTER_WRAP),
+    "data": dict(border=THIN_BORDER),
+    "money": dict(border=THIN_BORDER, number_format=NUM_FMT, alignment=_RIGHT),
+    "rubles": dict(border=THIN_BORDER, number_format=INT_FMT, alignment=_RIGHT),
+    "decimal": dict(border=THIN_BORDER, number_format="0.00", alignment=_RIGHT),
+    "total": dict(font=TOTAL_FONT, fill=TOTAL_FILL, border=THIN_BORDER),
+    "total_money": dict(font=TOTAL_FONT, fill=TOTAL_FILL, border=THIN_BORDER,
+                        number_format=NUM_FMT, alignment=_RIGHT),
+    "total_rubles": dict(font=TOTAL_FONT, fill=TOTAL_FILL, border=THIN_BORDER,
+                         number_format=INT_FMT, alignment=_RIGHT),
+    "plain_money": dict(number_format=NUM_FMT),
+}
+
+# Стиль ячейки: имя из STYLES или None — значение без оформления
+Styles = Union[str, Sequence[Optional[str]], None]
+
+
+class Sheet:
+    """Лист write-only: только добавление строк сверху вниз."""
+
+    def __init__(self, ws, widths: Iterable[float] = ()):
+        self._ws = ws
+        for i, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(i)].width = width
+
+    def cell(self, value: Any, style: Optional[str]) -> Any:
+        if style is None:
+            return value
+        cell = WriteOnlyCell(self._ws, value=value)
+        cell.style = style
+        return cell
+
+    def row(self, values: Sequence[Any], styles: Styles = None) -> None:
+        """Строка значений; styles — одно имя на всю строку или по ячейкам."""
+        if styles is None:
+            self._ws.append(values)
+            return
+        if isinstance(styles, str):
+            styles = repeat(styles)
+        self._ws.append([self.cell(v, s) for v, s in zip(values, styles)])
+
+    def header(self, titles: Sequence[str]) -> None:
+        self.row(titles, "header")
+
+    def total(self, values: Sequence[Any]) -> None:
+        """Итоговая строка: числа — с разделителем разрядов, прочее — текстом."""
+        self.row(values, [
+            "total_money" if isinstance(v, float) else
+            "total_rubles" if isinstance(v, int) and not isinstance(v, bool) else "total"
+            for v in values
+        ])
+
+    def blank(self) -> None:
+        self._ws.append([])
+
+
+class Book:
+    """Книга write-only с зарегистрированными STYLES."""
+
+    def __init__(self):
+        self._wb = Workbook(write_only=True)
+        for name, params in STYLES.items():
+            self._wb.add_named_style(NamedStyle(name=name, **params))
+
+    def sheet(self, title: str, widths: Iterable[float] = ()) -> Sheet:
+        return Sheet(self._wb.create_sheet(title), widths)
+
+    def save(self) -> IO[bytes]:
+        """Книга во временном файле, указатель — в начале."""
+        buf = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX)
+        self._wb.save(buf)
+        buf.seek(0)
+        return buf
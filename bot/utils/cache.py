@@ -0,0 +1,90 @@
+"""LRU-кэш с учётом попаданий в метриках (bot_cache_requests_total)."""
+
+from __future__ import annotations
+
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from bot.utils.metrics import CACHE_REQUESTS
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Потокобезопасный LRU по числу записей и (опционально) суммарному весу."""
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        max_weight: int = 0,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.max_weight = max_weight
+        self._weigh = weigh or (lambda value: 0)
+        self._data: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                CACHE_REQUESTS.inc(cache=self.name, result="miss")
+                return default
+            self._data.move_to_end(key)
+        CACHE_REQUESTS.inc(cache=self.name, result="hit")
+        return item[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        weight = self._weigh(value)
+        if self.max_weight and weight > self.max_weight:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._weight -= old[1]
+            self._data[key] = (value, weight)
+            self._weight += weight
+            while self._data and (
+                len(self._data) > self.maxsize
+                or (self.max_weight and self._weight > self.max_weight)
+            ):
+                _, (_, dropped) = self._data.popitem(last=False)
+                self._weight -= dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def weight(self) -> int:
+        return self._weight
+
+
+def memoize(name: str, maxsize: int = 1024) -> Callable:
+    """Мемоизация чистой функции по позиционным аргументам через LRUCache."""
+
+    def decorator(func: Callable) -> Callable:
+        cache = LRUCache(name, maxsize)
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            result = cache.get(args, _MISSING)
+            if result is _MISSING:
+                result = func(*args)
+                cache.set(args, result)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
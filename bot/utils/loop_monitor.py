@@ -0,0 +1,156 @@
+"""Сторож event loop — задержка планирования и стек блокирующего кода.
+
+Сэмплер внутри цикла спит interval и измеряет, насколько позже проснулся
+(это и есть lag). Отдельный поток следит за «сердцебиением» сэмплера:
+если цикл не отвечает дольше threshold, поток снимает стек главного потока
+и текущую asyncio-задачу — то есть ровно тот код, что держит цикл.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from bot.utils.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+LOOP_LAG = histogram(
+    "bot_event_loop_lag_seconds", "Задержка планирования event loop", (), LAG_BUCKETS,
+)
+LOOP_LAG_QUANTILE = gauge(
+    "bot_event_loop_lag_quantile_seconds",
+    "Перцентили задержки event loop по последним сэмплам", ("quantile",),
+)
+LOOP_BLOCKS = counter(
+    "bot_event_loop_blocks_total", "Блокировки цикла дольше порога",
+)
+
+
+@dataclass
+class BlockReport:
+    """Эпизод блокировки цикла: кто держал и сколько."""
+
+    task: str
+    stack: str
+    duration: float = 0.0
+    at: float = field(default_factory=time.time)
+
+    def format(self) -> str:
+        return (
+            f"[{time.strftime('%H:%M:%S', time.localtime(self.at))}] "
+            f"{self.duration * 1000:.0f} мс — {self.task}\n{self.stack}"
+        )
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Перцентиль по отсортированному списку (метод ближайшего ранга)."""
+    if not values:
+        return 0.0
+    idx = min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))
+    return values[idx]
+
+
+class LoopMonitor:
+    def __init__(self, window: int = 3000, max_reports: int = 50):
+        self.interval = 0.1
+        self.threshold = 0.25
+        self.samples: deque[float] = deque(maxlen=window)
+        self.reports: deque[BlockReport] = deque(maxlen=max_reports)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id = 0
+        self._heartbeat = 0.0
+        self._pending: Optional[BlockReport] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    def start(self, interval: float = 0.1, threshold: float = 0.25) -> None:
+        """Запускает сэмплер в текущем цикле и поток-сторож."""
+        if self._task is not None:
+            return
+        self.interval = interval
+        self.threshold = threshold
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._sampler(), name="loop-monitor")
+        threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True).start()
+        logger.info(
+            "Мониторинг event loop: интервал %.0f мс, порог %.0f мс",
+            interval * 1000, threshold * 1000,
+        )
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def percentiles(self) -> dict[float, float]:
+        ordered = sorted(self.samples)
+        return {q: percentile(ordered, q) for q in QUANTILES}
+
+    # ─── Внутри цикла ───────────────────────
+
+    async def _sampler(self) -> None:
+        loop = asyncio.get_running_loop()
+        n = 0
+        while True:
+            planned = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - planned)
+            self._heartbeat = time.monotonic()
+            self.samples.append(lag)
+            LOOP_LAG.observe(lag)
+
+            pending = self._pending
+            if pending is not None:
+                # Цикл ожил — фиксируем полную длительность блокировки
+                self._pending = None
+                pending.duration = lag
+                self.reports.append(pending)
+                LOOP_BLOCKS.inc()
+                logger.warning("Event loop заблокирован: %s", pending.format())
+
+            n += 1
+            if n % 50 == 0:
+                for q, value in self.percentiles().items():
+                    LOOP_LAG_QUANTILE.set(value, quantile=str(q))
+
+    # ─── Поток-сторож ───────────────────────
+
+    def _watchdog(self) -> None:
+        check_every = max(self.threshold / 4, 0.01)
+        while not self._stop.wait(check_every):
+            stalled = time.monotonic() - self._heartbeat - self.interval
+            if stalled < self.threshold or self._pending is not None:
+                continue
+            self._pending = self._capture()
+
+    def _capture(self) -> BlockReport:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else "<стек недоступен>"
+        task_name = "<вне задачи>"
+        try:
+            task = asyncio.current_task(self._loop)
+            if task is not None:
+                coro = task.get_coro()
+                task_name = f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+        except RuntimeError:
+            pass
+        return BlockReport(task=task_name, stack=stack)
+
+
+loop_monitor = LoopMonitor()
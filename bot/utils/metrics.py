@@ -0,0 +1,407 @@
+"""Метрики в формате Prometheus — счётчики, гистограммы, gauge и HTTP-эндпоинт.
+
+Без внешних зависимостей: реестр в памяти, текстовый формат экспозиции 0.0.4,
+сервер на aiohttp (уже есть в зависимостях aiogram).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import io
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import IO, Any, Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+SIZE_BUCKETS = (
+    1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216,
+)
+
+LabelKey = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: tuple[str, ...], values: LabelKey, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        window: int = 0,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        # Последние window наблюдений (время, метки, значение) — для /stats
+        self._recent: Optional[deque[tuple[float, LabelKey, float]]] = (
+            deque(maxlen=window) if window else None
+        )
+
+    def _remember(self, key: LabelKey, value: float) -> None:
+        if self._recent is not None:
+            self._recent.append((time.monotonic(), key, value))
+
+    def recent(self, seconds: float) -> dict[LabelKey, list[float]]:
+        """Наблюдения за последние seconds секунд, сгруппированные по меткам."""
+        if self._recent is None:
+            return {}
+        since = time.monotonic() - seconds
+        with self._lock:
+            events = list(self._recent)
+        result: dict[LabelKey, list[float]] = {}
+        for ts, key, value in events:
+            if ts >= since:
+                result.setdefault(key, []).append(value)
+        return result
+
+    def _key(self, labels: dict[str, Any]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name}: ожидались метки {self.labelnames}, получены {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def expose(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=(), window=0):
+        super().__init__(name, documentation, labelnames, window)
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+            self._remember(key, amount)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def items(self) -> list[tuple[LabelKey, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+    def _samples(self):
+        for key, value in self.items():
+            yield f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(value)}"
+
+
+class Gauge(_Metric):
+    """Gauge; с collect — значение вычисляется в момент сбора."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), collect: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelKey, float] = {}
+        self._collect = collect
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        if self._collect is not None:
+            return self._collect()
+        return self._values.get(self._key(labels), 0)
+
+    def items(self) -> list[tuple[LabelKey, float]]:
+        if self._collect is not None:
+            try:
+                return [((), self._collect())]
+            except Exception as e:
+                logger.debug("Gauge %s: %s", self.name, e)
+                return []
+        with self._lock:
+            return list(self._values.items())
+
+    def _samples(self):
+        for key, value in self.items():
+            yield f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, window=0):
+        super().__init__(name, documentation, labelnames, window)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # метки → [счётчики по корзинам..., сумма, количество]
+        self._values: dict[LabelKey, list[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+            self._remember(key, value)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def items(self) -> list[tuple[LabelKey, list[float]]]:
+        with self._lock:
+            return [(k, list(v)) for k, v in self._values.items()]
+
+    def _samples(self):
+        for key, row in self.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                le = f'le="{_fmt_value(bound) if bound != float("inf") else "+Inf"}"'
+                yield (
+                    f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le)} "
+                    f"{cumulative}"
+                )
+            labels = _fmt_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_fmt_value(row[-2])}"
+            yield f"{self.name}_count{labels} {row[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def expose(self) -> str:
+        return "\n".join(m.expose() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames=(), window=0) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames, window))
+
+
+def gauge(name: str, documentation: str, labelnames=(), collect=None) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames, collect))
+
+
+def histogram(
+    name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS, window=0,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets, window))
+
+
+# ─── Метрики бота ───────────────────────────
+
+# Сколько последних наблюдений хранить для перцентилей в /stats
+STATS_WINDOW = 5000
+
+UPDATE_SECONDS = histogram(
+    "bot_update_seconds", "Время обработки апдейта хендлером роутера",
+    ("router", "event"), window=STATS_WINDOW,
+)
+UPDATE_ERRORS = counter(
+    "bot_update_errors_total", "Необработанные исключения в хендлерах",
+    ("router", "event"),
+)
+STAGE_SECONDS = histogram(
+    "bot_stage_seconds",
+    "Время этапа конвейера (download, rag_search, llm, ocr, stt)",
+    ("stage",), window=STATS_WINDOW,
+)
+STAGE_ERRORS = counter(
+    "bot_stage_errors_total", "Исключения на этапе конвейера", ("stage",),
+)
+DOWNLOAD_BYTES = histogram(
+    "bot_telegram_download_bytes", "Размер файлов, скачанных из Telegram",
+    ("kind",), SIZE_BUCKETS,
+)
+LLM_SECONDS = histogram(
+    "bot_llm_request_seconds", "Латентность запроса к LLM", ("provider", "model"),
+)
+LLM_TOKENS = counter(
+    "bot_llm_tokens_total", "Токены LLM", ("provider", "model", "direction"),
+    window=STATS_WINDOW,
+)
+RENDER_SECONDS = histogram(
+    "bot_render_seconds", "Время генерации отчёта", ("format", "report"),
+    window=STATS_WINDOW,
+)
+RENDER_WAIT = histogram(
+    "bot_render_wait_seconds",
+    "Ожидание отчёта сверх генерации: очередь пула и передача в процесс",
+    ("format", "report"), window=STATS_WINDOW,
+)
+RENDER_BYTES = histogram(
+    "bot_render_bytes", "Размер сгенерированного отчёта", ("format", "report"),
+    SIZE_BUCKETS,
+)
+INFLIGHT = gauge(
+    "bot_inflight", "Выполняющиеся в данный момент этапы", ("stage",),
+)
+QUEUE_DEPTH = gauge(
+    "bot_queue_depth", "Глубина очередей (updates — апдейты внутри диспетчера)",
+    ("queue",),
+)
+CACHE_REQUESTS = counter(
+    "bot_cache_requests_total", "Обращения к кэшам: result=hit|miss",
+    ("cache", "result"), window=STATS_WINDOW,
+)
+QUESTION_ROUTES = counter(
+    "bot_question_routes_total",
+    "Вопросы консультанту: route=calculator | facts (ответ без LLM) | llm",
+    ("route",), window=STATS_WINDOW,
+)
+API_SECONDS = histogram(
+    "bot_api_request_seconds", "Время запроса к HTTP API калькуляторов",
+    ("endpoint", "status"), window=STATS_WINDOW,
+)
+API_ROWS = counter(
+    "bot_api_rows_total", "Строки расчётов HTTP API: result=ok|error",
+    ("endpoint", "result"),
+)
+
+
+def _asyncio_tasks() -> int:
+    return len(asyncio.all_tasks())
+
+
+ASYNCIO_TASKS = gauge(
+    "bot_asyncio_tasks", "Живые asyncio-задачи в цикле бота", collect=_asyncio_tasks,
+)
+
+
+# ─── Общий помощник для замеров ─────────────
+
+@contextmanager
+def track(stage: str) -> Iterator[None]:
+    """Замеряет этап: время → bot_stage_seconds, in-flight, исключения."""
+    INFLIGHT.inc(stage=stage)
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+        INFLIGHT.dec(stage=stage)
+
+
+def timed(stage: str) -> Callable:
+    """Декоратор track() для обычных и async-функций."""
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with track(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def rendered(fmt: str, report: str) -> Callable:
+    """Декоратор генераторов отчётов, возвращающих файл (BytesIO или
+    временный файл) с указателем в начале: время и размер."""
+
+    def decorator(func: Callable[..., IO[bytes]]) -> Callable[..., IO[bytes]]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> IO[bytes]:
+            started = time.perf_counter()
+            buf = func(*args, **kwargs)
+            RENDER_SECONDS.observe(time.perf_counter() - started, format=fmt, report=report)
+            RENDER_BYTES.observe(buf.seek(0, io.SEEK_END), format=fmt, report=report)
+            buf.seek(0)
+            return buf
+        return wrapper
+
+    return decorator
+
+
+# ─── HTTP-эндпоинт /metrics ─────────────────
+
+async def start_metrics_server(host: str, port: int):
+    """Поднимает /metrics на aiohttp. Возвращает runner для остановки."""
+    from aiohttp import web
+
+    async def handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(
+            body=REGISTRY.expose().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info("Метрики: http://%s:%d/metrics", host, port)
+    return runner
@@ -0,0 +1,106 @@
+"""Профилирование в продакшене — сэмплирующий профайлер и diff tracemalloc.
+
+Сэмплер раз в interval снимает стеки всех потоков через sys._current_frames()
+и считает «свёрнутые» стеки (формат flamegraph.pl / speedscope). Накладные
+расходы — один проход по фреймам на сэмпл, код бота не инструментируется.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# Фреймы ожидания event loop — в отчёте помечаются как простой
+_IDLE_MARKERS = ("selectors.py", "threading.py:wait", "queue.py:get")
+
+# tracemalloc глобален: второй профиль остановил бы трассировку первому
+_LOCK = threading.Lock()
+
+
+def is_running() -> bool:
+    """Идёт ли сейчас профилирование."""
+    return _LOCK.locked()
+
+
+def _frame_key(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}:{frame.f_lineno}"
+
+
+def _collapse(frame) -> list[str]:
+    stack: list[str] = []
+    while frame is not None:
+        stack.append(_frame_key(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _sample(seconds: float, interval: float) -> tuple[Counter, Counter, int]:
+    folded: Counter = Counter()
+    own: Counter = Counter()
+    me = threading.get_ident()
+    names = {t.ident: t.name for t in threading.enumerate()}
+    samples = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            stack = _collapse(frame)
+            if not stack:
+                continue
+            thread = names.get(thread_id, str(thread_id))
+            folded[";".join([thread, *stack])] += 1
+            own[f"{thread}  {stack[-1]}"] += 1
+        samples += 1
+        time.sleep(interval)
+    return folded, own, samples
+
+
+def run_profile(seconds: float, interval: float = 0.005, top: int = 25) -> str:
+    """Профилирует процесс seconds секунд (блокирующе — вызывать в потоке).
+    Одновременно — только один профиль; второй получает RuntimeError."""
+    if not _LOCK.acquire(blocking=False):
+        raise RuntimeError("профилирование уже идёт")
+    try:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(10)
+        try:
+            before = tracemalloc.take_snapshot()
+            folded, own, samples = _sample(seconds, interval)
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+    finally:
+        _LOCK.release()
+
+    lines = [
+        f"Профиль за {seconds:.0f} с, сэмплов: {samples} (интервал {interval * 1000:.0f} мс)",
+        "",
+        f"── Топ-{top} по собственному времени (поток  файл:функция:строка) ──",
+    ]
+    total = sum(own.values()) or 1
+    for key, count in own.most_common(top):
+        idle = " [ожидание]" if any(m in key for m in _IDLE_MARKERS) else ""
+        lines.append(f"{count / total * 100:6.1f}%  {count:>6}  {key}{idle}")
+
+    lines.append("")
+    lines.append(f"── tracemalloc: топ-{top} приростов памяти ──")
+    lines.append(
+        f"Отслежено сейчас: {current / 1024:.0f} КБ, пик: {peak / 1024:.0f} КБ"
+    )
+    for stat in after.compare_to(before, "lineno")[:top]:
+        lines.append(str(stat))
+
+    lines.append("")
+    lines.append("── Свёрнутые стеки (flamegraph.pl / speedscope) ──")
+    for stack, count in folded.most_common():
+        lines.append(f"{stack} {count}")
+    return "\n".join(lines)
@@ -0,0 +1,152 @@
+"""Холодный старт: фоновый прогрев тяжёлых модулей и профиль импорта."""
+
+from __future__ import annotations
+
+import importlib
+import json
+import logging
+import subprocess
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+# Тяжёлые зависимости сервисов — импортируются лениво, при первом обращении
+HEAVY_MODULES = (
+    "chromadb",
+    "openpyxl",
+    "reportlab.platypus",
+    "PIL.Image",
+    "pdfplumber",
+    "openai",
+    "anthropic",
+)
+
+# Модули бота в порядке, в котором их подтягивает bot.main
+BOT_MODULES = (
+    "aiogram",
+    "bot.config.settings",
+    "bot.config.rates",
+    "bot.services.calc_core",
+    "bot.services.calculators",
+    "bot.services.llm",
+    "bot.services.rag",
+    "bot.services.ocr",
+    "bot.services.pdf_export",
+    "bot.handlers.common",
+    "bot.handlers.calculator",
+    "bot.handlers.documents",
+    "bot.handlers.consultant",
+    "bot.handlers.inline",
+    "bot.main",
+)
+
+
+def prewarm_modules(modules: tuple[str, ...] = HEAVY_MODULES) -> int:
+    """Импортирует тяжёлые модули заранее. Возвращает кол-во загруженных."""
+    loaded = 0
+    for name in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.warning("Прогрев %s не удался: %s", name, e)
+            continue
+        loaded += 1
+        logger.info("Прогрет %s за %.0f мс", name, (time.perf_counter() - started) * 1000)
+    return loaded
+
+
+# ─── Профиль старта (python -m bot.main --profile-startup) ─
+
+# Выполняется в чистом интерпретаторе: модули до "--" — старт бота,
+# после — отложенные тяжёлые зависимости.
+_CHILD_SCRIPT = """
+import importlib, json, os, sys, time
+
+def rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+rows, eager = [], []
+for name in sys.argv[1:]:
+    if name == "--":
+        eager = [m for m in HEAVY if m in sys.modules]
+        rows.append(None)
+        continue
+    before_rss = rss_kb()
+    started = time.perf_counter()
+    error = ""
+    try:
+        importlib.import_module(name)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    rows.append({
+        "module": name,
+        "ms": (time.perf_counter() - started) * 1000,
+        "rss_kb": rss_kb() - before_rss,
+        "error": error,
+    })
+print(json.dumps({"rows": rows, "rss_kb": rss_kb(), "eager": eager}))
+"""
+
+
+def _top_self_times(importtime_log: str, limit: int) -> list[tuple[str, int]]:
+    """Разбирает вывод -X importtime: самые дорогие модули по self-time, мкс."""
+    result: list[tuple[str, int]] = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        result.append((parts[2].strip(), int(parts[0])))
+    result.sort(key=lambda item: item[1], reverse=True)
+    return result[:limit]
+
+
+def profile_startup(
+    modules: tuple[str, ...] = BOT_MODULES,
+    heavy: tuple[str, ...] = HEAVY_MODULES,
+    top: int = 15,
+) -> str:
+    """Импортирует модули в чистом интерпретаторе и возвращает отчёт.
+
+    Время и прирост RSS считаются по каждому модулю последовательно, поэтому
+    строка модуля показывает только то, что он добавил к уже загруженному.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         f"HEAVY = {heavy!r}\n" + _CHILD_SCRIPT, *modules, "--", *heavy],
+        capture_output=True,
+        text=True,
+    )
+    try:
+        data = json.loads(proc.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        return f"Профилирование не удалось:\n{proc.stderr[-2000:]}"
+
+    lines = [f"{'Модуль':<32} {'мс':>9} {'RSS, КБ':>10}"]
+    for row in data["rows"]:
+        if row is None:
+            lines.append("── отложенные (грузятся при первом обращении) ──")
+            continue
+        mark = f"  ! {row['error']}" if row["error"] else ""
+        lines.append(
+            f"{row['module']:<32} {row['ms']:>9.1f} {row['rss_kb']:>10}{mark}"
+        )
+    lines.append(f"Итого RSS: {data['rss_kb'] // 1024} МБ")
+    lines.append(
+        "Тяжёлые модули при старте: "
+        + (", ".join(data["eager"]) if data["eager"] else "нет")
+    )
+
+    lines.append("")
+    lines.append(f"Топ-{top} по собственному времени импорта:")
+    for name, self_us in _top_self_times(proc.stderr, top):
+        lines.append(f"  {self_us / 1000:>8.1f} мс  {name}")
+    return "\n".join(lines)
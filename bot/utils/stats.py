@@ -0,0 +1,127 @@
+"""Сводка /stats — перцентили этапов, кэши, вопросы без LLM, токены LLM, очереди, память."""
+
+from __future__ import annotations
+
+import os
+
+from bot.services.llm import MODEL_PRICES_USD
+from bot.utils.loop_monitor import loop_monitor, percentile
+from bot.utils.metrics import (
+    ASYNCIO_TASKS,
+    CACHE_REQUESTS,
+    INFLIGHT,
+    LLM_TOKENS,
+    QUESTION_ROUTES,
+    QUEUE_DEPTH,
+    RENDER_SECONDS,
+    RENDER_WAIT,
+    STAGE_SECONDS,
+    UPDATE_SECONDS,
+    Gauge,
+)
+
+
+def rss_bytes() -> int:
+    """Текущий RSS процесса (Linux /proc, иначе пиковый из getrusage)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}"
+
+
+def _percentile_lines(groups: dict[tuple[str, ...], list[float]]) -> list[str]:
+    lines = []
+    for key in sorted(groups):
+        values = sorted(groups[key])
+        lines.append(
+            f"  {'/'.join(key)}: n={len(values)} "
+            f"p50={_ms(percentile(values, 0.5))} "
+            f"p95={_ms(percentile(values, 0.95))} "
+            f"p99={_ms(percentile(values, 0.99))} мс"
+        )
+    return lines or ["  нет данных"]
+
+
+def _gauge_lines(metric: Gauge) -> list[str]:
+    return [f"  {'/'.join(key)}: {value:.0f}" for key, value in metric.items() if value]
+
+
+def format_stats(window_s: float = 3600) -> str:
+    """Текстовая сводка (HTML) за последние window_s секунд."""
+    lines = [f"<b>Статистика за {window_s / 60:.0f} мин</b>", ""]
+
+    lines.append("<b>Этапы конвейера</b>")
+    lines.extend(_percentile_lines(STAGE_SECONDS.recent(window_s)))
+    lines.append("<b>Роутеры</b>")
+    lines.extend(_percentile_lines(UPDATE_SECONDS.recent(window_s)))
+    lines.append("<b>Отчёты</b>")
+    lines.extend(_percentile_lines(RENDER_SECONDS.recent(window_s)))
+    wait = RENDER_WAIT.recent(window_s)
+    if wait:
+        lines.append("<b>Очередь отчётов</b>")
+        lines.extend(_percentile_lines(wait))
+
+    lines.append("")
+    lines.append("<b>Кэши</b>")
+    caches: dict[str, dict[str, float]] = {}
+    for (cache, result), values in CACHE_REQUESTS.recent(window_s).items():
+        caches.setdefault(cache, {})[result] = sum(values)
+    if not caches:
+        lines.append("  нет данных")
+    for cache, counts in sorted(caches.items()):
+        hits, misses = counts.get("hit", 0), counts.get("miss", 0)
+        ratio = hits / (hits + misses) * 100 if hits + misses else 0
+        lines.append(f"  {cache}: {ratio:.0f}% попаданий ({hits:.0f}/{hits + misses:.0f})")
+
+    lines.append("")
+    lines.append("<b>Вопросы</b>")
+    routes = {key[0]: sum(v) for key, v in QUESTION_ROUTES.recent(window_s).items()}
+    asked = sum(routes.values())
+    if asked:
+        local = asked - routes.get("llm", 0)
+        lines.append(
+            f"  без LLM: {local / asked * 100:.0f}% ({local:.0f}/{asked:.0f}) — "
+            f"калькулятор {routes.get('calculator', 0):.0f}, справка {routes.get('facts', 0):.0f}"
+        )
+    else:
+        lines.append("  нет данных")
+
+    lines.append("")
+    lines.append("<b>LLM</b>")
+    tokens: dict[str, dict[str, float]] = {}
+    for (provider, model, direction), values in LLM_TOKENS.recent(window_s).items():
+        tokens.setdefault(model, {})[direction] = sum(values)
+    if not tokens:
+        lines.append("  нет данных")
+    total_cost = 0.0
+    for model, counts in sorted(tokens.items()):
+        prompt, completion = counts.get("prompt", 0), counts.get("completion", 0)
+        price_in, price_out = MODEL_PRICES_USD.get(model, (0.0, 0.0))
+        cost = (prompt * price_in + completion * price_out) / 1_000_000
+        total_cost += cost
+        lines.append(
+            f"  {model}: вход {prompt:.0f}, выход {completion:.0f} токенов ≈ ${cost:.2f}"
+        )
+    if tokens:
+        lines.append(f"  Итого ≈ ${total_cost:.2f}")
+
+    lines.append("")
+    lines.append("<b>Очереди и нагрузка</b>")
+    lines.extend(_gauge_lines(QUEUE_DEPTH) or ["  очереди пусты"])
+    lines.extend(_gauge_lines(INFLIGHT))
+    for _, tasks in ASYNCIO_TASKS.items():
+        lines.append(f"  asyncio-задач: {tasks:.0f}")
+    lag = loop_monitor.percentiles()
+    lines.append(
+        f"  lag event loop: p50={_ms(lag[0.5])} p95={_ms(lag[0.95])} "
+        f"p99={_ms(lag[0.99])} мс, блокировок: {len(loop_monitor.reports)}"
+    )
+    lines.append(f"  RSS: {rss_bytes() / 1024 / 1024:.0f} МБ")
+    return "\n".join(lines)
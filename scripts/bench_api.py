@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Пропускная способность HTTP API калькуляторов (bot/api.py).
+
+Запуск:
+    python scripts/bench_api.py                       # все расчёты, 20 000 строк
+    python scripts/bench_api.py --kind salary --rows 100000 --concurrency 8
+    python scripts/bench_api.py --url http://127.0.0.1:8088 --token secret
+
+Без --url API поднимается в этом же процессе на свободном порту. Для
+каждого расчёта три режима: одиночные запросы (--concurrency параллельно),
+пакет JSON-массивом и NDJSON; результат — строк в секунду. Ответы пакетов
+сверяются с одиночными: при расхождении скрипт завершается с кодом 1.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiohttp import ClientSession, web  # noqa: E402
+
+from bot.api import CALCULATORS, NDJSON, build_app  # noqa: E402
+from bot.config.registry import rates  # noqa: E402
+
+SINGLE_LIMIT = 2000         # одиночных запросов на расчёт — дальше долго
+
+
+def make_rows(kind: str, n: int, rnd: random.Random) -> list[dict]:
+    if kind == "salary":
+        groups = list(rates().TERRITORY_GROUPS)
+        return [{"territory": rnd.choice(groups), "oklad": rnd.randrange(20_000, 400_000),
+                 "nadbavka_pct": rnd.choice((0, 10, 30, 50, 80))} for _ in range(n)]
+    if kind == "ndfl":
+        return [{"income": rnd.randrange(0, 60_000_000)} for _ in range(n)]
+    if kind == "contributions":
+        return [{"monthly_salary": rnd.randrange(20_000, 500_000),
+                 "tariff": rnd.choice(("general", "msp", "it"))} for _ in range(n)]
+    if kind == "nds":
+        return [{"amount": rnd.randrange(1, 10_000_000), "rate_pct": rnd.choice((22, 10))}
+                for _ in range(n)]
+    return [{"vehicle_type": rnd.choice(("car", "truck", "bus", "motorcycle")),
+             "horsepower": rnd.randrange(50, 500)} for _ in range(n)]
+
+
+async def single(session: ClientSession, url: str, rows: list[dict], concurrency: int) -> list[dict]:
+    out: list = [None] * len(rows)
+    queue = iter(range(len(rows)))
+
+    async def worker() -> None:
+        for i in queue:
+            async with session.post(url, json=rows[i]) as resp:
+                out[i] = await resp.json()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return out
+
+
+async def batch_json(session: ClientSession, url: str, rows: list[dict]) -> list[dict]:
+    async with session.post(url + "/batch", json=rows) as resp:
+        return await resp.json()
+
+
+async def batch_ndjson(session: ClientSession, url: str, rows: list[dict]) -> list[dict]:
+    body = "".join(json.dumps(r) + "\n" for r in rows).encode()
+    async with session.post(url + "/batch", data=body, headers={"Content-Type": NDJSON}) as resp:
+        return [json.loads(line) async for line in resp.content]
+
+
+async def run(args) -> int:
+    runner = None
+    base = args.url
+    if base is None:
+        runner = web.AppRunner(build_app(args.concurrency, args.token), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        base = f"http://{host}:{port}"
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    rnd = random.Random(args.seed)
+    kinds = [args.kind] if args.kind else list(CALCULATORS)
+    status = 0
+    print(f"{'расчёт':<14} {'режим':<8} {'строк':>8} {'сек':>8} {'строк/с':>10}")
+    async with ClientSession(headers=headers) as session:
+        for kind in kinds:
+            url = f"{base}/v1/{kind}"
+            rows = make_rows(kind, args.rows, rnd)
+            n_single = min(len(rows), SINGLE_LIMIT)
+            results = {}
+            for mode, call, n in (
+                ("single", lambda r: single(session, url, r, args.concurrency), n_single),
+                ("json", lambda r: batch_json(session, url, r), len(rows)),
+                ("ndjson", lambda r: batch_ndjson(session, url, r), len(rows)),
+            ):
+                started = time.perf_counter()
+                results[mode] = await call(rows[:n])
+                elapsed = time.perf_counter() - started
+                print(f"{kind:<14} {mode:<8} {n:>8} {elapsed:>8.3f} {n / elapsed:>10,.0f}")
+
+            errors = sum("error" in r for r in results["json"])
+            if errors:
+                print(f"  {kind}: {errors} строк с ошибкой, например {next(r for r in results['json'] if 'error' in r)}")
+            if (results["json"] != results["ndjson"]
+                    or results["json"][:n_single] != results["single"]):
+                print(f"  {kind}: ответы режимов расходятся")
+                status = 1
+
+    if runner is not None:
+        await runner.cleanup()
+    return status
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--kind", choices=list(CALCULATORS))
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--url", help="уже запущенный API; без него — в этом процессе")
+    parser.add_argument("--token", default="")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""Сверка копеечного ядра с эталоном на Decimal и замер скорости.
+
+Запуск:
+    python scripts/bench_kopeck.py                # 200 000 случайных входов
+    python scripts/bench_kopeck.py --cases 20000 --seed 7
+
+Эталон — расчёты calc_core в том виде, в каком они были на Decimal (ниже;
+помесячные взносы — нарастающим итогом, как в contributions.py). Результаты сравниваются по repr, т.е. вместе с экспонентой
+Decimal; различается только знак нуля (Decimal('-0.00') у эталона при
+отрицательной надбавке) — он не учитывается. При первом расхождении скрипт
+печатает вход и завершается с кодом 1.
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot.config.rates import (  # noqa: E402
+    EPB,
+    INSURANCE_ABOVE,
+    INSURANCE_BASE,
+    MROT,
+    NDFL_DIVIDENDS,
+    NDFL_SCALE,
+    NDFL_SCALE_NORTH,
+    NDFL_SVO,
+    TERRITORY_GROUPS,
+    YEAR,
+)
+from bot.config.registry import rates  # noqa: E402
+from bot.services.calc_core import (  # noqa: E402
+    MONTH_NAMES,
+    ContributionMonth,
+    ContributionsResult,
+    NdflBracket,
+    NdflResult,
+    SalaryResult,
+    _contributions,
+    _ndfl,
+    _salary,
+    contributions_kop,
+    salary_kop,
+)
+from bot.services.kopeck import to_decimal  # noqa: E402
+from bot.services.tax_scale import compiled, scales  # noqa: E402
+
+TWO_PLACES = Decimal("0.01")
+
+
+def _round(value: Decimal) -> Decimal:
+    return value.quantize(TWO_PLACES, ROUND_HALF_UP)
+
+
+# ─── Эталон на Decimal ───────────────────────
+
+def ref_apply_scale(income: int, scale: list) -> Decimal:
+    total_tax = Decimal(0)
+    prev_bound = 0
+    for bound, rate in scale:
+        if bound is None or income <= bound:
+            total_tax += Decimal(income - prev_bound) * rate
+            break
+        total_tax += Decimal(bound - prev_bound) * rate
+        prev_bound = bound
+    return _round(total_tax)
+
+
+def ref_salary(territory: str, oklad: int, nadbavka_pct: int) -> SalaryResult:
+    group = TERRITORY_GROUPS.get(territory)
+    if not group:
+        raise ValueError("Неизвестная группа территорий.")
+
+    oklad_d = Decimal(oklad)
+    rk = group["rk"]
+    nadbavka = min(Decimal(nadbavka_pct) / 100, group["max_nadbavka"])
+
+    rk_sum = _round(oklad_d * (rk - 1))
+    nadb_sum = _round(oklad_d * nadbavka)
+    gross = oklad_d + rk_sum + nadb_sum
+
+    # НДФЛ: основная часть — шкала 13–22%, северная — 13%/15%
+    ndfl_base = ref_apply_scale(int(oklad_d * 12), NDFL_SCALE)
+    ndfl_north = ref_apply_scale(int((rk_sum + nadb_sum) * 12), NDFL_SCALE_NORTH)
+    ndfl_monthly = _round((ndfl_base + ndfl_north) / 12)
+
+    return SalaryResult(
+        year=YEAR,
+        territory=territory,
+        territory_name=group["name"],
+        rk=rk,
+        nadbavka=nadbavka,
+        oklad=oklad_d,
+        rk_sum=rk_sum,
+        nadb_sum=nadb_sum,
+        gross=gross,
+        ndfl_base_monthly=_round(ndfl_base / 12),
+        ndfl_north_monthly=_round(ndfl_north / 12),
+        ndfl_monthly=ndfl_monthly,
+        net=_round(gross - ndfl_monthly),
+        insurance_monthly=_round(gross * INSURANCE_BASE),
+        extra_vacation=group["extra_vacation"],
+        women_work_week=group["women_work_week"],
+        mrot=MROT,
+    )
+
+
+def ref_ndfl(annual_income: int) -> NdflResult:
+    income_d = Decimal(annual_income)
+    tax = ref_apply_scale(annual_income, NDFL_SCALE)
+
+    brackets: list[NdflBracket] = []
+    prev = 0
+    for bound, rate in NDFL_SCALE:
+        if annual_income <= prev:
+            break
+        top = bound if bound and annual_income > bound else annual_income
+        taxable = Decimal(top - prev)
+        brackets.append(NdflBracket(
+            lower=Decimal(prev),
+            upper=Decimal(top),
+            rate=rate,
+            taxable=taxable,
+            tax=_round(taxable * rate),
+        ))
+        if bound is None or annual_income <= bound:
+            break
+        prev = bound
+
+    net = income_d - tax
+    return NdflResult(
+        year=YEAR,
+        income=income_d,
+        tax=tax,
+        effective_pct=_round(tax / income_d * 100) if income_d else Decimal(0),
+        net=net,
+        net_monthly=_round(net / 12),
+        brackets=tuple(brackets),
+    )
+
+
+def ref_contributions(monthly_salary: int) -> ContributionsResult:
+    monthly = Decimal(monthly_salary)
+    annual = monthly * 12
+
+    if annual <= EPB:
+        total = _round(annual * INSURANCE_BASE)
+        exhaust_month = "не исчерпана за год"
+    else:
+        within = _round(Decimal(EPB) * INSURANCE_BASE)
+        above = _round((annual - EPB) * INSURANCE_ABOVE)
+        total = within + above
+        months_to_exhaust = Decimal(EPB) / monthly
+        exhaust_int = int(months_to_exhaust)
+        if months_to_exhaust % 1 > 0:
+            exhaust_int += 1
+        exhaust_month = (
+            MONTH_NAMES[exhaust_int - 1] if exhaust_int <= 12 else "не исчерпана"
+        )
+
+    # Взносы нарастающим итогом: месяц = взносы с базы с начала года − начисленное
+    def accrued(base: Decimal) -> Decimal:
+        within = min(base, Decimal(EPB))
+        return _round(within * INSURANCE_BASE + (base - within) * INSURANCE_ABOVE)
+
+    months: list[ContributionMonth] = []
+    cumulative = Decimal(0)
+    for name in MONTH_NAMES:
+        prev_cumulative = cumulative
+        cumulative += monthly
+        if prev_cumulative >= EPB:
+            rate = INSURANCE_ABOVE
+        elif cumulative > EPB:
+            rate = None
+        else:
+            rate = INSURANCE_BASE
+        months.append(ContributionMonth(
+            name=name,
+            salary=monthly,
+            cumulative=cumulative,
+            rate=rate,
+            contribution=accrued(cumulative) - accrued(prev_cumulative),
+            crosses_limit=rate is None,
+        ))
+
+    return ContributionsResult(
+        year=YEAR,
+        monthly=monthly,
+        annual=annual,
+        epb=EPB,
+        rate_within=INSURANCE_BASE,
+        rate_above=INSURANCE_ABOVE,
+        monthly_within=_round(monthly * INSURANCE_BASE),
+        total=total,
+        exhaust_month=exhaust_month,
+        months=tuple(months),
+    )
+
+
+# ─── Сверка ──────────────────────────────────
+
+# Без мемоизации — иначе сверялся бы кэш, а не расчёт
+KERNEL = {
+    "salary": (lambda *a: _salary.__wrapped__(rates(), *a), ref_salary),
+    "ndfl": (lambda *a: _ndfl.__wrapped__(rates(), *a), ref_ndfl),
+    "contributions": (lambda m: _contributions.__wrapped__(rates(), m, "general"), ref_contributions),
+}
+
+_BOUNDS = [b for b, _ in NDFL_SCALE + NDFL_SCALE_NORTH if b] + [EPB, EPB // 12]
+
+
+def _amount(rnd: random.Random) -> int:
+    """Сумма в рублях: окрестности границ шкал и ЕПБ, широкий диапазон, края."""
+    kind = rnd.random()
+    if kind < 0.3:
+        bound = rnd.choice(_BOUNDS)
+        return bound + rnd.randint(-3, 3) if rnd.random() < 0.5 else bound // 12 + rnd.randint(-50, 50)
+    if kind < 0.9:
+        return int(10 ** rnd.uniform(0, 8.5))
+    return rnd.choice([0, 1, 2, 7, 11, 12, 13, -1, -12_345, 10**12 + 7])
+
+
+def make_cases(n: int, seed: int) -> dict[str, list[tuple]]:
+    rnd = random.Random(seed)
+    territories = list(TERRITORY_GROUPS)
+    return {
+        "salary": [
+            (rnd.choice(territories), _amount(rnd), rnd.randint(-5, 110)) for _ in range(n)
+        ],
+        "ndfl": [(_amount(rnd),) for _ in range(n)],
+        "contributions": [(_amount(rnd),) for _ in range(n)],
+    }
+
+
+def _repr(result) -> str:
+    return repr(result).replace("Decimal('-0", "Decimal('0")
+
+
+def check(cases: dict[str, list[tuple]]) -> bool:
+    for name, args_list in cases.items():
+        kernel, reference = KERNEL[name]
+        for args in args_list:
+            got, expected = _repr(kernel(*args)), _repr(reference(*args))
+            if got != expected:
+                print(f"❌ {name}{args}:\n  ядро:   {got}\n  эталон: {expected}")
+                return False
+        print(f"✅ {name}: {len(args_list)} входов совпали")
+
+    # Шкалы: налог, налог по столбцу и сумма детализации против эталона
+    incomes = [args[0] for args in cases["ndfl"]]
+    for scale in (NDFL_SCALE, NDFL_SCALE_NORTH, NDFL_DIVIDENDS, NDFL_SVO):
+        table = compiled(scale)
+        column = table.tax_many(incomes)
+        for income, tax in zip(incomes, column):
+            expected = ref_apply_scale(income, scale)
+            parts = table.breakdown(income)
+            if (
+                to_decimal(table.tax(income)) != expected
+                or to_decimal(tax) != expected
+                or (income > 0 and sum(b.taxable for b in parts) != income)
+            ):
+                print(f"❌ шкала {scale}: доход {income}, эталон {expected}")
+                return False
+    print(f"✅ шкалы: 4 × {len(incomes)} доходов совпали")
+    return True
+
+
+# Что замеряем: (эталон, реализация на копейках, кейсы)
+BENCH = {
+    "apply_scale": (lambda i: ref_apply_scale(i, NDFL_SCALE), scales().ndfl.tax, "ndfl"),
+    "salary": (ref_salary, KERNEL["salary"][0], "salary"),
+    "salary (int)": (ref_salary, salary_kop, "salary"),
+    "ndfl": (ref_ndfl, KERNEL["ndfl"][0], "ndfl"),
+    "contributions": (ref_contributions, KERNEL["contributions"][0], "contributions"),
+    "contrib. (int)": (ref_contributions, contributions_kop, "contributions"),
+}
+
+
+def bench(cases: dict[str, list[tuple]], sample: int) -> None:
+    """Время на один вызов. Строки «(int)» — ядро без сборки Decimal-результата,
+    как его используют пакетный расчёт и API."""
+    print(f"\n{'расчёт':<16}{'Decimal, мкс':>14}{'копейки, мкс':>14}{'ускорение':>11}")
+    for name, (reference, kernel, case) in BENCH.items():
+        batch = cases[case][:sample]
+        t_ref = min(timeit.repeat(lambda: [reference(*a) for a in batch], number=1, repeat=3))
+        t_new = min(timeit.repeat(lambda: [kernel(*a) for a in batch], number=1, repeat=3))
+        us_ref, us_new = t_ref / len(batch) * 1e6, t_new / len(batch) * 1e6
+        print(f"{name:<16}{us_ref:>14.2f}{us_new:>14.2f}{us_ref / us_new:>10.1f}×")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cases", type=int, default=200_000, help="входов на расчёт")
+    parser.add_argument("--bench", type=int, default=20_000, help="входов для замера")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    cases = make_cases(args.cases, args.seed)
+    if not check(cases):
+        sys.exit(1)
+    bench(cases, args.bench)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Выгрузка XLSX: потоковая запись (xlsx_stream) против книги в памяти.
+
+Запуск:
+    python scripts/bench_xlsx.py                  # 10, 1 000 и 10 000 строк
+    python scripts/bench_xlsx.py --rows 10 1000 10000 50000 --repeat 3
+
+Для каждого размера реестра (столбцы — как в зарплатном реестре
+payroll_batch) три варианта:
+    memory   — прежний способ: Workbook в памяти, оформление каждой ячейки
+               отдельными объектами (_style_data/_style_header ниже);
+    stream   — xlsx_stream.Book: write-only и именованные стили;
+    payroll  — export_payroll_report на синтетическом штате (расчёт не входит).
+Время — лучшее из --repeat прогонов, память — пик tracemalloc за отдельный
+прогон, размер — готового файла.
+"""
+
+import argparse
+import io
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openpyxl import Workbook  # noqa: E402
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side  # noqa: E402
+
+from bot.config.registry import rates  # noqa: E402
+from bot.services.payroll_batch import (  # noqa: E402
+    _REPORT_COLUMNS,
+    Staff,
+    compute_payroll,
+    export_payroll_report,
+)
+from bot.services.xlsx_stream import Book  # noqa: E402
+
+N_MONEY = len(_REPORT_COLUMNS) - 2
+
+
+# ─── Прежний способ: книга в памяти ──────────
+
+_HEADER_FONT = Font(bold=True, size=11)
+_HEADER_FILL = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+_THIN_BORDER = Border(left=Side(style="thin"), right=Side(style="thin"),
+                      top=Side(style="thin"), bottom=Side(style="thin"))
+_NUM_FMT = "#,##0.00"
+
+
+def _style_header(ws, row, max_col):
+    for col in range(1, max_col + 1):
+        cell = ws.cell(row=row, column=col)
+        cell.font = _HEADER_FONT
+        cell.fill = _HEADER_FILL
+        cell.border = _THIN_BORDER
+        cell.alignment = Alignment(horizontal="center", wrap_text=True)
+
+
+def _style_data(ws, row, max_col, num_cols=None):
+    for col in range(1, max_col + 1):
+        cell = ws.cell(row=row, column=col)
+        cell.border = _THIN_BORDER
+        if num_cols and col in num_cols:
+            cell.number_format = _NUM_FMT
+            cell.alignment = Alignment(horizontal="right")
+
+
+def in_memory(rows: list[tuple]) -> int:
+    wb = Workbook()
+    ws = wb.active
+    width = len(_REPORT_COLUMNS)
+    for col, (title, _) in enumerate(_REPORT_COLUMNS, 1):
+        ws.cell(row=1, column=col, value=title)
+    _style_header(ws, 1, width)
+    money = set(range(3, width + 1))
+    for i, row in enumerate(rows, 2):
+        for col, value in enumerate(row, 1):
+            ws.cell(row=i, column=col, value=value)
+        _style_data(ws, i, width, money)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.tell()
+
+
+def streamed(rows: list[tuple]) -> int:
+    book = Book()
+    sheet = book.sheet("Зарплата", widths=[w for _, w in _REPORT_COLUMNS])
+    sheet.header([t for t, _ in _REPORT_COLUMNS])
+    styles = ("data", "data") + ("money",) * N_MONEY
+    for row in rows:
+        sheet.row(row, styles)
+    buf = book.save()
+    return buf.seek(0, 2)
+
+
+def payroll(staff: Staff):
+    p = compute_payroll(staff)
+    return lambda _: export_payroll_report(p).seek(0, 2)
+
+
+# ─── Данные ──────────────────────────────────
+
+def make_rows(n: int, rnd: random.Random) -> list[tuple]:
+    return [
+        (f"Сотрудник {i}", rnd.choice("АБВГД"),
+         *(rnd.randrange(1_000_000, 50_000_000) / 100 for _ in range(N_MONEY)))
+        for i in range(n)
+    ]
+
+
+def make_staff(n: int, rnd: random.Random) -> Staff:
+    groups = list(rates().TERRITORY_GROUPS)
+    s = Staff()
+    for i in range(n):
+        s.names.append(f"Сотрудник {i}")
+        s.territories.append(rnd.choice(groups))
+        s.oklad.append(rnd.randrange(20_000, 300_000) * 100)
+        s.nadbavka_pct.append(rnd.choice((0, 30, 50, 80)))
+        s.children.append(rnd.choice((0, 0, 1, 2, 3)))
+        s.bonus.append(0)
+        s.bonus_month.append(0)
+        s.pct_months.append(None)
+    return s
+
+
+def measure(func, arg, repeat: int) -> tuple[float, int, int]:
+    """Лучшее время, пик памяти и размер файла."""
+    best = min(_timed(func, arg) for _ in range(repeat))
+    tracemalloc.start()
+    size = func(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, size
+
+
+def _timed(func, arg) -> float:
+    started = time.perf_counter()
+    func(arg)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    print(f"{'строк':>7} {'вариант':<8} {'сек':>8} {'строк/с':>10} {'пик, МБ':>9} {'файл, КБ':>9}")
+    for n in args.rows:
+        rows = make_rows(n, rnd)
+        variants = (
+            ("memory", in_memory, rows),
+            ("stream", streamed, rows),
+            ("payroll", payroll(make_staff(n, rnd)), None),
+        )
+        for name, func, arg in variants:
+            seconds, peak, size = measure(func, arg, args.repeat)
+            print(f"{n:>7} {name:<8} {seconds:>8.3f} {n / seconds:>10,.0f} "
+                  f"{peak / 2**20:>9.1f} {size / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Стенд-ины внешних сервисов: OpenAI-совместимый LLM/Vision/Whisper
+с настраиваемой задержкой и локальный BM25 вместо ChromaDB."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import re
+import time
+from collections import Counter
+from pathlib import Path
+
+from aiohttp import web
+
+from bot.services.rag import chunk_text
+
+_ANSWER = (
+    "<b>Ответ (стенд)</b>\n\nСогласно ст. 224 НК РФ ставка НДФЛ для резидентов "
+    "составляет 13% при доходе до 2,4 млн ₽ в год. Районный коэффициент и северная "
+    "надбавка облагаются по отдельной шкале 13%/15%."
+)
+
+
+class FakeOpenAI:
+    """POST /v1/chat/completions и /v1/audio/transcriptions."""
+
+    def __init__(self, llm_latency: float, vision_latency: float, whisper_latency: float,
+                 answer_chars: int = 0):
+        self.llm_latency = llm_latency
+        self.vision_latency = vision_latency
+        self.whisper_latency = whisper_latency
+        self.answer = _ANSWER + ("\n" + "Подробности. " * (answer_chars // 13) if answer_chars else "")
+        self.calls: Counter = Counter()
+
+    async def chat(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        has_image = any(
+            isinstance(m.get("content"), list)
+            and any(part.get("type") == "image_url" for part in m["content"])
+            for m in body.get("messages", [])
+        )
+        kind = "vision" if has_image else "llm"
+        self.calls[kind] += 1
+        await asyncio.sleep(self.vision_latency if has_image else self.llm_latency)
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body["messages"]) // 4
+        return web.json_response({
+            "id": f"chatcmpl-{self.calls[kind]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.answer},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(self.answer) // 4,
+                "total_tokens": prompt_tokens + len(self.answer) // 4,
+            },
+        })
+
+    async def transcribe(self, request: web.Request) -> web.Response:
+        await request.post()
+        self.calls["whisper"] += 1
+        await asyncio.sleep(self.whisper_latency)
+        return web.json_response({"text": "Какие сроки уплаты НДФЛ в 2026 году?"})
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/v1/chat/completions", self.chat)
+        app.router.add_post("/v1/audio/transcriptions", self.transcribe)
+        return app
+
+
+# ─── BM25 вместо ChromaDB ───────────────────
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(text: str) -> list[str]:
+    # Грубый стемминг: первые 6 букв слова — достаточно для русского в стенде
+    return [w[:6] for w in _WORD.findall(text.lower()) if len(w) > 2]
+
+
+class BM25Collection:
+    """Повторяет интерфейс collection.query() из chromadb."""
+
+    def __init__(self, chunks: list[str], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1, self.b = k1, b
+        self._docs = [Counter(_tokens(c)) for c in chunks]
+        self._lens = [sum(d.values()) for d in self._docs]
+        self._avg = sum(self._lens) / max(len(self._lens), 1)
+        df: Counter = Counter()
+        for doc in self._docs:
+            df.update(doc.keys())
+        n = len(chunks)
+        self._idf = {t: math.log(1 + (n - f + 0.5) / (f + 0.5)) for t, f in df.items()}
+
+    @classmethod
+    def from_directory(cls, kb_path: Path) -> "BM25Collection":
+        chunks: list[str] = []
+        for f in sorted(kb_path.rglob("*.md")):
+            chunks.extend(chunk_text(f.read_text(encoding="utf-8")))
+        return cls(chunks or ["База знаний пуста."])
+
+    def query(self, query_texts: list[str], n_results: int = 5) -> dict:
+        documents = []
+        for text in query_texts:
+            terms = _tokens(text)
+            scores = []
+            for i, doc in enumerate(self._docs):
+                norm = self.k1 * (1 - self.b + self.b * self._lens[i] / self._avg)
+                score = sum(
+                    self._idf.get(t, 0) * doc[t] * (self.k1 + 1) / (doc[t] + norm)
+                    for t in terms if t in doc
+                )
+                scores.append((score, i))
+            scores.sort(reverse=True)
+            documents.append([self.chunks[i] for _, i in scores[:n_results]])
+        return {"documents": documents}
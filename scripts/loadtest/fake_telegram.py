@@ -0,0 +1,188 @@
+"""Фейковый Bot API: отдаёт синтетические апдейты через getUpdates и
+записывает ответы бота (sendMessage, editMessageText, sendDocument…)."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import time
+from collections import defaultdict
+from typing import Any
+
+from aiohttp import web
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Бухгалтер", "username": "buhgalter_bot"}
+
+# Методы, которые считаются «ответом» бота; answerCallbackQuery — служебный
+REPLY_METHODS = {"sendMessage", "editMessageText", "sendDocument", "sendPhoto"}
+
+
+class FakeTelegram:
+    def __init__(self):
+        self._updates: list[dict] = []
+        self._new_update = asyncio.Event()
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1000)
+        self._files: dict[str, bytes] = {}
+        # chat_id → список (время, метод, payload)
+        self.replies: dict[int, list[tuple[float, str, dict]]] = defaultdict(list)
+        self._reply_events: dict[int, asyncio.Event] = defaultdict(asyncio.Event)
+        self.last_bot_message: dict[int, dict] = {}
+        self.calls: dict[str, int] = defaultdict(int)
+
+    # ─── Апдейты от «пользователей» ─────────
+
+    def _push(self, update: dict) -> None:
+        update["update_id"] = next(self._update_ids)
+        self._updates.append(update)
+        self._new_update.set()
+
+    def _message(self, user_id: int, **fields) -> dict:
+        return {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+            **fields,
+        }
+
+    def send_text(self, user_id: int, text: str) -> None:
+        self._push({"message": self._message(user_id, text=text)})
+
+    def send_photo(self, user_id: int, data: bytes) -> None:
+        file_id = self.add_file(data, "photos", "jpg")
+        size = {"file_id": file_id, "file_unique_id": file_id, "width": 1600, "height": 1200}
+        self._push({"message": self._message(user_id, photo=[size])})
+
+    def send_document(self, user_id: int, data: bytes, file_name: str, mime: str) -> None:
+        file_id = self.add_file(data, "documents", file_name.rsplit(".", 1)[-1])
+        document = {
+            "file_id": file_id, "file_unique_id": file_id,
+            "file_name": file_name, "mime_type": mime, "file_size": len(data),
+        }
+        self._push({"message": self._message(user_id, document=document)})
+
+    def press_button(self, user_id: int, data: str) -> None:
+        message = self.last_bot_message.get(user_id) or self._message(user_id, text="")
+        self._push({"callback_query": {
+            "id": str(next(self._message_ids)),
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": message,
+        }})
+
+    def button_data(self, user_id: int, prefix: str) -> str:
+        """callback_data кнопки из последнего ответа бота, у которого она есть."""
+        for _, _, payload in reversed(self.replies[user_id]):
+            markup = payload.get("reply_markup")
+            if isinstance(markup, str):
+                markup = json.loads(markup)
+            for row in (markup or {}).get("inline_keyboard", ()):
+                for button in row:
+                    if button.get("callback_data", "").startswith(prefix):
+                        return button["callback_data"]
+        raise LookupError(f"нет кнопки {prefix}… у пользователя {user_id}")
+
+    def add_file(self, data: bytes, folder: str, ext: str) -> str:
+        file_id = f"{folder}_{len(self._files)}"
+        self._files[file_id] = data
+        return file_id
+
+    async def wait_replies(self, user_id: int, count: int, timeout: float) -> bool:
+        """Ждёт, пока у пользователя накопится count ответов бота."""
+        deadline = time.monotonic() + timeout
+        while len(self.replies[user_id]) < count:
+            event = self._reply_events[user_id]
+            event.clear()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    # ─── HTTP ───────────────────────────────
+
+    async def _payload(self, request: web.Request) -> dict[str, Any]:
+        if request.content_type == "application/json":
+            return await request.json()
+        form = await request.post()
+        payload: dict[str, Any] = {}
+        for key, value in form.items():
+            if isinstance(value, web.FileField):
+                payload[key] = {"filename": value.filename, "size": len(value.file.read())}
+            else:
+                payload[key] = value
+        return payload
+
+    async def handle_method(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        payload = await self._payload(request)
+        self.calls[method] += 1
+
+        if method == "getUpdates":
+            return self._ok(await self._get_updates(payload))
+        if method == "getMe":
+            return self._ok(BOT_USER)
+        if method in ("deleteWebhook", "answerCallbackQuery", "answerInlineQuery"):
+            return self._ok(True)
+        if method == "getFile":
+            file_id = payload["file_id"]
+            return self._ok({
+                "file_id": file_id, "file_unique_id": file_id,
+                "file_size": len(self._files.get(file_id, b"")), "file_path": file_id,
+            })
+        if method in REPLY_METHODS:
+            chat_id = int(payload["chat_id"]) if "chat_id" in payload else 0
+            message = {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": payload.get("text", ""),
+            }
+            if "document" in payload:
+                file_id = f"sent_{message['message_id']}"
+                message["document"] = {"file_id": file_id, "file_unique_id": file_id}
+            if chat_id:
+                self.replies[chat_id].append((time.monotonic(), method, payload))
+                self.last_bot_message[chat_id] = message
+                self._reply_events[chat_id].set()
+            return self._ok(message)
+        return self._ok(True)
+
+    async def _get_updates(self, payload: dict) -> list[dict]:
+        offset = int(payload.get("offset") or 0)
+        timeout = float(payload.get("timeout") or 0)
+        self._updates = [u for u in self._updates if u["update_id"] >= offset]
+        if not self._updates and timeout:
+            self._new_update.clear()
+            try:
+                await asyncio.wait_for(self._new_update.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        limit = int(payload.get("limit") or 100)
+        return self._updates[:limit]
+
+    async def handle_file(self, request: web.Request) -> web.Response:
+        data = self._files.get(request.match_info["path"])
+        if data is None:
+            raise web.HTTPNotFound()
+        return web.Response(body=data)
+
+    @staticmethod
+    def _ok(result: Any) -> web.Response:
+        return web.Response(
+            text=json.dumps({"ok": True, "result": result}),
+            content_type="application/json",
+        )
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/bot{token}/{method}", self.handle_method)
+        app.router.add_get("/file/bot{token}/{path:.+}", self.handle_file)
+        return app
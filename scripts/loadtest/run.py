@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""Нагрузочный тест полного стека Dispatcher на фейковых Telegram/LLM/Chroma.
+
+Запуск:
+    python scripts/loadtest/run.py --users 50 --flows 4 --out results.json
+    python scripts/loadtest/run.py --mix calc=5,text=3,photo=1,pdf=1 --llm-latency 1.5
+
+Реальные роутеры и middleware бота (bot.main.build_dispatcher) работают против
+локального Bot API; LLM, Vision и Whisper — OpenAI-совместимый стенд с заданной
+задержкой; поиск по базе знаний — BM25 по knowledge_base/*.md. Результат —
+JSON с пропускной способностью, перцентилями по шагам и этапам, lag цикла и RSS.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import platform
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from aiohttp import web  # noqa: E402
+
+from fake_backends import BM25Collection, FakeOpenAI  # noqa: E402
+from fake_telegram import FakeTelegram  # noqa: E402
+
+TOKEN = "123456:LOADTEST"
+KB_PATH = ROOT / "knowledge_base"
+
+# Шаг сценария: (действие, аргумент, сколько ответов бота ждать);
+# "pick" нажимает кнопку из ответа бота по началу callback_data — в отчётах
+# он содержит год ставок, заранее его не угадать
+FLOWS = {
+    "calc": [
+        ("text", "🧮 Калькулятор", 1),
+        ("button", "calc_salary", 1),
+        ("button", "terr_Д", 1),
+        ("text", "60000", 1),
+        ("text", "30", 1),
+        ("pick", "excel_salary:", 1),
+    ],
+    "text": [
+        ("text", "Какие сроки сдачи РСВ и уплаты взносов в 2026 году?", 2),
+    ],
+    "photo": [
+        ("photo", None, 2),
+    ],
+    "pdf": [
+        ("pdf", None, 2),
+    ],
+}
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    from bot.utils.loop_monitor import percentile
+
+    ordered = sorted(values)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(percentile(ordered, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "max_ms": round((ordered[-1] if ordered else 0) * 1000, 2),
+    }
+
+
+def _sample_photo() -> bytes:
+    from PIL import Image, ImageDraw
+
+    img = Image.new("RGB", (1600, 1200), "white")
+    draw = ImageDraw.Draw(img)
+    for y in range(40, 1200, 40):
+        draw.text((40, y), f"Счёт № {y} от 01.02.2026 — 12 345,67 руб., НДС 22%", fill="black")
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def _sample_pdf() -> bytes:
+    pdfs = sorted(KB_PATH.rglob("*.pdf"), key=lambda p: p.stat().st_size)
+    if pdfs:
+        return pdfs[0].read_bytes()
+    from bot.services.pdf_export import generate_pdf
+
+    return generate_pdf("Счёт № 1 от 01.02.2026\n\nИтого 12 345,67 ₽, НДС 22%").read()
+
+
+class Runner:
+    def __init__(self, tg: FakeTelegram, args: argparse.Namespace):
+        self.tg = tg
+        self.args = args
+        self.step_latency: dict[str, list[float]] = {}
+        self.flow_latency: dict[str, list[float]] = {}
+        self.timeouts = 0
+        self.completed_steps = 0
+        self.photo = _sample_photo() if "photo" in args.mix else b""
+        self.pdf = _sample_pdf() if "pdf" in args.mix else b""
+
+    async def user(self, user_id: int, flows: list[str]) -> None:
+        rnd = random.Random(user_id)
+        await asyncio.sleep(rnd.uniform(0, self.args.ramp_up))
+        for flow in flows:
+            flow_started = time.monotonic()
+            ok = True
+            for action, arg, expect in FLOWS[flow]:
+                target = len(self.tg.replies[user_id]) + expect
+                started = time.monotonic()
+                if action == "text":
+                    self.tg.send_text(user_id, arg)
+                elif action == "button":
+                    self.tg.press_button(user_id, arg)
+                elif action == "pick":
+                    self.tg.press_button(user_id, self.tg.button_data(user_id, arg))
+                elif action == "photo":
+                    self.tg.send_photo(user_id, self.photo)
+                elif action == "pdf":
+                    self.tg.send_document(user_id, self.pdf, "invoice.pdf", "application/pdf")
+                if not await self.tg.wait_replies(user_id, target, self.args.step_timeout):
+                    self.timeouts += 1
+                    ok = False
+                    break
+                step = f"{flow}:{action}:{(arg or action)[:24]}"
+                self.step_latency.setdefault(step, []).append(time.monotonic() - started)
+                self.completed_steps += 1
+                await asyncio.sleep(rnd.uniform(0, self.args.think_time))
+            if ok:
+                self.flow_latency.setdefault(flow, []).append(time.monotonic() - flow_started)
+
+
+def _parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in FLOWS:
+            raise argparse.ArgumentTypeError(f"неизвестный сценарий: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from aiogram import Bot
+    from aiogram.client.default import DefaultBotProperties
+    from aiogram.client.session.aiohttp import AiohttpSession
+    from aiogram.client.telegram import TelegramAPIServer
+    from aiogram.enums import ParseMode
+
+    from bot.config.settings import allowed_users, settings
+    from bot.main import build_dispatcher
+    from bot.services import rag
+    from bot.utils.loop_monitor import loop_monitor
+    from bot.utils.metrics import RENDER_SECONDS, STAGE_SECONDS, UPDATE_SECONDS
+    from bot.utils.startup import prewarm_modules
+    from bot.utils.stats import rss_bytes
+
+    tg = FakeTelegram()
+    llm = FakeOpenAI(args.llm_latency, args.vision_latency, args.whisper_latency)
+    runners = []
+    for app, port in ((tg.app(), args.telegram_port), (llm.app(), args.llm_port)):
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        runners.append(runner)
+
+    # Подмена внешних зависимостей бота на стенд
+    allowed_users.clear()
+    settings.anthropic_api_key = ""
+    settings.openai_api_key = "loadtest"
+    settings.openai_base_url = f"http://127.0.0.1:{args.llm_port}/v1"
+    rag._collection = BM25Collection.from_directory(KB_PATH)
+    if not args.cold:
+        # Первый импорт openpyxl/reportlab/pdfplumber блокирует цикл — меряем
+        # установившийся режим, холодный старт — с флагом --cold
+        prewarm_modules()
+
+    bot = Bot(
+        token=TOKEN,
+        session=AiohttpSession(
+            api=TelegramAPIServer.from_base(f"http://127.0.0.1:{args.telegram_port}"),
+        ),
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+    dp = build_dispatcher()
+    loop_monitor.start(threshold=args.lag_threshold / 1000)
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False))
+
+    runner = Runner(tg, args)
+    names = [name for name, weight in args.mix.items() for _ in range(weight)]
+    rnd = random.Random(args.seed)
+    users = [
+        runner.user(10_000 + i, [rnd.choice(names) for _ in range(args.flows)])
+        for i in range(args.users)
+    ]
+    rss_before = rss_bytes()
+    started = time.monotonic()
+    await asyncio.gather(*users)
+    elapsed = time.monotonic() - started
+
+    await dp.stop_polling()
+    await polling
+    loop_monitor.stop()
+    await bot.session.close()
+    for r in runners:
+        await r.cleanup()
+
+    window = elapsed + 60
+    lag = loop_monitor.percentiles()
+    return {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "args": {k: v for k, v in vars(args).items() if k != "out"},
+        },
+        "throughput": {
+            "elapsed_s": round(elapsed, 3),
+            "steps": runner.completed_steps,
+            "steps_per_s": round(runner.completed_steps / elapsed, 2),
+            "flows": sum(len(v) for v in runner.flow_latency.values()),
+            "timeouts": runner.timeouts,
+            "updates_per_s": round(sum(len(r) for r in tg.replies.values()) / elapsed, 2),
+        },
+        "steps": {k: _percentiles(v) for k, v in sorted(runner.step_latency.items())},
+        "flows": {k: _percentiles(v) for k, v in sorted(runner.flow_latency.items())},
+        "stages": {
+            "/".join(k): _percentiles(v) for k, v in STAGE_SECONDS.recent(window).items()
+        },
+        "routers": {
+            "/".join(k): _percentiles(v) for k, v in UPDATE_SECONDS.recent(window).items()
+        },
+        "renders": {
+            "/".join(k): _percentiles(v) for k, v in RENDER_SECONDS.recent(window).items()
+        },
+        "event_loop_lag": {
+            "p50_ms": round(lag[0.5] * 1000, 2),
+            "p95_ms": round(lag[0.95] * 1000, 2),
+            "p99_ms": round(lag[0.99] * 1000, 2),
+            "blocks": len(loop_monitor.reports),
+            "block_sites": [
+                {"task": r.task, "ms": round(r.duration * 1000, 1),
+                 "where": r.stack.strip().splitlines()[-2:]}
+                for r in loop_monitor.reports
+            ],
+        },
+        "memory": {
+            "rss_before_mb": round(rss_before / 1024 / 1024, 1),
+            "rss_after_mb": round(rss_bytes() / 1024 / 1024, 1),
+        },
+        "backend_calls": dict(llm.calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=20, help="одновременных пользователей")
+    parser.add_argument("--flows", type=int, default=3, help="сценариев на пользователя")
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("calc=4,text=3,photo=2,pdf=1"),
+                        help="веса сценариев: calc,text,photo,pdf")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="задержка LLM, с")
+    parser.add_argument("--vision-latency", type=float, default=1.5, help="задержка Vision, с")
+    parser.add_argument("--whisper-latency", type=float, default=0.5, help="задержка Whisper, с")
+    parser.add_argument("--think-time", type=float, default=0.2, help="пауза между шагами, до N с")
+    parser.add_argument("--ramp-up", type=float, default=1.0, help="разнос старта пользователей, с")
+    parser.add_argument("--step-timeout", type=float, default=60.0)
+    parser.add_argument("--lag-threshold", type=float, default=100.0, help="порог блокировки цикла, мс")
+    parser.add_argument("--telegram-port", type=int, default=18081)
+    parser.add_argument("--llm-port", type=int, default=18082)
+    parser.add_argument("--cold", action="store_true", help="без прогрева тяжёлых модулей")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", type=Path, default=Path("loadtest_results.json"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    result = asyncio.run(run(args))
+    args.out.write_text(json.dumps(result, ensure_ascii=False, indent=2))
+
+    t = result["throughput"]
+    print(
+        f"{t['steps']} шагов за {t['elapsed_s']} с — {t['steps_per_s']} шаг/с, "
+        f"таймаутов: {t['timeouts']}"
+    )
+    for name, p in result["steps"].items():
+        print(f"  {name:<45} p50={p['p50_ms']:>8} p95={p['p95_ms']:>8} p99={p['p99_ms']:>8} мс")
+    lag = result["event_loop_lag"]
+    print(f"lag цикла: p50={lag['p50_ms']} p99={lag['p99_ms']} мс, блокировок: {lag['blocks']}")
+    print(f"RSS: {result['memory']['rss_before_mb']} → {result['memory']['rss_after_mb']} МБ")
+    print(f"Результаты: {args.out}")
+
+
+if __name__ == "__main__":
+    main()